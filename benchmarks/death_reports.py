@@ -0,0 +1,60 @@
+"""
+Death report generation benchmark.
+
+Measures one report built the way it used to be, with every string table
+parsed again from its XML file, next to the compiled `DeathReportEngine`
+generating reports in bulk.
+
+    python benchmarks/death_reports.py --reports 10000
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from random import Random
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pysaic.crc_strings.use_case import (  # noqa: E402
+    DeathReportEngine,
+    DeathTables,
+)
+from pysaic.script_reader.entities import Death  # noqa: E402
+
+DEATH = Death(
+    user_actor="actor_killer",
+    location="l04_darkvalley",
+    death_by="ARMY",
+    meta="sim_default_military_1",
+)
+RELOADS = 50
+
+
+def run(count):
+    started_at = time.perf_counter()
+    for _ in range(RELOADS):
+        DeathReportEngine(DeathTables.load()).generate("stalker", DEATH)
+    reload = (time.perf_counter() - started_at) / RELOADS
+
+    engine = DeathReportEngine(DeathTables.load(), Random(0))
+    started_at = time.perf_counter()
+    engine.generate_many("stalker", DEATH, count)
+    compiled = (time.perf_counter() - started_at) / count
+
+    print(f"report with tables parsed: {reload * 1e6:.1f} us")
+    print(f"compiled engine: {compiled * 1e6:.2f} us")
+    print(f"throughput: {1 / compiled:,.0f} reports/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=10000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    run(args.reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Event allocation benchmark.
+
+Measures the size and creation time of the events built for every IRC line
+(an `IncomingMessage` per PRIVMSG and an `IncomingEvent` wrapping an
+`IrcEvent` per JOIN/PART/QUIT), next to the plain dataclasses stamped with
+`datetime.now()` that were used before.
+
+    python benchmarks/events.py --events 100000
+"""
+
+import argparse
+import sys
+import timeit
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pysaic.entities import (  # noqa: E402
+    IncomingEvent,
+    IncomingMessage,
+    IrcEvent,
+)
+from pysaic.enums import IrcEvents  # noqa: E402
+
+
+@dataclass
+class PlainIncomingMessage:
+    author: str
+    target: str
+    content: str
+    created_at: datetime = field(default_factory=datetime.now)
+    service: bool = False
+
+
+@dataclass
+class PlainIrcEvent:
+    type: IrcEvents
+    payload: Optional[Any] = None
+
+
+@dataclass
+class PlainIncomingEvent:
+    author: str
+    target: str
+    event: Any
+    created_at: datetime = field(default_factory=datetime.now)
+
+
+def hot_path(message_class, event_class, irc_event_class):
+    def create():
+        return (
+            message_class("Wolf", "#crcr_english", "Good hunting, stalker"),
+            event_class(
+                "Wolf", "#crcr_english", irc_event_class(IrcEvents.JOIN)
+            ),
+        )
+
+    return create
+
+
+def measure(name, create, count):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    events = [create() for _ in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+
+    seconds = min(timeit.repeat(create, number=count, repeat=5))
+    print(
+        f"{name}: {(after - before) / count:.0f} B and "
+        f"{seconds / count * 1e9:.0f} ns per message + event"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=100000)
+    args = parser.parse_args()
+
+    measure(
+        "plain dataclasses",
+        hot_path(PlainIncomingMessage, PlainIncomingEvent, PlainIrcEvent),
+        args.events,
+    )
+    measure(
+        "slotted events",
+        hot_path(IncomingMessage, IncomingEvent, IrcEvent),
+        args.events,
+    )
+
+
+if __name__ == "__main__":
+    main()
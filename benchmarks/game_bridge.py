@@ -0,0 +1,140 @@
+"""
+Game bridge per-message benchmark.
+
+Measures the cost of one channel message line read from `crc_output.txt`
+going through `parse_line` and its use case, and of one game write that is
+skipped because the game is not running, the check done before every
+`crc_input.txt` line. Both are run with the dependencies read from the
+`AppContext` and with them resolved through `inject.autoparams()` on every
+call, as the game bridge did before.
+
+    python benchmarks/game_bridge.py --messages 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import inject
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pysaic.config import Config  # noqa: E402
+from pysaic.context import (  # noqa: E402
+    AppContext,
+    get_app_context,
+    set_app_context,
+)
+from pysaic.controllers.game import add_channel_message_to_game  # noqa: E402
+from pysaic.entities import IncomingQueue, OutgoingQueue  # noqa: E402
+from pysaic.script_reader.parser import parse_line  # noqa: E402
+from pysaic.state import State  # noqa: E402
+
+LINE = "Message/actor_dolg/stalker/Good hunting, stalker"
+
+
+def inject_ensure_game_is_running(func):
+    @inject.autoparams()
+    def wrapper(*args, state: State, **kwargs):
+        if state.game_location is None:
+            return
+
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+@inject_ensure_game_is_running
+def inject_add_channel_message_to_game(
+    faction_actor, author, highlight, content
+):
+    pass
+
+
+@inject.autoparams()
+async def inject_parse_line(
+    line,
+    config: Config,
+    incoming_queue: IncomingQueue,
+    outgoing_queue: OutgoingQueue,
+):
+    # the same work behind the resolution the use cases were given
+    await parse_line(line, get_app_context())
+
+
+def build_context():
+    config = Mock()
+    config.nick = "stalker"
+    config.server.channels = []
+    config.server.previous_channel = "#benchmark"
+    context = AppContext(
+        config, State(config), IncomingQueue(), OutgoingQueue()
+    )
+    set_app_context(context)
+
+    def binder(binder):
+        binder.bind(Config, context.config)
+        binder.bind(State, context.state)
+        binder.bind(IncomingQueue, context.incoming_queue)
+        binder.bind(OutgoingQueue, context.outgoing_queue)
+
+    inject.clear_and_configure(binder)
+    return context
+
+
+def drain(queue):
+    while not queue.empty():
+        queue.get_nowait()
+
+
+async def measure(name, count, write, parse):
+    context = get_app_context()
+
+    started_at = time.perf_counter()
+    for _ in range(count):
+        write("actor_dolg", "Wolf", "False", "hi")
+    gate = (time.perf_counter() - started_at) / count
+
+    started_at = time.perf_counter()
+    for _ in range(count):
+        await parse(LINE)
+        drain(context.incoming_queue)
+        drain(context.outgoing_queue)
+    parse = (time.perf_counter() - started_at) / count
+
+    print(
+        f"{name}: skipped game write {gate * 1e6:.2f} us, "
+        f"parse_line {parse * 1e6:.2f} us"
+    )
+
+
+async def run(count):
+    context = build_context()
+    await measure(
+        "inject",
+        count,
+        inject_add_channel_message_to_game,
+        inject_parse_line,
+    )
+    await measure(
+        "AppContext",
+        count,
+        add_channel_message_to_game,
+        lambda line: parse_line(line, context),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.messages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Roster benchmark.
+
+Measures the memory used per roster member, the time to build a roster
+from a NAMES reply and the time to serialise the game's `Users/` line for
+a channel with thousands of lurkers, next to the roster delta sent to the
+game for one JOIN.
+
+    python benchmarks/roster.py --users 5000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from unittest.mock import Mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pysaic.controllers.game_roster import (  # noqa: E402
+    GameRoster,
+    serialize_chat_user,
+)
+from pysaic.entities import ChatUser  # noqa: E402
+from pysaic.enums import FactionsEnum  # noqa: E402
+from pysaic.state import State  # noqa: E402
+
+CHANNEL = "#benchmark"
+
+
+def names_reply(count):
+    prefixes = ["", "", "", "", "+", "%", "@"]
+    return [f"{random.choice(prefixes)}stalker_{x}" for x in range(count)]
+
+
+def build_state():
+    config = Mock()
+    config.nick = "stalker_0"
+    config.current_faction = FactionsEnum.Loner
+    config.server.channels = []
+    config.server.previous_channel = CHANNEL
+    return State(config)
+
+
+def build_roster(state, names):
+    state.stage_names(CHANNEL, names)
+    state.replace_roster(CHANNEL, state.pending_names.pop(CHANNEL))
+    chat_users = state.channel_users(CHANNEL)
+    factions = list(FactionsEnum)
+    for chat_user in chat_users.values():
+        chat_user.faction = random.choice(factions)
+    return chat_users
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    names = names_reply(args.users)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    state = build_state()
+    chat_users = build_roster(state, names)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"memory per user: {(after - before) / args.users:.0f} B")
+
+    joined = ChatUser(name="newcomer")
+    replace, serialise, delta = [], [], []
+    for _ in range(args.runs):
+        started_at = time.perf_counter()
+        build_roster(build_state(), names)
+        replace.append(time.perf_counter() - started_at)
+
+        started_at = time.perf_counter()
+        "/".join(serialize_chat_user(user) for user in chat_users.values())
+        serialise.append(time.perf_counter() - started_at)
+
+        roster = GameRoster()
+        roster.reset(use_deltas=True)
+        snapshot = roster.lines(chat_users.values())
+        started_at = time.perf_counter()
+        lines = roster.lines([*chat_users.values(), joined])
+        delta.append(time.perf_counter() - started_at)
+
+    print(f"NAMES to roster: {statistics.median(replace) * 1000:.2f} ms")
+    print(f"Users/ line: {statistics.median(serialise) * 1000:.2f} ms")
+    print(
+        f"JOIN delta: {statistics.median(delta) * 1000:.2f} ms, "
+        f"{sum(map(len, lines))} B instead of {len(snapshot[0])} B"
+    )
+
+
+if __name__ == "__main__":
+    main()
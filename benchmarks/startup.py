@@ -0,0 +1,188 @@
+"""
+Startup benchmark.
+
+Measures the import cost of `pysaic.main` with `python -X importtime` and,
+when a display is available, the time to first paint and the time to
+connect of the real app against a local stand-in IRC server.
+
+    python benchmarks/startup.py --runs 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import yaml
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(SRC), env.get("PYTHONPATH")])
+    )
+    return env
+
+
+def import_time():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pysaic.main"],
+        capture_output=True,
+        text=True,
+        env=_env(),
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        columns = line[len("import time:") :].split("|")
+        try:
+            self_us, cumulative_us = int(columns[0]), int(columns[1])
+        except ValueError:
+            continue
+        modules[columns[2].strip()] = (self_us, cumulative_us)
+    return modules
+
+
+class StandInIrcServer:
+    """Answers registration with 001 so the client reaches "connected"."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self.loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        nick = "*"
+        while line := await reader.readline():
+            command, _, rest = line.decode().strip().partition(" ")
+            if command == "NICK":
+                nick = rest
+            elif command == "USER":
+                writer.write(f":stand.in 001 {nick} :Welcome\r\n".encode())
+            elif command == "PING":
+                writer.write(f":stand.in PONG {rest}\r\n".encode())
+            await writer.drain()
+
+
+def strings_load_time():
+    """crc_strings tables parsed from XML, then read from the cache."""
+    code = (
+        "import time\n"
+        "from pysaic.crc_strings.use_case import DeathTables\n"
+        "started_at = time.perf_counter()\n"
+        "DeathTables.load()\n"
+        "print(time.perf_counter() - started_at)\n"
+    )
+    with tempfile.TemporaryDirectory() as cwd:
+        return [
+            float(
+                subprocess.run(
+                    [sys.executable, "-c", code],
+                    capture_output=True,
+                    text=True,
+                    env=_env(),
+                    cwd=cwd,
+                    check=True,
+                ).stdout
+            )
+            for _ in range(2)
+        ]
+
+
+def app_startup(port):
+    with tempfile.TemporaryDirectory() as cwd:
+        with open(os.path.join(cwd, "server.yml"), "w") as f:
+            yaml.dump(
+                {
+                    "host": "127.0.0.1",
+                    "port": port,
+                    "channels": [
+                        {"name": "#benchmark", "description": "Benchmark"}
+                    ],
+                    "previous_channel": "#benchmark",
+                },
+                f,
+            )
+        started_at = time.time()
+        result = subprocess.run(
+            [sys.executable, "-m", "pysaic.main", "--startup-benchmark"],
+            capture_output=True,
+            text=True,
+            env=_env(),
+            cwd=cwd,
+            timeout=60,
+        )
+    for line in result.stdout.splitlines():
+        if line.startswith("{"):
+            timings = json.loads(line)["startup"]
+            return {
+                name: value - started_at for name, value in timings.items()
+            }
+    raise RuntimeError(result.stderr[-2000:])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        modules = import_time()
+        totals.append(modules["pysaic.main"][1])
+    print(f"import pysaic.main: {statistics.median(totals) / 1000:.1f} ms")
+    print("slowest modules by self time:")
+    for name, (self_us, _) in sorted(
+        modules.items(), key=lambda item: item[1][0], reverse=True
+    )[: args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    loads = [strings_load_time() for _ in range(args.runs)]
+    cold, cached = (statistics.median(times) for times in zip(*loads))
+    print(f"crc_strings tables parsed: {cold * 1000:.1f} ms")
+    print(f"crc_strings tables cached: {cached * 1000:.1f} ms")
+
+    runs = []
+    with StandInIrcServer() as server:
+        for _ in range(args.runs):
+            try:
+                runs.append(app_startup(server.port))
+            except Exception as error:
+                print(f"app startup could not be measured: {error}")
+                return
+    for name in runs[0]:
+        values = [run[name] for run in runs if name in run]
+        print(f"{name}: {statistics.median(values) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
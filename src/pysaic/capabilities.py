@@ -0,0 +1,82 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# requested when the server advertises them in CAP LS, silently skipped
+# otherwise so plain servers keep working with NAMES and CTCP AMOGUS
+CAPABILITIES = (
+    "multi-prefix",
+    "extended-join",
+    "away-notify",
+    "server-time",
+    "message-tags",
+    "batch",
+)
+NETSPLIT_BATCHES = ("netsplit", "netjoin")
+
+
+def register_capabilities(irc):
+    for capability in CAPABILITIES:
+        irc.register_cap(capability)
+
+
+def is_enabled(conn, capability) -> bool:
+    if conn.server is None:
+        return False
+    return conn.server.caps.get(capability, (None, None))[1] is True
+
+
+def get_tag(message, name) -> Optional[str]:
+    if not message.tags or name not in message.tags:
+        return None
+    return message.tags[name].value
+
+
+def message_time(message) -> Optional[datetime]:
+    value = get_tag(message, "time")
+    if not value:
+        return None
+    try:
+        server_time = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        logger.warning("Invalid server time: %r", value)
+        return None
+    # the rest of the app works with naive local time
+    return server_time.astimezone().replace(tzinfo=None)
+
+
+@dataclass
+class Batch:
+    reference: str
+    type: str
+    parameters: list[str]
+    messages: list = field(default_factory=list)
+
+
+class BatchCollector:
+    def __init__(self):
+        self.open_batches: dict[str, Batch] = {}
+
+    def handle(self, message) -> Optional[Batch]:
+        """Opens or closes a batch, returns it once it is closed."""
+        reference, *parameters = message.parameters
+        if reference.startswith("+"):
+            batch_type, *parameters = parameters or [""]
+            self.open_batches[reference[1:]] = Batch(
+                reference[1:], batch_type, parameters
+            )
+            return None
+        return self.open_batches.pop(reference[1:], None)
+
+    def collect(self, message) -> bool:
+        reference = get_tag(message, "batch")
+        if reference is None or reference not in self.open_batches:
+            return False
+        self.open_batches[reference].messages.append(message)
+        return True
+
+    def clear(self):
+        self.open_batches.clear()
@@ -0,0 +1,3 @@
+from .recorder import CaptureSource, capture_line, start_capture, stop_capture
+
+__all__ = ["CaptureSource", "capture_line", "start_capture", "stop_capture"]
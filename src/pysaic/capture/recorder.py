@@ -0,0 +1,64 @@
+import logging
+import time
+from enum import StrEnum
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+FIELD_SEPARATOR = "\t"
+
+
+class CaptureSource(StrEnum):
+    IRC = "I"
+    GAME_OUTPUT = "O"
+    GAME_INPUT = "G"
+
+
+class SessionRecorder:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lines = 0
+        # line buffered so a crash loses at most the line being written
+        self._file = open(self.path, "a", buffering=1, encoding="utf-8")
+
+    def record(self, source: CaptureSource, line: str):
+        self._file.write(
+            f"{time.time():.6f}{FIELD_SEPARATOR}{source}{FIELD_SEPARATOR}"
+            f"{line}\n"
+        )
+        self.lines += 1
+
+    def close(self):
+        self._file.close()
+        logger.info("Captured %d lines into %s", self.lines, self.path)
+
+
+_recorder: Optional[SessionRecorder] = None
+
+
+def start_capture(path) -> SessionRecorder:
+    global _recorder
+    if _recorder is not None:
+        stop_capture()
+
+    logger.info("Capturing session into %s", path)
+    _recorder = SessionRecorder(path)
+    return _recorder
+
+
+def stop_capture():
+    global _recorder
+    if _recorder is None:
+        return
+
+    _recorder.close()
+    _recorder = None
+
+
+def capture_line(source: CaptureSource, line: str):
+    if _recorder is None:
+        return
+
+    _recorder.record(source, line)
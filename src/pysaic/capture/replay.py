@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import logging
+import logging.config
+import time
+from asyncio import Queue
+from dataclasses import dataclass
+from functools import partial
+from typing import Iterator, Optional
+
+import inject
+
+from pysaic.capture.recorder import FIELD_SEPARATOR, CaptureSource
+from pysaic.config import Config
+from pysaic.context import AppContext, set_app_context
+from pysaic.history import HistoryStore
+from pysaic.main import (
+    bind_incoming_queue,
+    set_up_irc_client,
+    setup_inject,
+    update_app,
+)
+from pysaic.script_reader.parser import parse_line
+from pysaic.settings import get_log_config
+from pysaic.state import State
+from pysaic.tasks.incoming_queue import incoming_queue_processing
+from pysaic.tasks.outgoing_queue import outgoing_queue_processing
+from pysaic.ui.app import App
+
+logger = logging.getLogger(__name__)
+
+SPEEDS = {"1x": 1.0, "10x": 10.0, "max": None}
+
+
+@dataclass
+class CapturedLine:
+    timestamp: float
+    source: CaptureSource
+    line: str
+
+
+def read_capture(path) -> Iterator[CapturedLine]:
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            raw = raw.rstrip("\n")
+            if not raw:
+                continue
+            try:
+                timestamp, source, line = raw.split(FIELD_SEPARATOR, 2)
+                yield CapturedLine(
+                    float(timestamp), CaptureSource(source), line
+                )
+            except ValueError:
+                logger.warning("Skipping malformed capture line: %r", raw)
+
+
+async def replay_session(
+    path, irc, context: AppContext, speed: Optional[float] = 1.0
+):
+    """
+    Feeds captured lines back into the handlers. IRC lines go through
+    the protocol parser, game output lines through `parse_line`. Game input
+    lines are what we produced last time, so they are only counted.
+    """
+    counters = {source: 0 for source in CaptureSource}
+    previous = None
+    started_at = time.perf_counter()
+    for captured in read_capture(path):
+        if speed and previous is not None:
+            delay = (captured.timestamp - previous) / speed
+            if delay > 0:
+                await asyncio.sleep(delay)
+        previous = captured.timestamp
+
+        if captured.source == CaptureSource.IRC:
+            irc.data_received(captured.line.encode() + b"\r\n")
+        elif captured.source == CaptureSource.GAME_OUTPUT:
+            await parse_line(captured.line, context)
+        counters[captured.source] += 1
+        # let the handler tasks created by the protocol run
+        await asyncio.sleep(0)
+
+    elapsed = time.perf_counter() - started_at
+    logger.info(
+        "Replayed %s in %.3fs",
+        ", ".join(
+            f"{source.name}={count}" for source, count in counters.items()
+        ),
+        elapsed,
+    )
+    return counters, elapsed
+
+
+async def wait_until_processed(queue, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not queue.empty() and time.monotonic() < deadline:
+        await asyncio.sleep(0.25)
+
+
+def replay():
+    parser = argparse.ArgumentParser(description="Replay a captured session")
+    parser.add_argument("capture")
+    parser.add_argument("--speed", choices=SPEEDS.keys(), default="1x")
+    args = parser.parse_args()
+
+    logging.config.dictConfig(get_log_config())
+    config = Config.load_config()
+    state = State(config)
+    loop = asyncio.get_event_loop()
+    incoming_queue = Queue()
+    outgoing_queue = Queue()
+    context = AppContext(config, state, incoming_queue, outgoing_queue)
+    set_app_context(context)
+    # never connected, outgoing lines are dropped
+    irc = set_up_irc_client(loop, config, state)
+    bind_incoming_queue(irc, incoming_queue, config, state, outgoing_queue)
+    app = App(state, config, incoming_queue, outgoing_queue)
+    inject.configure(
+        partial(
+            setup_inject,
+            app=app,
+            state=state,
+            incoming_queue=incoming_queue,
+            outgoing_queue=outgoing_queue,
+            config=config,
+            loop=loop,
+            history_store=HistoryStore("history_replay"),
+        )
+    )
+    app_update_task = loop.create_task(update_app(app))
+    loop.create_task(outgoing_queue_processing(irc, context))
+    loop.create_task(
+        incoming_queue_processing(state, incoming_queue, app, config)
+    )
+    try:
+        loop.run_until_complete(
+            replay_session(args.capture, irc, context, SPEEDS[args.speed])
+        )
+        loop.run_until_complete(wait_until_processed(incoming_queue))
+    finally:
+        app_update_task.cancel()
+        for task in asyncio.all_tasks(loop):
+            task.cancel()
+        loop.close()
+    app.quit()
+
+
+if __name__ == "__main__":
+    replay()
@@ -0,0 +1,74 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from pysaic.capture import (
+    CaptureSource,
+    capture_line,
+    start_capture,
+    stop_capture,
+)
+from pysaic.capture.replay import read_capture, replay_session
+
+
+@pytest.fixture()
+def capture_path(tmp_path):
+    path = tmp_path / "session.cap"
+    start_capture(path)
+    yield path
+    stop_capture()
+
+
+def test_captured_lines_are_read_back_in_order(capture_path):
+    # given
+    capture_line(CaptureSource.IRC, ":a!b@c PRIVMSG #crcr :hello\tworld")
+    capture_line(CaptureSource.GAME_OUTPUT, "Handshake/9")
+    capture_line(CaptureSource.GAME_INPUT, "Information/Connected")
+    stop_capture()
+
+    # when
+    lines = list(read_capture(capture_path))
+
+    # then
+    assert [(line.source, line.line) for line in lines] == [
+        (CaptureSource.IRC, ":a!b@c PRIVMSG #crcr :hello\tworld"),
+        (CaptureSource.GAME_OUTPUT, "Handshake/9"),
+        (CaptureSource.GAME_INPUT, "Information/Connected"),
+    ]
+    assert lines[0].timestamp <= lines[1].timestamp <= lines[2].timestamp
+
+
+def test_capture_is_noop_when_not_started(tmp_path):
+    # when
+    capture_line(CaptureSource.IRC, "PING :x")
+
+    # then
+    assert list(tmp_path.iterdir()) == []
+
+
+@patch("pysaic.capture.replay.parse_line", new_callable=AsyncMock)
+def test_replay_feeds_irc_and_game_lines(mock_parse_line, capture_path):
+    # given
+    capture_line(CaptureSource.IRC, ":a!b@c PRIVMSG #crcr :hello")
+    capture_line(CaptureSource.GAME_OUTPUT, "Handshake/9")
+    capture_line(CaptureSource.GAME_INPUT, "Information/Connected")
+    stop_capture()
+    irc = Mock()
+    context = Mock()
+
+    # when
+    counters, _ = asyncio.run(
+        replay_session(capture_path, irc, context, speed=None)
+    )
+
+    # then
+    irc.data_received.assert_called_once_with(
+        b":a!b@c PRIVMSG #crcr :hello\r\n"
+    )
+    mock_parse_line.assert_called_once_with("Handshake/9", context)
+    assert counters == {
+        CaptureSource.IRC: 1,
+        CaptureSource.GAME_OUTPUT: 1,
+        CaptureSource.GAME_INPUT: 1,
+    }
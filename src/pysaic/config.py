@@ -1,12 +1,11 @@
 import logging
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import StrEnum
 from typing import Union
 
 import yaml
 
 from pysaic.controllers.ui.user_list import NamesInAlphabeticalOrder
-from pysaic.crc_strings.use_case import random_name
 from pysaic.enums import FactionsEnum
 
 logger = logging.getLogger(__name__)
@@ -23,12 +22,31 @@ class Channel:
     description: str
 
 
+@dataclass(frozen=True)
+class Endpoint:
+    host: str
+    port: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.host}:{self.port}"
+
+
 @dataclass
 class Server:
     host: str
     port: int
     channels: list[Channel]
     previous_channel: str
+    # other hosts of the network, the fastest one is connected to
+    endpoints: list[Endpoint] = field(default_factory=list)
+
+    def all_endpoints(self) -> list[Endpoint]:
+        endpoints = [Endpoint(self.host, self.port)]
+        for endpoint in self.endpoints:
+            if endpoint not in endpoints:
+                endpoints.append(endpoint)
+        return endpoints
 
     @classmethod
     def create_default(cls):
@@ -69,6 +87,10 @@ class Server:
                 for channel in config["channels"]
             ],
             previous_channel=config["previous_channel"],
+            endpoints=[
+                Endpoint(host=endpoint["host"], port=int(endpoint["port"]))
+                for endpoint in config.get("endpoints") or []
+            ],
         )
         if exception:
             instance.save_config()
@@ -94,6 +116,16 @@ class Config:
     disconnect_when_blowout_or_underground: bool = False
     block_money_transfer: bool = True
     user_list_display: str = NamesInAlphabeticalOrder.name
+    # channel lines forwarded to the game each second, 0 for no limit
+    game_messages_per_second: int = 3
+    # other nicks, words and regexes that highlight a message
+    highlight_aliases: list[str] = field(default_factory=list)
+    highlight_words: list[str] = field(default_factory=list)
+    highlight_patterns: list[str] = field(default_factory=list)
+    highlight_faction: bool = False
+    # nick!user@host masks and content regexes dropped on arrival
+    ignore_masks: list[str] = field(default_factory=list)
+    filter_patterns: list[str] = field(default_factory=list)
 
     @classmethod
     def load_config(cls):
@@ -130,6 +162,17 @@ class Config:
             block_money_transfer=cls._to_bool(config["block_money_transfer"]),
             user_list_display=config.get("user_list_display")
             or NamesInAlphabeticalOrder.name,
+            game_messages_per_second=int(
+                config.get("game_messages_per_second", 3)
+            ),
+            highlight_aliases=config.get("highlight_aliases") or [],
+            highlight_words=config.get("highlight_words") or [],
+            highlight_patterns=config.get("highlight_patterns") or [],
+            highlight_faction=cls._to_bool(
+                config.get("highlight_faction", False)
+            ),
+            ignore_masks=config.get("ignore_masks") or [],
+            filter_patterns=config.get("filter_patterns") or [],
         )
         if exception:
             instance.save_config()
@@ -153,6 +196,13 @@ class Config:
                     "disconnect_when_blowout_or_underground": self.disconnect_when_blowout_or_underground,
                     "block_money_transfer": self.block_money_transfer,
                     "user_list_display": self.user_list_display,
+                    "game_messages_per_second": self.game_messages_per_second,
+                    "highlight_aliases": self.highlight_aliases,
+                    "highlight_words": self.highlight_words,
+                    "highlight_patterns": self.highlight_patterns,
+                    "highlight_faction": self.highlight_faction,
+                    "ignore_masks": self.ignore_masks,
+                    "filter_patterns": self.filter_patterns,
                 },
                 f,
             )
@@ -166,6 +216,9 @@ class Config:
 
     @classmethod
     def _default_config(cls) -> dict:
+        # only needed on the first run, keeps XML parsing off the startup
+        from pysaic.crc_strings.use_case import random_name
+
         return {
             "nick": random_name().replace(" ", "_"),
             "password": "",
@@ -179,6 +232,13 @@ class Config:
             "disconnect_when_blowout_or_underground": True,
             "block_money_transfer": True,
             "user_list_display": NamesInAlphabeticalOrder.name,
+            "game_messages_per_second": 3,
+            "highlight_aliases": [],
+            "highlight_words": [],
+            "highlight_patterns": [],
+            "highlight_faction": False,
+            "ignore_masks": [],
+            "filter_patterns": [],
         }
 
     @classmethod
@@ -0,0 +1,47 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from pysaic.config import Config
+from pysaic.controllers.game_input import GameInputQueue
+from pysaic.controllers.game_roster import GameRoster
+from pysaic.controllers.game_segments import SegmentReader
+from pysaic.controllers.game_throttle import GameThrottle
+from pysaic.entities import IncomingQueue, OutgoingQueue
+from pysaic.state import State
+
+if TYPE_CHECKING:
+    from pysaic.script_reader.aiowatch import GameBridgeWatcher
+
+
+@dataclass(slots=True)
+class AppContext:
+    """
+    Objects shared by the whole app. Built once in `main()` and handed to
+    the game bridge and the per-message use cases, which read it directly
+    instead of resolving every dependency through `inject` on each call.
+    """
+
+    config: Config
+    state: State
+    incoming_queue: IncomingQueue
+    outgoing_queue: OutgoingQueue
+    game_input: GameInputQueue = field(default_factory=GameInputQueue)
+    # set once the game script agrees to the segment bridge
+    game_output: Optional[SegmentReader] = None
+    game_watcher: Optional["GameBridgeWatcher"] = None
+    game_roster: GameRoster = field(default_factory=GameRoster)
+    game_throttle: GameThrottle = field(default_factory=GameThrottle)
+
+
+_context: Optional[AppContext] = None
+
+
+def set_app_context(context: Optional[AppContext]):
+    global _context
+    _context = context
+
+
+def get_app_context() -> AppContext:
+    if _context is None:
+        raise RuntimeError("App context is not set")
+    return _context
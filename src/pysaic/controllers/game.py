@@ -1,19 +1,19 @@
 import logging
-from typing import Iterable, Optional
-
-import inject
+from functools import wraps
+from typing import Iterable
 
+from pysaic.capture import CaptureSource, capture_line
+from pysaic.context import get_app_context
+from pysaic.controllers.game_input import input_file_path
 from pysaic.entities import ChatUser
-from pysaic.enums import FactionsEnum
-from pysaic.state import State
 
 logger = logging.getLogger(__name__)
 
 
 def ensure_game_is_running(func):
-    @inject.autoparams()
-    def wrapper(*args, state: State, **kwargs):
-        if state.game_location is None:
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if get_app_context().state.game_location is None:
             logger.debug('Game is not running, skipping "%s"', func.__name__)
             return
 
@@ -26,6 +26,13 @@ def ensure_game_is_running(func):
 def add_channel_message_to_game(
     faction_actor: str, author: str, highlight: str, content: str
 ):
+    context = get_app_context()
+    if not context.game_throttle.allow(
+        author,
+        context.config.game_messages_per_second,
+        priority=highlight == "True",
+    ):
+        return
     add_to_crc_input_file(
         f"Message/{faction_actor}/{author}/{highlight}/{content}"
     )
@@ -55,28 +62,20 @@ def add_error_message_to_game(content: str):
     add_to_crc_input_file(f"Error/{content}")
 
 
-@ensure_game_is_running
-def _get_chat_user_faction(faction: Optional[FactionsEnum]):
-    return faction or FactionsEnum.Anonymous
-
-
-def serialize_chat_user(chat_user: ChatUser):
-    return (
-        f"{chat_user.name.lstrip('@%+')},"
-        f"{_get_chat_user_faction(chat_user.faction)} = "
-        f"{chat_user.in_game}"
-    )
-
-
 @ensure_game_is_running
 def add_users_list_to_game(users: Iterable[ChatUser]):
     if not users:
         logger.warning("No users to update")
         return
 
-    add_to_crc_input_file(
-        f"Users/{'/'.join(serialize_chat_user(user) for user in users)}"
-    )
+    for line in get_app_context().game_roster.lines(users):
+        add_to_crc_input_file(line)
+
+
+@ensure_game_is_running
+def flush_game_digest():
+    if digest := get_app_context().game_throttle.digest():
+        add_information_message_to_game(digest)
 
 
 @ensure_game_is_running
@@ -94,10 +93,10 @@ def add_setting_to_game(setting: str, value: str):
     add_to_crc_input_file(f"Setting/{setting}/{value}")
 
 
-@inject.autoparams()
-def add_to_crc_input_file(content: str, state: State):
+def add_to_crc_input_file(content: str):
     logger.debug("Adding to crc_input.txt: %r", content)
-    with open(
-        state.game_location / "gamedata" / "configs" / "crc_input.txt", "a"
-    ) as f:
-        f.write(content + "\n")
+    capture_line(CaptureSource.GAME_INPUT, content)
+    context = get_app_context()
+    context.game_input.put(
+        input_file_path(context.state.game_location), content
+    )
@@ -0,0 +1,167 @@
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from pysaic.controllers.game_roster import DELTA_LINE_TYPES
+from pysaic.controllers.game_segments import SegmentWriter
+
+logger = logging.getLogger(__name__)
+
+INPUT_FILE = "crc_input.txt"
+# the script reads its input every 250ms, but only while the actor exists
+STALL_TIMEOUT = 2
+MAX_PENDING_MESSAGES = 50
+DELTA_PREFIXES = tuple(f"{line_type}/" for line_type in DELTA_LINE_TYPES)
+
+
+def configs_path(game_location: Path) -> Path:
+    return game_location / "gamedata" / "configs"
+
+
+def input_file_path(game_location: Path) -> Path:
+    return configs_path(game_location) / INPUT_FILE
+
+
+def compaction_key(line):
+    line_type, _, rest = line.partition("/")
+    if line_type == "Users":
+        return line_type
+    if line_type == "Setting":
+        return f"Setting/{rest.split('/', 1)[0]}"
+    return None
+
+
+def compact(lines, max_messages=MAX_PENDING_MESSAGES) -> list[str]:
+    """
+    Drops lines superseded by newer ones: every Users/ but the newest and
+    the roster deltas before it, every Setting/<name> but the newest of that
+    name and all but the last `max_messages` Message/ lines. The order of
+    kept lines is preserved.
+    """
+    seen = set()
+    messages = 0
+    kept = []
+    for line in reversed(lines):
+        if key := compaction_key(line):
+            if key in seen:
+                continue
+            seen.add(key)
+        elif line.startswith(DELTA_PREFIXES):
+            if "Users" in seen:
+                continue
+        elif line.startswith("Message/"):
+            if messages >= max_messages:
+                continue
+            messages += 1
+        kept.append(line)
+    kept.reverse()
+    return kept
+
+
+def file_size(path) -> int:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+class GameInputQueue:
+    """
+    Appends lines to the game's input file while the game reads it. The
+    script empties the file each time it reads it, so a file that keeps
+    the size we left it at for `stall_timeout` seconds means the game is
+    in a menu, a loading screen or a save. Lines are then held back and
+    compacted until the game truncates the file again.
+
+    With the segment bridge lines go to numbered segments instead and the
+    game deleting them is what counts as a read.
+    """
+
+    def __init__(
+        self,
+        stall_timeout=STALL_TIMEOUT,
+        max_messages=MAX_PENDING_MESSAGES,
+        clock=time.monotonic,
+    ):
+        self.stall_timeout = stall_timeout
+        self.max_messages = max_messages
+        self.clock = clock
+        self.pending: list[str] = []
+        self.written_size = 0
+        self.last_read_at = clock()
+        self.is_game_reading = True
+        self.written = 0
+        self.compacted = 0
+        self.stalls = 0
+        self.segments: Optional[SegmentWriter] = None
+
+    def use_segments(self, path: Path, segments: Optional[SegmentWriter]):
+        """Switches to the segment bridge, or back to the file with None."""
+        self.segments = None
+        if self.pending:
+            # held lines may tell the script to switch, it reads them first
+            self._write(path, self.pending)
+            self.pending = []
+        if segments is not None:
+            segments.reset()
+        self.segments = segments
+
+    def put(self, path: Path, line: str):
+        if self.segments is None:
+            size = file_size(path)
+            if size < self.written_size:
+                self.game_read(path, size)
+            is_idle = size == 0
+        else:
+            if self.segments.consumed():
+                self.game_read(path)
+            is_idle = not self.segments.unread
+
+        if is_idle:
+            # nothing is waiting for the game, the stall timer starts now
+            self.last_read_at = self.clock()
+        if is_idle or not self._is_stalled():
+            self._write(path, [*self.pending, line])
+            self.pending = []
+            return
+
+        if self.is_game_reading:
+            self.is_game_reading = False
+            self.stalls += 1
+            logger.info("Game is not reading its input, holding lines back")
+        self.pending.append(line)
+        pending = len(self.pending)
+        self.pending = compact(self.pending, self.max_messages)
+        self.compacted += pending - len(self.pending)
+
+    def game_read(self, path: Path, size=None):
+        """Called when the input file shrank, the game has just read it."""
+        self.last_read_at = self.clock()
+        if self.segments is not None:
+            self.segments.consumed()
+        else:
+            self.written_size = file_size(path) if size is None else size
+        if not self.is_game_reading:
+            logger.info(
+                "Game reads its input again, writing %d held lines",
+                len(self.pending),
+            )
+            self.is_game_reading = True
+        if self.pending:
+            self._write(path, self.pending)
+            self.pending = []
+
+    def _is_stalled(self) -> bool:
+        return self.clock() - self.last_read_at > self.stall_timeout
+
+    def _write(self, path: Path, lines):
+        self.written += len(lines)
+        if self.segments is not None:
+            self.segments.write(lines)
+            return
+
+        with open(path, "a") as f:
+            f.write("".join(f"{line}\n" for line in lines))
+        self.written_size = file_size(path)
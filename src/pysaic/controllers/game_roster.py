@@ -0,0 +1,77 @@
+import logging
+from typing import Iterable, Optional
+
+from pysaic.entities import ChatUser
+from pysaic.enums import FactionsEnum
+
+logger = logging.getLogger(__name__)
+
+# above this share of changed users a snapshot is cheaper than the deltas
+MAX_DELTA_SHARE = 0.5
+DELTA_LINE_TYPES = ("UserAdd", "UserDel", "UserUpd")
+
+
+def serialize_chat_user(chat_user: ChatUser):
+    # names are stored without their channel prefixes
+    return (
+        f"{chat_user.name},"
+        f"{chat_user.faction or FactionsEnum.Anonymous} = "
+        f"{chat_user.in_game}"
+    )
+
+
+class GameRoster:
+    """
+    Mirror of the game script's user table. Once the script has agreed to
+    roster deltas, only the users added, removed or changed since the
+    previous update are sent; a full `Users/` snapshot goes out after
+    every handshake and whenever most of the roster changed.
+    """
+
+    def __init__(self, max_delta_share: float = MAX_DELTA_SHARE):
+        self.max_delta_share = max_delta_share
+        self.use_deltas = False
+        # name -> serialized user, None until the game got a snapshot
+        self.users: Optional[dict[str, str]] = None
+        self.snapshots = 0
+        self.deltas = 0
+
+    def reset(self, use_deltas: bool):
+        """Called on handshake, the script starts from an empty table."""
+        self.use_deltas = use_deltas
+        self.users = None
+
+    def lines(self, users: Iterable[ChatUser]) -> list[str]:
+        current = {user.name: serialize_chat_user(user) for user in users}
+        previous = self.users
+        if not self.use_deltas:
+            return self._snapshot(current)
+        self.users = current
+        if previous is None:
+            return self._snapshot(current)
+
+        removed = [name for name in previous if name not in current]
+        added = []
+        changed = []
+        for name, user in current.items():
+            if name not in previous:
+                added.append(user)
+            elif previous[name] != user:
+                changed.append(user)
+
+        count = len(removed) + len(added) + len(changed)
+        if count > len(current) * self.max_delta_share:
+            return self._snapshot(current)
+
+        self.deltas += count
+        return [
+            f"{line_type}/{'/'.join(users)}"
+            for line_type, users in zip(
+                DELTA_LINE_TYPES, (added, removed, changed)
+            )
+            if users
+        ]
+
+    def _snapshot(self, current: dict[str, str]) -> list[str]:
+        self.snapshots += 1
+        return [f"Users/{'/'.join(current.values())}"]
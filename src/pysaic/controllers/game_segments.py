@@ -0,0 +1,100 @@
+import logging
+import os
+import re
+from collections import deque
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+INPUT_SEGMENT_PREFIX = "crc_input"
+OUTPUT_SEGMENT_PREFIX = "crc_output"
+SEGMENT_SUFFIX = ".txt"
+PARTIAL_SUFFIX = ".tmp"
+
+
+def segment_path(directory: Path, prefix: str, sequence: int) -> Path:
+    return directory / f"{prefix}_{sequence}{SEGMENT_SUFFIX}"
+
+
+def segment_sequence(path, prefix: str):
+    """Sequence number of a segment file name or None for other files."""
+    match = re.fullmatch(
+        rf"{prefix}_(\d+){re.escape(SEGMENT_SUFFIX)}", Path(path).name
+    )
+    return int(match.group(1)) if match else None
+
+
+def remove_segments(directory: Path, prefix: str):
+    for path in directory.glob(f"{prefix}_*"):
+        if path.suffix in (SEGMENT_SUFFIX, PARTIAL_SUFFIX):
+            path.unlink(missing_ok=True)
+
+
+class SegmentWriter:
+    """
+    Writes each batch of lines to its own numbered segment. A segment is
+    written under a temporary name and renamed once complete, the reader
+    deletes it after consuming it, so no file is ever shared by both ends.
+    """
+
+    def __init__(self, directory: Path, prefix: str = INPUT_SEGMENT_PREFIX):
+        self.directory = directory
+        self.prefix = prefix
+        self.sequence = 0
+        self.unread: deque[Path] = deque()
+
+    def reset(self):
+        remove_segments(self.directory, self.prefix)
+        self.sequence = 0
+        self.unread.clear()
+
+    def write(self, lines):
+        path = segment_path(self.directory, self.prefix, self.sequence)
+        partial = path.with_suffix(PARTIAL_SUFFIX)
+        with open(partial, "w") as f:
+            f.write("".join(f"{line}\n" for line in lines))
+        os.replace(partial, path)
+        self.unread.append(path)
+        self.sequence += 1
+
+    def consumed(self) -> int:
+        """Forgets segments the reader has deleted, returns their number."""
+        count = 0
+        while self.unread and not self.unread[0].exists():
+            self.unread.popleft()
+            count += 1
+        return count
+
+
+class SegmentReader:
+    """
+    Consumes complete segments in sequence order and deletes them. Gaps
+    are skipped, so a segment lost on the writer's side never stalls the
+    ones after it.
+    """
+
+    def __init__(self, directory: Path, prefix: str = OUTPUT_SEGMENT_PREFIX):
+        self.directory = directory
+        self.prefix = prefix
+        self.segments = 0
+
+    def reset(self):
+        remove_segments(self.directory, self.prefix)
+
+    def is_segment(self, path) -> bool:
+        return segment_sequence(path, self.prefix) is not None
+
+    def read(self) -> list[str]:
+        found = []
+        for path in self.directory.glob(f"{self.prefix}_*{SEGMENT_SUFFIX}"):
+            sequence = segment_sequence(path, self.prefix)
+            if sequence is not None:
+                found.append((sequence, path))
+
+        lines = []
+        for _, path in sorted(found):
+            with open(path) as f:
+                lines.extend(line.strip() for line in f)
+            path.unlink()
+            self.segments += 1
+        return [line for line in lines if line]
@@ -0,0 +1,80 @@
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# how often the lines held back are summed up for the game
+DIGEST_INTERVAL = 5
+
+
+class GameThrottle:
+    """
+    Caps the channel lines forwarded to the game, each one becomes a PDA
+    popup with a sound. A token bucket refilled `limit` times a second
+    lets short bursts through; lines over the cap are only counted and
+    reported together by `digest()`. DMs and highlights skip the bucket.
+    """
+
+    def __init__(self, digest_interval: float = DIGEST_INTERVAL, clock=None):
+        self.digest_interval = digest_interval
+        self.clock = clock or time.monotonic
+        # the bucket starts full
+        self.tokens = 0.0
+        self.refilled_at = float("-inf")
+        self.digested_at = self.clock()
+        self.held = 0
+        self.authors: set[str] = set()
+        self.sent = 0
+        self.folded = 0
+        self.dropped = 0
+        self.digests = 0
+
+    def reset(self):
+        """Called on handshake, a digest for the old session is useless."""
+        self.dropped += self.held
+        self.held = 0
+        self.authors.clear()
+        self.digested_at = self.clock()
+
+    def allow(self, author: str, limit: int, priority: bool = False) -> bool:
+        """False if the line should be folded into the next digest."""
+        if priority or limit <= 0:
+            self.sent += 1
+            return True
+
+        now = self.clock()
+        self.tokens = min(
+            float(limit), self.tokens + (now - self.refilled_at) * limit
+        )
+        self.refilled_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.sent += 1
+            return True
+
+        self.held += 1
+        self.folded += 1
+        self.authors.add(author)
+        return False
+
+    def digest(self) -> Optional[str]:
+        now = self.clock()
+        if not self.held or now - self.digested_at < self.digest_interval:
+            return None
+
+        held, authors = self.held, len(self.authors)
+        self.held = 0
+        self.authors.clear()
+        self.digested_at = now
+        self.digests += 1
+        logger.debug(
+            "Folded %d lines into a digest, %d folded, %d sent so far",
+            held,
+            self.folded,
+            self.sent,
+        )
+        return (
+            f"+{held} {'message' if held == 1 else 'messages'} from "
+            f"{authors} {'stalker' if authors == 1 else 'stalkers'}"
+        )
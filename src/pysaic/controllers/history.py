@@ -0,0 +1,56 @@
+import logging
+from datetime import datetime
+
+import inject
+
+from pysaic.history import HistoryKind, HistoryRecord, HistoryStore
+
+logger = logging.getLogger(__name__)
+
+
+@inject.autoparams()
+def add_to_history(record: HistoryRecord, store: HistoryStore):
+    store.append(record)
+
+
+def add_channel_message_to_history(
+    created_at: datetime,
+    channel: str,
+    author: str,
+    faction: str,
+    content: str,
+    highlight: bool = False,
+):
+    add_to_history(
+        HistoryRecord(
+            timestamp=created_at.timestamp(),
+            kind=HistoryKind.CHANNEL,
+            channel=channel,
+            author=author,
+            faction=faction,
+            target=channel,
+            content=content,
+            highlight=highlight,
+        )
+    )
+
+
+def add_dm_message_to_history(
+    created_at: datetime,
+    peer: str,
+    author: str,
+    faction: str,
+    target: str,
+    content: str,
+):
+    add_to_history(
+        HistoryRecord(
+            timestamp=created_at.timestamp(),
+            kind=HistoryKind.DM,
+            channel=peer,
+            author=author,
+            faction=faction,
+            target=target,
+            content=content,
+        )
+    )
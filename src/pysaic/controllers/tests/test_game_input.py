@@ -0,0 +1,122 @@
+import pytest
+
+from pysaic.controllers.game_input import GameInputQueue, compact
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return Clock()
+
+
+@pytest.fixture()
+def input_path(tmp_path):
+    return tmp_path / "crc_input.txt"
+
+
+def test_compact_keeps_newest_users_and_settings():
+    # given
+    lines = [
+        "Users/a,actor_dolg = True",
+        "Setting/NewsDuration/10",
+        "Information/Connected",
+        "Setting/ChatKey/RETURN",
+        "Users/a,actor_dolg = True/b,actor_stalker = False",
+        "Setting/NewsDuration/20",
+    ]
+
+    # when
+    compacted = compact(lines)
+
+    # then
+    assert compacted == [
+        "Information/Connected",
+        "Setting/ChatKey/RETURN",
+        "Users/a,actor_dolg = True/b,actor_stalker = False",
+        "Setting/NewsDuration/20",
+    ]
+
+
+def test_compact_drops_roster_deltas_before_a_snapshot():
+    # given
+    lines = [
+        "UserAdd/a,actor_dolg = True",
+        "Users/a,actor_dolg = True/b,actor_stalker = False",
+        "UserDel/b",
+    ]
+
+    # when
+    compacted = compact(lines)
+
+    # then
+    assert compacted == lines[1:]
+
+
+def test_compact_caps_messages():
+    # given
+    lines = [f"Message/actor_dolg/a/False/{x}" for x in range(10)]
+
+    # when
+    compacted = compact(lines, max_messages=3)
+
+    # then
+    assert compacted == lines[-3:]
+
+
+def test_lines_are_written_while_the_game_reads(input_path, clock):
+    # given
+    queue = GameInputQueue(clock=clock)
+
+    # when
+    queue.put(input_path, "Information/one")
+    clock.now = 5
+    input_path.write_text("")
+    queue.put(input_path, "Information/two")
+
+    # then
+    assert input_path.read_text() == "Information/two\n"
+    assert queue.is_game_reading
+
+
+def test_lines_are_held_and_compacted_while_the_game_is_not_reading(
+    input_path, clock
+):
+    # given
+    queue = GameInputQueue(max_messages=2, clock=clock)
+    queue.put(input_path, "Users/a,actor_dolg = True")
+    clock.now = 5
+
+    # when
+    for x in range(5):
+        queue.put(input_path, f"Users/a,actor_dolg = True/{x},actor_army = 1")
+        queue.put(input_path, f"Message/actor_dolg/a/False/{x}")
+
+    # then
+    assert input_path.read_text() == "Users/a,actor_dolg = True\n"
+    assert queue.pending == [
+        "Message/actor_dolg/a/False/3",
+        "Users/a,actor_dolg = True/4,actor_army = 1",
+        "Message/actor_dolg/a/False/4",
+    ]
+    assert queue.stalls == 1
+    assert queue.compacted == 7
+
+    # when
+    input_path.write_text("")
+    queue.game_read(input_path)
+
+    # then
+    assert input_path.read_text().splitlines() == [
+        "Message/actor_dolg/a/False/3",
+        "Users/a,actor_dolg = True/4,actor_army = 1",
+        "Message/actor_dolg/a/False/4",
+    ]
+    assert queue.pending == []
+    assert queue.is_game_reading
@@ -0,0 +1,95 @@
+import pytest
+
+from pysaic.controllers.game_roster import GameRoster
+from pysaic.entities import ChatUser
+from pysaic.enums import FactionsEnum
+
+
+def roster_of(count, in_game=False):
+    return [
+        ChatUser(name=f"user{x}", faction=FactionsEnum.Duty, in_game=in_game)
+        for x in range(count)
+    ]
+
+
+@pytest.fixture()
+def roster():
+    roster = GameRoster()
+    roster.reset(use_deltas=True)
+    return roster
+
+
+def test_first_update_is_a_snapshot(roster):
+    # when
+    lines = roster.lines(roster_of(2))
+
+    # then
+    assert lines == ["Users/user0,actor_dolg = False/user1,actor_dolg = False"]
+
+
+def test_changes_are_sent_as_deltas(roster):
+    # given
+    users = roster_of(10)
+    roster.lines(users)
+    users[3].in_game = True
+    del users[5]
+    users.append(ChatUser(name="Wolf", faction=FactionsEnum.Loner))
+
+    # when
+    lines = roster.lines(users)
+
+    # then
+    assert lines == [
+        "UserAdd/Wolf,actor_stalker = False",
+        "UserDel/user5",
+        "UserUpd/user3,actor_dolg = True",
+    ]
+    assert roster.deltas == 3
+
+
+def test_unchanged_roster_sends_nothing(roster):
+    # given
+    roster.lines(roster_of(10))
+
+    # when
+    lines = roster.lines(roster_of(10))
+
+    # then
+    assert lines == []
+
+
+def test_mostly_changed_roster_is_a_snapshot(roster):
+    # given
+    roster.lines(roster_of(10))
+
+    # when
+    lines = roster.lines(roster_of(10, in_game=True))
+
+    # then
+    assert len(lines) == 1
+    assert lines[0].startswith("Users/")
+    assert roster.snapshots == 2
+
+
+def test_handshake_resets_to_a_snapshot(roster):
+    # given
+    roster.lines(roster_of(10))
+
+    # when
+    roster.reset(use_deltas=True)
+    lines = roster.lines(roster_of(10))
+
+    # then
+    assert lines[0].startswith("Users/")
+
+
+def test_scripts_without_deltas_always_get_snapshots():
+    # given
+    roster = GameRoster()
+    roster.lines(roster_of(10))
+
+    # when
+    lines = roster.lines(roster_of(10))
+
+    # then
+    assert lines[0].startswith("Users/")
@@ -0,0 +1,132 @@
+import os
+import random
+import threading
+import time
+
+from pysaic.controllers.game_input import GameInputQueue
+from pysaic.controllers.game_segments import (
+    INPUT_SEGMENT_PREFIX,
+    OUTPUT_SEGMENT_PREFIX,
+    SegmentReader,
+    SegmentWriter,
+    segment_path,
+)
+
+LINES = 20_000
+TIMEOUT = 30
+
+
+def game_writer(directory, lines, rand):
+    """Writes like the script does: a partial file renamed into place."""
+    sequence = 0
+    while lines:
+        size = rand.randint(1, 50)
+        batch, lines = lines[:size], lines[size:]
+        path = segment_path(directory, OUTPUT_SEGMENT_PREFIX, sequence)
+        partial = path.with_suffix(".tmp")
+        with open(partial, "w") as f:
+            f.write("".join(f"{line}\n" for line in batch))
+        os.replace(partial, path)
+        sequence += 1
+
+
+def game_reader(directory, received, done):
+    """Reads like the script does: the next segment or nothing."""
+    sequence = 0
+    while not done.is_set():
+        path = segment_path(directory, INPUT_SEGMENT_PREFIX, sequence)
+        try:
+            with open(path) as f:
+                received.extend(line.strip() for line in f)
+        except FileNotFoundError:
+            time.sleep(0.001)
+            continue
+        path.unlink()
+        sequence += 1
+
+
+def test_segment_reader_reads_in_order_and_deletes(tmp_path):
+    # given
+    for sequence, content in ((1, "b\nc\n"), (0, "a\n"), (12, "d\n")):
+        segment_path(tmp_path, OUTPUT_SEGMENT_PREFIX, sequence).write_text(
+            content
+        )
+    (tmp_path / "crc_output_13.tmp").write_text("partial\n")
+    reader = SegmentReader(tmp_path)
+
+    # when
+    lines = reader.read()
+
+    # then
+    assert lines == ["a", "b", "c", "d"]
+    assert [path.name for path in tmp_path.iterdir()] == ["crc_output_13.tmp"]
+
+
+def test_segment_writer_reset_removes_stale_segments(tmp_path):
+    # given
+    segment_path(tmp_path, INPUT_SEGMENT_PREFIX, 3).write_text("old\n")
+    (tmp_path / "crc_input.txt").write_text("legacy\n")
+    writer = SegmentWriter(tmp_path)
+    writer.sequence = 4
+
+    # when
+    writer.reset()
+    writer.write(["new"])
+
+    # then
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "crc_input.txt",
+        "crc_input_0.txt",
+    ]
+    assert writer.consumed() == 0
+    segment_path(tmp_path, INPUT_SEGMENT_PREFIX, 0).unlink()
+    assert writer.consumed() == 1
+
+
+def test_no_output_lines_are_lost_under_load(tmp_path):
+    # given
+    sent = [f"Message/channel/nick/line {x}" for x in range(LINES)]
+    reader = SegmentReader(tmp_path)
+    received = []
+    game = threading.Thread(
+        target=game_writer, args=(tmp_path, sent, random.Random(1))
+    )
+
+    # when
+    game.start()
+    deadline = time.monotonic() + TIMEOUT
+    while len(received) < LINES and time.monotonic() < deadline:
+        received.extend(reader.read())
+    game.join()
+
+    # then
+    assert received == sent
+
+
+def test_no_input_lines_are_lost_under_load(tmp_path):
+    # given
+    sent = [f"Information/line {x}" for x in range(LINES // 4)]
+    path = tmp_path / "crc_input.txt"
+    # lines are held back whenever the game has not caught up yet
+    queue = GameInputQueue(stall_timeout=0)
+    queue.use_segments(path, SegmentWriter(tmp_path))
+    received = []
+    done = threading.Event()
+    game = threading.Thread(
+        target=game_reader, args=(tmp_path, received, done)
+    )
+
+    # when
+    game.start()
+    for line in sent:
+        queue.put(path, line)
+    deadline = time.monotonic() + TIMEOUT
+    while len(received) < len(sent) and time.monotonic() < deadline:
+        queue.game_read(path)
+        time.sleep(0.001)
+    done.set()
+    game.join()
+
+    # then
+    assert received == sent
+    assert queue.written == len(sent)
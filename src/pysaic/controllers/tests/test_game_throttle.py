@@ -0,0 +1,75 @@
+from pysaic.controllers.game_throttle import GameThrottle
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lines_over_the_limit_are_folded_into_a_digest():
+    # given
+    clock = Clock()
+    throttle = GameThrottle(digest_interval=5, clock=clock)
+
+    # when
+    allowed = [throttle.allow(f"stalker{x % 4}", limit=3) for x in range(10)]
+
+    # then
+    assert allowed == [True] * 3 + [False] * 7
+    assert throttle.digest() is None
+
+    # when
+    clock.now = 6
+    digest = throttle.digest()
+
+    # then
+    assert digest == "+7 messages from 4 stalkers"
+    assert throttle.digest() is None
+    assert (throttle.sent, throttle.folded, throttle.digests) == (3, 7, 1)
+
+
+def test_the_limit_refills_over_time():
+    # given
+    clock = Clock()
+    throttle = GameThrottle(clock=clock)
+    for _ in range(2):
+        throttle.allow("a", limit=2)
+
+    # when
+    clock.now = 0.5
+    allowed = [throttle.allow("a", limit=2) for _ in range(2)]
+
+    # then
+    assert allowed == [True, False]
+
+
+def test_priority_lines_and_no_limit_always_pass():
+    # given
+    throttle = GameThrottle(clock=Clock())
+
+    # when
+    allowed = [throttle.allow("a", limit=1, priority=True) for _ in range(5)]
+    allowed += [throttle.allow("a", limit=0) for _ in range(5)]
+
+    # then
+    assert all(allowed)
+    assert throttle.folded == 0
+
+
+def test_reset_drops_held_lines():
+    # given
+    clock = Clock()
+    throttle = GameThrottle(digest_interval=1, clock=clock)
+    for _ in range(3):
+        throttle.allow("a", limit=1)
+
+    # when
+    throttle.reset()
+    clock.now = 10
+
+    # then
+    assert throttle.digest() is None
+    assert (throttle.folded, throttle.dropped) == (2, 2)
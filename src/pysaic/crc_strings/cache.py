@@ -0,0 +1,79 @@
+import logging
+import marshal
+import os
+import sys
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = "crc_strings_cache.marshal"
+# marshal's format is only stable within one Python version
+CACHE_VERSION = (1, *sys.version_info[:2], marshal.version)
+
+
+def source_signature(directory: Path, filenames) -> tuple:
+    signature = []
+    for filename in filenames:
+        stat = os.stat(directory / filename)
+        signature.append((filename, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class StringsCache:
+    """
+    Resolved crc_strings tables kept in one marshal file, one entry per
+    strings directory, so the packaged files and the game's `res/`
+    overrides are both parsed once. The whole file is read on first use;
+    an entry is rebuilt when the mtime or size of one of its sources
+    differs from what it was built from.
+    """
+
+    def __init__(self, cache_file: str = CACHE_FILE):
+        self.cache_file = cache_file
+        self.entries: dict[str, tuple] = {}
+        self.is_loaded = False
+        self.hits = 0
+        self.builds = 0
+
+    def load(self):
+        self.is_loaded = True
+        try:
+            with open(self.cache_file, "rb") as f:
+                version, entries = marshal.loads(f.read())
+        except FileNotFoundError:
+            return
+        except (OSError, EOFError, ValueError, TypeError):
+            logger.warning("Ignoring unreadable %s", self.cache_file)
+            return
+        if version == CACHE_VERSION:
+            self.entries = entries
+
+    def get(self, directory: Path, filenames, build: Callable[[], dict]):
+        if not self.is_loaded:
+            self.load()
+
+        key = str(directory)
+        signature = source_signature(directory, filenames)
+        if (entry := self.entries.get(key)) and entry[0] == signature:
+            self.hits += 1
+            return entry[1]
+
+        logger.info("Building crc_strings tables from %s", directory)
+        tables = build()
+        self.builds += 1
+        self.entries[key] = (signature, tables)
+        self.save()
+        return tables
+
+    def save(self):
+        partial = f"{self.cache_file}.tmp"
+        try:
+            with open(partial, "wb") as f:
+                f.write(marshal.dumps((CACHE_VERSION, self.entries)))
+            os.replace(partial, self.cache_file)
+        except OSError:
+            logger.exception("Could not save %s", self.cache_file)
+
+
+strings_cache = StringsCache()
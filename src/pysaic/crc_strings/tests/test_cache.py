@@ -0,0 +1,80 @@
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from pysaic.crc_strings.cache import StringsCache
+
+
+@pytest.fixture()
+def source(tmp_path):
+    directory = tmp_path / "res"
+    directory.mkdir()
+    (directory / "a.xml").write_text("<root/>")
+    return directory
+
+
+@pytest.fixture()
+def cache_file(tmp_path):
+    return tmp_path / "crc_strings.marshal"
+
+
+def test_tables_are_built_once_and_read_back(source, cache_file):
+    # given
+    build = Mock(return_value={"times": ["at dawn"]})
+    StringsCache(cache_file).get(source, ["a.xml"], build)
+    cache = StringsCache(cache_file)
+
+    # when
+    tables = cache.get(source, ["a.xml"], build)
+
+    # then
+    assert tables == {"times": ["at dawn"]}
+    build.assert_called_once_with()
+    assert (cache.hits, cache.builds) == (1, 0)
+
+
+def test_tables_are_rebuilt_when_a_source_changes(source, cache_file):
+    # given
+    StringsCache(cache_file).get(source, ["a.xml"], lambda: {"v": 1})
+    stat = os.stat(source / "a.xml")
+    os.utime(source / "a.xml", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10))
+    cache = StringsCache(cache_file)
+
+    # when
+    tables = cache.get(source, ["a.xml"], lambda: {"v": 2})
+
+    # then
+    assert tables == {"v": 2}
+    assert cache.builds == 1
+    assert StringsCache(cache_file).get(source, ["a.xml"], Mock()) == {"v": 2}
+
+
+def test_directories_have_their_own_entries(source, tmp_path, cache_file):
+    # given
+    packaged = tmp_path / "packaged"
+    packaged.mkdir()
+    (packaged / "a.xml").write_text("<root></root>")
+    cache = StringsCache(cache_file)
+
+    # when
+    cache.get(source, ["a.xml"], lambda: {"from": "res"})
+    cache.get(packaged, ["a.xml"], lambda: {"from": "packaged"})
+
+    # then
+    reloaded = StringsCache(cache_file)
+    assert reloaded.get(source, ["a.xml"], Mock()) == {"from": "res"}
+    assert reloaded.get(packaged, ["a.xml"], Mock()) == {"from": "packaged"}
+
+
+def test_unreadable_cache_is_rebuilt(source, cache_file):
+    # given
+    cache_file.write_bytes(b"\x00garbage")
+    cache = StringsCache(cache_file)
+
+    # when
+    tables = cache.get(source, ["a.xml"], lambda: {"v": 1})
+
+    # then
+    assert tables == {"v": 1}
+    assert cache.builds == 1
@@ -0,0 +1,141 @@
+import os
+import shutil
+from random import Random
+from unittest.mock import patch
+
+import pytest
+
+from pysaic.crc_strings.cache import StringsCache, strings_cache
+from pysaic.crc_strings.use_case import (
+    DeathReportEngine,
+    DeathTables,
+    PATH,
+    TABLE_FILES,
+    get_engine,
+)
+from pysaic.script_reader.entities import Death
+from pysaic.settings import END_OF_ACTOR_CHARACTER, START_OF_ACTOR_CHARACTER
+
+DEATH = Death(
+    user_actor="actor_bandit",
+    location="l07_military",
+    death_by="S_ACTOR",
+    meta="actor",
+)
+
+
+@pytest.fixture(scope="module")
+def tables(tmp_path_factory):
+    cache_file = tmp_path_factory.mktemp("cache") / "crc_strings.marshal"
+    return DeathTables.load(cache=StringsCache(cache_file))
+
+
+def test_seeded_engines_repeat_themselves(tables):
+    # given
+    first = DeathReportEngine(tables, Random(42))
+    second = DeathReportEngine(tables, Random(42))
+
+    # when
+    reports = first.generate_many("Balon", DEATH, 50)
+
+    # then
+    assert reports == second.generate_many("Balon", DEATH, 50)
+    assert len(set(reports)) > 1
+
+
+def test_every_packaged_format_is_compiled(tables):
+    # when
+    engine = DeathReportEngine(tables)
+
+    # then
+    assert len(engine.formats) == len(tables.formats)
+
+
+def test_report_layout(tables):
+    # given
+    engine = DeathReportEngine(tables, Random(1))
+
+    # when
+    report = engine.generate("Balon", DEATH)
+
+    # then
+    reporter, rest = report.split(START_OF_ACTOR_CHARACTER)
+    actor, message = rest.split(END_OF_ACTOR_CHARACTER)
+    assert " " in reporter
+    assert actor.startswith("actor_")
+    assert "Balon" in message
+    assert message[0].isupper()
+    assert message.endswith(".")
+
+
+def test_unknown_location_and_cause_fall_back(tables):
+    # given
+    death = Death(
+        user_actor="actor_bandit",
+        location="unknown_level",
+        death_by="UNKNOWN",
+        meta="",
+    )
+    engine = DeathReportEngine(tables, Random(3))
+
+    # when
+    reports = engine.generate_many("Balon", death, 20)
+
+    # then
+    assert all("Balon" in report for report in reports)
+    assert any("(unknown_level)" in report for report in reports)
+
+
+def test_unknown_tags_skip_the_format(tables):
+    # given
+    tables = DeathTables(
+        **{**vars(tables), "formats": [["name", "nope"], ["when", "name"]]}
+    )
+    engine = DeathReportEngine(tables, Random(5))
+
+    # when
+    reports = engine.generate_many("Balon", DEATH, 20)
+
+    # then
+    assert engine.formats == [(engine._when, engine._name)]
+    for report in reports:
+        message = report.split(END_OF_ACTOR_CHARACTER)[1].split(".")[0]
+        assert message.endswith("Balon")
+
+
+def test_no_usable_format_is_an_error(tables):
+    # given
+    tables = DeathTables(**{**vars(tables), "formats": [["name", "nope"]]})
+
+    # when / then
+    with pytest.raises(ValueError):
+        DeathReportEngine(tables)
+
+
+def test_engine_is_built_once(tmp_path):
+    with patch.object(strings_cache, "cache_file", tmp_path / "cache"):
+        assert get_engine() is get_engine()
+
+
+def test_engine_is_rebuilt_when_a_source_changes(tmp_path):
+    # given
+    directory = tmp_path / "res"
+    directory.mkdir()
+    for filename in TABLE_FILES:
+        shutil.copy(PATH / filename, directory)
+    with patch.object(strings_cache, "cache_file", tmp_path / "cache"), patch(
+        "pysaic.crc_strings.use_case.strings_directory",
+        return_value=directory,
+    ):
+        engine = get_engine()
+
+        # when
+        stat = os.stat(directory / "death_times.xml")
+        os.utime(
+            directory / "death_times.xml",
+            ns=(stat.st_atime_ns, stat.st_mtime_ns + 10),
+        )
+
+        # then
+        assert get_engine() is not engine
+        assert get_engine() is get_engine()
@@ -5,12 +5,19 @@ import os
 import re
 import xml.etree.ElementTree as ET
 from copy import deepcopy
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from random import choice, randint
-from typing import Union
+from random import Random
+from typing import Optional, Union
 
 import inject
 
+from pysaic.crc_strings.cache import (
+    StringsCache,
+    source_signature,
+    strings_cache,
+)
 from pysaic.entities import DeathTimestamped
 from pysaic.enums import FactionsEnum
 from pysaic.script_reader.entities import Death
@@ -20,35 +27,40 @@ from pysaic.state import State
 tags_regexp = re.compile(r"(\w+)")
 
 PATH = Path(os.path.abspath(os.path.dirname(__file__)))
+TABLE_FILES = (
+    "death_formats.xml",
+    "death_levels.xml",
+    "death_observances.xml",
+    "death_times.xml",
+    "death_classes.xml",
+    "death_generic.xml",
+    "death_remarks.xml",
+    "fnames.xml",
+    "snames.xml",
+)
 
 
 logger = logging.getLogger(__name__)
 
-SENTINEL = object()
 
-
-def _load_random_name_from_file(filename):
-    return choice(choice(tuple(XMLFileController(filename).load()))).text
+def strings_directory() -> Path:
+    """The game's `res/` directory while it runs, packaged files otherwise."""
+    try:
+        state = inject.instance(State)
+    except inject.InjectorException:
+        return PATH
+    if state.is_game_running:
+        return state.game_location / "res"
+    return PATH
 
 
 def random_name():
-    return (
-        f'{_load_random_name_from_file("fnames.xml")} '
-        f'{_load_random_name_from_file("snames.xml")}'
-    )
+    return get_engine().random_name()
 
 
 class XMLFileController:
-    def __init__(self, file_path):
-        try:
-            state = inject.instance(State)
-        except inject.InjectorException:
-            self.file_path = PATH / file_path
-        else:
-            if state.is_game_running:
-                self.file_path = state.game_location / "res" / file_path
-            else:
-                self.file_path = PATH / file_path
+    def __init__(self, file_path, directory: Optional[Path] = None):
+        self.file_path = (directory or strings_directory()) / file_path
 
     def load(self):
         tree = ET.parse(self.file_path)
@@ -66,125 +78,177 @@ class XMLFileController:
             yield node_to_return
 
 
-class DeathMessageUseCase:
-    def __init__(self, nick, death: Union[Death, DeathTimestamped]):
-        self.nick = nick
-        self.death = death
-        self._tags_handlers = {
-            "name": lambda: nick,
-            "level": self._load_random_level,
-            "saw": self._load_random_saw,
-            "when": self._load_random_when,
-            "death": self._load_random_death,
+def _load_simple(filename, directory) -> list[str]:
+    return [
+        record.text for record in XMLFileController(filename, directory).load()
+    ]
+
+
+def _load_by_key(filename, directory) -> dict[str, list[str]]:
+    return {
+        record.tag: [string.text for string in record]
+        for record in XMLFileController(filename, directory).load()
+    }
+
+
+@dataclass
+class DeathTables:
+    formats: list[list[str]]
+    levels: dict[str, list[str]]
+    observances: list[str]
+    times: list[str]
+    classes: dict[str, list[str]]
+    generic: list[str]
+    remarks: list[str]
+    first_names: list[list[str]]
+    last_names: list[list[str]]
+
+    @classmethod
+    def load(
+        cls,
+        directory: Optional[Path] = None,
+        cache: Optional[StringsCache] = None,
+    ):
+        directory = directory or strings_directory()
+        return cls(
+            **(cache or strings_cache).get(
+                directory, TABLE_FILES, partial(cls.parse, directory)
+            )
+        )
+
+    @staticmethod
+    def parse(directory: Path) -> dict:
+        return {
+            "formats": [
+                tags_regexp.findall(record)
+                for record in _load_simple("death_formats.xml", directory)
+            ],
+            "levels": _load_by_key("death_levels.xml", directory),
+            "observances": _load_simple("death_observances.xml", directory),
+            "times": _load_simple("death_times.xml", directory),
+            "classes": _load_by_key("death_classes.xml", directory),
+            "generic": _load_simple("death_generic.xml", directory),
+            "remarks": _load_simple("death_remarks.xml", directory),
+            "first_names": list(
+                _load_by_key("fnames.xml", directory).values()
+            ),
+            "last_names": list(_load_by_key("snames.xml", directory).values()),
         }
 
-    def execute(self):
-        message = " ".join(
-            [
-                self._tags_handlers.get(tag, SENTINEL)()
-                for tag in choice(self._load_formats())
-            ]
+
+class DeathReportEngine:
+    """
+    Builds death reports from `DeathTables`. Each format is compiled once
+    into a tuple of slots, callables taking the nick and the death, and all
+    the randomness comes from `rand` so a seeded engine repeats itself.
+    """
+
+    def __init__(self, tables: DeathTables, rand: Optional[Random] = None):
+        self.tables = tables
+        self.random = rand or Random()
+        self.reporter_actors = tuple(
+            record.value
+            for record in FactionsEnum
+            if record is not FactionsEnum.Zombie
         )
-        if message is SENTINEL or not message:
-            logger.error("Could not generate message: %r", death)
-            raise ValueError(death)
-
-        message = f"{message}."
-        message = message[0].upper() + message[1:]
-        if randint(0, 9) == 0:
-            message = f"{message} {self._load_random_comment()}."
-
-        reporter_actor = choice(
-            [
-                record
-                for record in FactionsEnum
-                if record.name != FactionsEnum.Zombie.name
-            ]
-        ).value
+        slots = {
+            "name": self._name,
+            "level": self._level,
+            "saw": self._saw,
+            "when": self._when,
+            "death": self._death,
+        }
+        self.formats = []
+        for tags in tables.formats:
+            if not tags or not slots.keys() >= set(tags):
+                logger.warning("Skipping death format %r", tags)
+                continue
+            self.formats.append(tuple(slots[tag] for tag in tags))
+        if not self.formats:
+            raise ValueError("No usable death formats")
+
+    def generate(self, nick, death: Union[Death, DeathTimestamped]) -> str:
+        choice = self.random.choice
+        message = " ".join(slot(nick, death) for slot in choice(self.formats))
+        message = f"{message[0].upper()}{message[1:]}."
+        if self.random.randint(0, 9) == 0:
+            message = f"{message} {choice(self.tables.remarks)}."
+
         return (
-            f"{self._load_random_reporter()}"
-            f"{self._get_crcr_actor(reporter_actor)}"
+            f"{self.random_name()}"
+            f"{START_OF_ACTOR_CHARACTER}"
+            f"{choice(self.reporter_actors)}"
+            f"{END_OF_ACTOR_CHARACTER}"
             f"{message}"
         )
 
-    def _load_random_level(self):
-        return choice(self._load_levels())
+    def generate_many(self, nick, death, n: int) -> list[str]:
+        return [self.generate(nick, death) for _ in range(n)]
+
+    def random_name(self) -> str:
+        choice = self.random.choice
+        return (
+            f"{choice(choice(self.tables.first_names))} "
+            f"{choice(choice(self.tables.last_names))}"
+        )
 
     @staticmethod
-    def _parse_format(record):
-        return tags_regexp.findall(record.text)
+    def _name(nick, _death):
+        return nick
 
-    @classmethod
-    def _load_formats(cls):
-        return [
-            cls._parse_format(record)
-            for record in XMLFileController("death_formats.xml").load()
-        ]
-
-    def _load_random_saw(self):
-        return choice(self._load_saw())
-
-    def _load_levels(self):
-        try:
-            return self._load_by_key("death_levels.xml", self.death.location)
-        except StopIteration:
-            logger.warning('Could not load levels for "%r"', self.death)
-            return [f"somewhere in the Zone ({self.death.location})"]
-
-    def _load_saw(self):
-        return self._load_simple("death_observances.xml")
-
-    def _load_random_when(self):
-        return choice(self._load_when())
-
-    def _load_when(self):
-        return self._load_simple("death_times.xml")
-
-    def _load_random_death(self):
-        if randint(0, 10) == 0:
-            return choice(self._load_generic_death())
-        try:
-            return choice(self._load_death())
-        except RuntimeError:
+    def _level(self, _nick, death):
+        if levels := self.tables.levels.get(death.location):
+            return self.random.choice(levels)
+        logger.warning('Could not load levels for "%r"', death)
+        return f"somewhere in the Zone ({death.location})"
+
+    def _saw(self, _nick, _death):
+        return self.random.choice(self.tables.observances)
+
+    def _when(self, _nick, _death):
+        return self.random.choice(self.tables.times)
+
+    def _death(self, _nick, death):
+        if self.random.randint(0, 10) != 0:
+            if deaths := self.tables.classes.get(death.death_by):
+                return self.random.choice(deaths)
             logger.warning(
                 "Could not load specific death, fallback to generic"
             )
-            return choice(self._load_generic_death())
+        return self.random.choice(self.tables.generic)
 
-    def _load_death(self):
-        return self._load_by_key("death_classes.xml", self.death.death_by)
 
-    def _load_random_comment(self):
-        return choice(self._load_simple("death_remarks.xml"))
+# strings directory -> (signature of its sources, engine)
+_engines: dict[Path, tuple[tuple, DeathReportEngine]] = {}
 
-    def _load_generic_death(self):
-        return self._load_simple("death_generic.xml")
 
-    @staticmethod
-    def _load_simple(filename):
-        return [record.text for record in XMLFileController(filename).load()]
+def get_engine() -> DeathReportEngine:
+    """
+    One engine per strings directory, built on first use and rebuilt when
+    one of its source XMLs changes.
+    """
+    directory = strings_directory()
+    signature = source_signature(directory, TABLE_FILES)
+    cached = _engines.get(directory)
+    if cached is None or cached[0] != signature:
+        cached = signature, DeathReportEngine(DeathTables.load(directory))
+        _engines[directory] = cached
+    return cached[1]
 
-    @staticmethod
-    def _load_by_key(filename, key):
-        logger.debug("Loading %r by key %r", filename, key)
-        return [
-            record.text
-            for record in next(
-                record
-                for record in XMLFileController(filename).load()
-                if record.tag == key
-            )
-        ]
 
-    def _load_random_reporter(self):
-        return random_name()
+class DeathMessageUseCase:
+    def __init__(
+        self,
+        nick,
+        death: Union[Death, DeathTimestamped],
+        engine: Optional[DeathReportEngine] = None,
+    ):
+        self.nick = nick
+        self.death = death
+        self.engine = engine
 
-    def _get_crcr_actor(self, reporter_actor):
-        return (
-            f"{START_OF_ACTOR_CHARACTER}"
-            f"{reporter_actor}"
-            f"{END_OF_ACTOR_CHARACTER}"
-        )
+    def execute(self):
+        return (self.engine or get_engine()).generate(self.nick, self.death)
 
 
 if __name__ == "__main__":
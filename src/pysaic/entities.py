@@ -1,3 +1,5 @@
+import sys
+import time
 from asyncio import Queue
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -15,99 +17,114 @@ class OutgoingQueue(Queue):
     pass
 
 
-@dataclass
-class OutgoingMessage:
+# events only keep an integer timestamp, it is turned into a date when the
+# event is displayed or stored. It is read from the wall clock and not the
+# monotonic one, which stops during a suspend and does not follow clock
+# changes, so dates derived from it would drift in a long running daemon
+def wall_clock(timestamp_ns: int) -> datetime:
+    return datetime.fromtimestamp(timestamp_ns / 1e9)
+
+
+def to_timestamp_ns(date: datetime) -> int:
+    return int(date.timestamp() * 1e9)
+
+
+@dataclass(slots=True)
+class Timestamped:
+    timestamp_ns: int = field(default_factory=time.time_ns, kw_only=True)
+
+    @property
+    def created_at(self) -> datetime:
+        return wall_clock(self.timestamp_ns)
+
+    @created_at.setter
+    def created_at(self, date: datetime):
+        self.timestamp_ns = to_timestamp_ns(date)
+
+
+@dataclass(slots=True)
+class OutgoingMessage(Timestamped):
     target: str
     content: str
-    created_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
-class OutgoingQuery:
+@dataclass(slots=True)
+class OutgoingQuery(Timestamped):
     target: str
     content: str
-    created_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
-class OutgoingNotice:
+@dataclass(slots=True)
+class OutgoingNotice(Timestamped):
     target: str
     content: str
-    created_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
-class OutgoingNick:
+@dataclass(slots=True)
+class OutgoingNick(Timestamped):
     nick: str
-    created_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
-class OutgoingJoin:
+@dataclass(slots=True)
+class OutgoingJoin(Timestamped):
     channel: str
-    created_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
-class OutgoingPart:
+@dataclass(slots=True)
+class OutgoingPart(Timestamped):
     channel: str
     content: str = ""
-    created_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
-class IncomingMessage:
+@dataclass(slots=True)
+class IncomingMessage(Timestamped):
     author: str
     target: str
     content: str
-    created_at: datetime = field(default_factory=datetime.now)
     service: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class IrcEvent:
     type: IrcEvents
     payload: Optional[dict[str, any]] = None
 
 
-@dataclass
-class InformationEvent:
+@dataclass(slots=True)
+class InformationEvent(Timestamped):
     content: str
-    created_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorEvent(InformationEvent):
     pass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AppEvent:
     what: AppEventEnum
     payload: Optional[Any] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GameEvent:
     what: GameEvents
     payload: Optional[Any] = None
 
 
-@dataclass
-class IncomingAppEvent:
+@dataclass(slots=True)
+class IncomingAppEvent(Timestamped):
     author: str
     target: str
     event: [AppEventEnum, GameEvents, IrcEvent, InformationEvent, ErrorEvent]
     payload: Optional[Any] = None
-    created_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
-class IncomingEvent:
+@dataclass(slots=True)
+class IncomingEvent(Timestamped):
     author: str
     target: str
     event: Union[IrcEvent, InformationEvent, AppEvent, ErrorEvent, GameEvent]
-    created_at: datetime = field(default_factory=datetime.now)
 
     @classmethod
     def create_information_event(cls, content: str):
@@ -150,12 +167,25 @@ class IncomingEvent:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatUser:
+    # one record per nick of every joined channel, so it is kept small:
+    # no __dict__, interned strings and enum members shared by all users
     name: str
     in_game: bool = False
     faction: FactionsEnum = field(default=FactionsEnum.Anonymous)
     irc_mode: str = ""
+    away: bool = False
+
+    def __post_init__(self):
+        self.name = sys.intern(self.name)
+        self.irc_mode = sys.intern(self.irc_mode)
+
+    def rename(self, name):
+        self.name = sys.intern(name)
+
+    def set_irc_mode(self, irc_mode):
+        self.irc_mode = sys.intern(irc_mode or "")
 
 
 # Unknown type: Death/actor_killer/l04_darkvalley/ARMY/sim_default_military_1
@@ -32,6 +32,8 @@ class IrcEvents(Enum):
     NO_SUCH_USER = "401"
     BANNED_FROM_CHANNEL = "474"
     NOT_IN_THE_CHANNEL = "404"
+    BATCH = "BATCH"
+    AWAY = "AWAY"
 
 
 class FactionsEnum(Enum):
@@ -70,3 +72,4 @@ class AppEventEnum(Enum):
     ACTOR_UPDATE = auto()
     IN_GAME = auto()
     UPDATE_USERS = auto()
+    LOAD_HISTORY = auto()
@@ -4,6 +4,8 @@ import logging
 import inject
 from irclib.parser import Message
 
+from pysaic.capabilities import NETSPLIT_BATCHES, message_time
+from pysaic.capture import CaptureSource, capture_line
 from pysaic.entities import (
     AppEvent,
     IncomingEvent,
@@ -14,30 +16,30 @@ from pysaic.entities import (
 )
 from pysaic.enums import AppEventEnum, IrcEvents
 from pysaic.log.utils import escape_stand_and_end
+from pysaic.modes import ChannelModes
+from pysaic.startup import mark
 from pysaic.state import State
-from pysaic.use_cases.common import join_previous_channel
+from pysaic.use_cases.common import join_channels
 from pysaic.use_cases.ui.incoming_event import IncomingNewEventUseCase
 
 logger = logging.getLogger(__name__)
 
 
-@inject.autoparams()
-async def put_connected(incoming_queue: IncomingQueue):
+async def put_connected(channel, incoming_queue: IncomingQueue):
     await incoming_queue.put(
         IncomingEvent(
             author="",
-            target="",
+            target=channel,
             event=AppEvent(what=AppEventEnum.CONNECTED),
         )
     )
 
 
-@inject.autoparams()
-async def put_disconnected(incoming_queue: IncomingQueue):
+async def put_disconnected(channel, incoming_queue: IncomingQueue):
     await incoming_queue.put(
         IncomingEvent(
             author="",
-            target="",
+            target=channel,
             event=AppEvent(what=AppEventEnum.DISCONNECTED_FROM_PDA_NETWORK),
         )
     )
@@ -47,8 +49,9 @@ async def handle_welcome_message(
     conn, _message, config, state, outgoing_queue
 ):
     logger.info("Waiting for identification to complete")
+    mark("connected")
     state.got_welcome_message.set()
-    join_previous_channel()
+    join_channels(outgoing_queue, config)
 
 
 @inject.autoparams()
@@ -109,6 +112,9 @@ async def handle_ctcp(_conn, message, incoming_queue):
 
 
 async def handle_notice(conn, message, config, incoming_queue, state):
+    if state.ignores.is_ignored(message):
+        return
+
     if (
         message.prefix
         and message.prefix.nick == "NickServ"
@@ -171,14 +177,21 @@ async def handle_part_event(conn, message, incoming_queue):
     )
 
 
-async def handle_end_of_names(conn, _message, incoming_queue, config):
-    logger.info("Asking about user data")
-    conn.send(f"PRIVMSG {config.server.previous_channel} :\001USERDATA\001")
+async def handle_end_of_names(
+    conn, message, incoming_queue, config, state: State
+):
+    channel = message.parameters[1]
+    logger.info("Asking about user data in %s", channel)
+    conn.send(f"PRIVMSG {channel} :\001USERDATA\001")
+    # the whole NAMES reply is committed to the roster at once
     await incoming_queue.put(
         IncomingEvent(
             author="pysaic",
-            target=config.server.previous_channel,
-            event=AppEvent(what=AppEventEnum.UPDATE_USERS),
+            target=channel,
+            event=IrcEvent(
+                type=IrcEvents.NAMES,
+                payload={"nicks": state.pending_names.pop(channel, {})},
+            ),
         )
     )
 
@@ -196,6 +209,13 @@ async def handle_channel_topic(conn, message, incoming_queue, config):
 
 
 async def handle_simple_event(_conn, message, incoming_queue, state: State):
+    if state.batches.collect(message):
+        return
+
+    # quits still go through, the user may be in the roster from NAMES
+    if message.command == "JOIN" and state.ignores.is_ignored(message):
+        return
+
     if not state.is_in_channel.is_set():
         state.is_in_channel.set()
 
@@ -208,32 +228,66 @@ async def handle_simple_event(_conn, message, incoming_queue, state: State):
     )
 
 
-async def handle_nick_change_event(_conn, message, incoming_queue):
+async def handle_batch(_conn, message, incoming_queue, state: State):
+    batch = state.batches.handle(message)
+    if batch is None or batch.type not in NETSPLIT_BATCHES:
+        return
+
+    logger.info("Applying %s of %d users", batch.type, len(batch.messages))
+    await incoming_queue.put(
+        IncomingEvent(
+            author="",
+            target="",
+            event=IrcEvent(
+                type=IrcEvents.BATCH,
+                payload={
+                    "type": batch.type,
+                    "quits": [
+                        message.prefix.nick
+                        for message in batch.messages
+                        if message.command == "QUIT"
+                    ],
+                    "joins": [
+                        (message.prefix.nick, message.parameters[0])
+                        for message in batch.messages
+                        if message.command == "JOIN"
+                    ],
+                },
+            ),
+        )
+    )
+
+
+async def handle_away(_conn, message, incoming_queue):
     await incoming_queue.put(
         IncomingEvent(
             author=message.prefix.nick,
-            target=message.parameters[0],
+            target="",
             event=IrcEvent(
-                type=IrcEvents[message.command],
-                payload={"new_nick": message.parameters[0]},
+                type=IrcEvents.AWAY,
+                payload={"away": bool(message.parameters)},
             ),
         )
     )
 
 
-async def handle_names(_conn, message, incoming_queue):
+async def handle_nick_change_event(_conn, message, incoming_queue):
     await incoming_queue.put(
         IncomingEvent(
             author=message.prefix.nick,
-            target=message.parameters[2],
+            target=message.parameters[0],
             event=IrcEvent(
-                type=IrcEvents(message.command),
-                payload={"nicks": filter(bool, message.parameters[3].split())},
+                type=IrcEvents[message.command],
+                payload={"new_nick": message.parameters[0]},
             ),
         )
     )
 
 
+async def handle_names(_conn, message, state: State):
+    state.stage_names(message.parameters[2], message.parameters[3].split())
+
+
 async def handle_user_banned(conn, message, incoming_queue):
     logger.error("User banned: %r", message.parameters[1])
     await incoming_queue.put(
@@ -252,14 +306,23 @@ async def handle_command(conn, message, message_list):
     pass
 
 
-async def handle_privmsg(_conn, message, incoming_queue):
-    await incoming_queue.put(
-        IncomingMessage(
-            author=message.prefix.nick,
-            target=message.parameters[0],
-            content=message.parameters[1],
-        )
+async def handle_privmsg(_conn, message, incoming_queue, state: State):
+    if state.ignores.is_ignored(message):
+        return
+
+    content = message.parameters[1]
+    is_ctcp = content.startswith("\x01") and content.endswith("\x01")
+    if not is_ctcp and state.ignores.is_filtered(content):
+        return
+
+    incoming_message = IncomingMessage(
+        author=message.prefix.nick,
+        target=message.parameters[0],
+        content=message.parameters[1],
     )
+    if server_time := message_time(message):
+        incoming_message.created_at = server_time
+    await incoming_queue.put(incoming_message)
     # logger.info(
     #     "Received message from %s: %s",
     #     message.prefix.nick,
@@ -267,20 +330,31 @@ async def handle_privmsg(_conn, message, incoming_queue):
     # )
 
 
-async def handle_mode(_conn, message, incoming_queue):
-    if len(message.parameters) < 3:
+async def handle_mode(conn, message, incoming_queue):
+    target, *parameters = message.parameters
+    if not target.startswith("#") or len(parameters) < 2:
+        return
+
+    channel_modes = ChannelModes.from_server(conn.server)
+    # only the prefix modes change the roster, +b, +k and the like do not
+    changes = [
+        change
+        for change in channel_modes.parse(parameters[0], parameters[1:])
+        if change.mode in channel_modes.prefixes
+    ]
+    if not changes:
         return
 
     await incoming_queue.put(
         IncomingEvent(
             author=message.prefix.nick,
-            target=message.parameters[0],
+            target=target,
             event=IrcEvent(
                 type=IrcEvents[message.command],
                 payload={
-                    "parameters": message.parameters[1:],
-                    "mode": message.parameters[1],
-                    "nick": message.parameters[2],
+                    "parameters": parameters,
+                    "changes": changes,
+                    "channel_modes": channel_modes,
                 },
             ),
         )
@@ -305,7 +379,7 @@ async def handle_kick(conn, message, config, incoming_queue):
         )
     )
     if message.parameters[1] == config.nick:
-        conn.send(f"JOIN {config.server.previous_channel}")
+        conn.send(f"JOIN {message.parameters[0]}")
 
 
 def handle_incoming_event(state, event, ui, pysaic_config):
@@ -314,7 +388,7 @@ def handle_incoming_event(state, event, ui, pysaic_config):
 
 def handle_not_in_channel(state, outgoing_queue, config):
     state.is_in_channel.clear()
-    join_previous_channel(outgoing_queue, config)
+    join_channels(outgoing_queue, config)
 
 
 def log_event(message):
@@ -329,6 +403,7 @@ def log_event(message):
 
 
 async def log_all_events(_conn, message: Message, *args):
+    capture_line(CaptureSource.IRC, str(message))
     log_event(message)
 
 
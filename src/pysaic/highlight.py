@@ -0,0 +1,100 @@
+import logging
+import re
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# nicks may contain []\`^{}| so \b is not enough to delimit them
+WORD_START = r"(?<![\w\[\]\\`^{}|-])"
+WORD_END = r"(?![\w\[\]\\`^{}|-])"
+
+
+def faction_words(faction) -> list[str]:
+    """`FactionsEnum.Clear_Sky` is written "Clear Sky" in chat."""
+    if faction is None:
+        return []
+    return [faction.name.replace("_", " ")]
+
+
+def can_nest(pattern: str) -> bool:
+    """
+    Whether a valid regex keeps its meaning inside a bigger alternation:
+    its own groups would be renumbered or clash with the others and global
+    inline flags like `(?i)` are only allowed at the very start.
+    """
+    try:
+        return re.compile(f"(?:{pattern})").groups == 0
+    except re.error:
+        return False
+
+
+class HighlightMatcher:
+    """
+    Every highlight keyword compiled into one case-insensitive alternation:
+    words (the nick, aliases, faction names, custom words) only match as
+    whole words, patterns are regexes used as they are. Patterns that can't
+    be nested in the alternation are tried one by one after it.
+    """
+
+    def __init__(self, words=(), patterns=()):
+        alternatives = []
+        self.separate: list[re.Pattern] = []
+        if words := sorted({word for word in words if word}, key=len):
+            alternatives.append(
+                WORD_START
+                + "(?:"
+                + "|".join(map(re.escape, reversed(words)))
+                + ")"
+                + WORD_END
+            )
+        for pattern in patterns:
+            try:
+                regex = re.compile(pattern, re.IGNORECASE)
+            except re.error:
+                logger.error("Ignoring invalid highlight pattern %r", pattern)
+                continue
+            if can_nest(pattern):
+                alternatives.append(f"(?:{pattern})")
+            else:
+                self.separate.append(regex)
+
+        self.regex: Optional[re.Pattern] = None
+        if alternatives:
+            self.regex = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def matches(self, text: str) -> bool:
+        if self.regex is not None and self.regex.search(text) is not None:
+            return True
+        return any(regex.search(text) for regex in self.separate)
+
+
+class Highlighter:
+    """Keeps the matcher of the current nick and config, rebuilt on change."""
+
+    def __init__(self):
+        self.key = None
+        self.matcher = HighlightMatcher()
+        self.builds = 0
+
+    def get_matcher(self, nick, config) -> HighlightMatcher:
+        faction = config.current_faction if config.highlight_faction else None
+        key = (
+            nick,
+            tuple(config.highlight_aliases),
+            tuple(config.highlight_words),
+            tuple(config.highlight_patterns),
+            faction,
+        )
+        if key != self.key:
+            self.key = key
+            self.matcher = HighlightMatcher(
+                words=[
+                    nick,
+                    *config.highlight_aliases,
+                    *config.highlight_words,
+                    *faction_words(faction),
+                ],
+                patterns=config.highlight_patterns,
+            )
+            self.builds += 1
+        return self.matcher
@@ -0,0 +1,3 @@
+from .store import HistoryCursor, HistoryKind, HistoryRecord, HistoryStore
+
+__all__ = ["HistoryCursor", "HistoryKind", "HistoryRecord", "HistoryStore"]
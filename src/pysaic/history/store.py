@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from collections import deque
+from dataclasses import astuple, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# timestamp, offset of the line in the day log, crc32 of the channel
+INDEX_RECORD = struct.Struct("<dQI")
+LOG_SUFFIX = ".log"
+INDEX_SUFFIX = ".idx"
+
+
+class HistoryKind:
+    CHANNEL = "channel"
+    DM = "dm"
+
+
+@dataclass
+class HistoryRecord:
+    timestamp: float
+    kind: str
+    channel: str
+    author: str
+    faction: str
+    target: str
+    content: str
+    highlight: bool = False
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp)
+
+    @property
+    def day(self) -> str:
+        return self.created_at.strftime("%Y-%m-%d")
+
+    def to_line(self) -> bytes:
+        return (
+            json.dumps(
+                astuple(self), ensure_ascii=False, separators=(",", ":")
+            )
+            + "\n"
+        ).encode()
+
+    @classmethod
+    def from_line(cls, line: bytes):
+        return cls(*json.loads(line))
+
+
+def channel_key(channel: str) -> int:
+    return zlib.crc32(channel.lower().encode())
+
+
+@dataclass
+class HistoryCursor:
+    """Position of the oldest record that was already read."""
+
+    day: str
+    position: int
+
+
+class HistoryStore:
+    def __init__(self, path=os.path.join(".", "history")):
+        self.path = Path(path)
+        self.pending: deque[HistoryRecord] = deque()
+        # the writer task flushes in the executor while /search and the
+        # shutdown flush run on the loop thread, index offsets come from
+        # the log size so one flush must finish before the next starts
+        self._write_lock = threading.Lock()
+
+    def append(self, record: HistoryRecord):
+        self.pending.append(record)
+
+    def has_pending(self) -> bool:
+        return bool(self.pending)
+
+    def write_pending(self):
+        with self._write_lock:
+            self._write_pending()
+
+    def _write_pending(self):
+        if not self.pending:
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        by_day: dict[str, list[HistoryRecord]] = {}
+        while self.pending:
+            record = self.pending.popleft()
+            by_day.setdefault(record.day, []).append(record)
+
+        for day, records in by_day.items():
+            with open(self._log_path(day), "ab") as log, open(
+                self._index_path(day), "ab"
+            ) as index:
+                offset = log.tell()
+                lines = []
+                entries = []
+                for record in records:
+                    line = record.to_line()
+                    lines.append(line)
+                    entries.append(
+                        INDEX_RECORD.pack(
+                            record.timestamp,
+                            offset,
+                            channel_key(record.channel),
+                        )
+                    )
+                    offset += len(line)
+                log.write(b"".join(lines))
+                index.write(b"".join(entries))
+        logger.debug("Wrote %d history days", len(by_day))
+
+    def days(self) -> list[str]:
+        try:
+            return sorted(
+                name[: -len(INDEX_SUFFIX)]
+                for name in os.listdir(self.path)
+                if name.endswith(INDEX_SUFFIX)
+            )
+        except FileNotFoundError:
+            return []
+
+    def read_last(
+        self, count: int, cursor: Optional[HistoryCursor] = None
+    ) -> tuple[list[HistoryRecord], Optional[HistoryCursor]]:
+        """
+        Returns up to `count` records older than `cursor` in chronological
+        order together with a cursor for the next page. Only the tail of the
+        index is read, so the cost does not depend on the history size.
+        """
+        records: list[HistoryRecord] = []
+        days = self.days()
+        if cursor is not None:
+            days = [day for day in days if day <= cursor.day]
+
+        for day in reversed(days):
+            if cursor is not None and day == cursor.day:
+                end = cursor.position
+            else:
+                end = self._index_size(day)
+            start = max(0, end - (count - len(records)))
+            records[:0] = self._read_range(day, start, end)
+            cursor = HistoryCursor(day, start)
+            if len(records) >= count:
+                break
+
+        if cursor is not None and cursor.position == 0:
+            older = [day for day in days if day < cursor.day]
+            if not older:
+                cursor = None
+        return records, cursor
+
+    def search(
+        self,
+        text: str,
+        channel: Optional[str] = None,
+        limit: int = 20,
+    ) -> list[HistoryRecord]:
+        """Newest records first, filtered on the index before the log."""
+        text = text.lower()
+        key = channel_key(channel) if channel else None
+        found = []
+        for day in reversed(self.days()):
+            entries = self._read_index(day, 0, self._index_size(day))
+            with open(self._log_path(day), "rb") as log:
+                for _, offset, entry_key in reversed(entries):
+                    if key is not None and entry_key != key:
+                        continue
+                    log.seek(offset)
+                    record = HistoryRecord.from_line(log.readline())
+                    if text in record.content.lower():
+                        found.append(record)
+                        if len(found) >= limit:
+                            return found
+        return found
+
+    def _read_range(self, day, start, end) -> list[HistoryRecord]:
+        if start >= end:
+            return []
+
+        entries = self._read_index(day, start, end)
+        with open(self._log_path(day), "rb") as log:
+            log.seek(entries[0][1])
+            return [HistoryRecord.from_line(log.readline()) for _ in entries]
+
+    def _read_index(self, day, start, end):
+        with open(self._index_path(day), "rb") as index:
+            index.seek(start * INDEX_RECORD.size)
+            data = index.read((end - start) * INDEX_RECORD.size)
+        return list(INDEX_RECORD.iter_unpack(data))
+
+    def _index_size(self, day) -> int:
+        return os.path.getsize(self._index_path(day)) // INDEX_RECORD.size
+
+    def _log_path(self, day) -> Path:
+        return self.path / f"{day}{LOG_SUFFIX}"
+
+    def _index_path(self, day) -> Path:
+        return self.path / f"{day}{INDEX_SUFFIX}"
@@ -0,0 +1,96 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from pysaic.history import HistoryKind, HistoryRecord, HistoryStore
+
+
+@pytest.fixture()
+def store(tmp_path):
+    return HistoryStore(tmp_path)
+
+
+def create_record(day, second, channel="#crcr_english", content="hello"):
+    return HistoryRecord(
+        timestamp=datetime(2024, 5, day, 12, 0, second).timestamp(),
+        kind=HistoryKind.CHANNEL,
+        channel=channel,
+        author="brzys",
+        faction="Loner",
+        target=channel,
+        content=content,
+    )
+
+
+def test_read_last_pages_backwards_across_days(store):
+    # given
+    records = [create_record(1, second) for second in range(3)] + [
+        create_record(2, second) for second in range(2)
+    ]
+    for record in records:
+        store.append(record)
+    store.write_pending()
+
+    # when
+    last_page, cursor = store.read_last(3)
+    previous_page, cursor = store.read_last(3, cursor)
+
+    # then
+    assert last_page == records[2:]
+    assert previous_page == records[:2]
+    assert cursor is None
+
+
+def test_read_last_without_history(store):
+    # when
+    records, cursor = store.read_last(10)
+
+    # then
+    assert records == []
+    assert cursor is None
+
+
+def test_search_filters_by_channel_and_text(store):
+    # given
+    store.append(create_record(1, 0, content="Meet at Rostok"))
+    store.append(create_record(1, 1, "#pysaic_english", "rostok again"))
+    store.append(create_record(1, 2, content="nothing here"))
+    store.write_pending()
+
+    # when
+    everywhere = store.search("rostok")
+    in_channel = store.search("rostok", "#crcr_english")
+
+    # then
+    assert [record.content for record in everywhere] == [
+        "rostok again",
+        "Meet at Rostok",
+    ]
+    assert [record.content for record in in_channel] == ["Meet at Rostok"]
+
+
+def test_concurrent_flushes_keep_index_offsets(store):
+    # given
+    records = [
+        create_record(1, second % 60, content=f"line {second}")
+        for second in range(20_000)
+    ]
+    start = threading.Barrier(8)
+
+    def flush():
+        start.wait()
+        store.write_pending()
+
+    flushers = [threading.Thread(target=flush) for _ in range(8)]
+    for record in records:
+        store.append(record)
+
+    # when
+    for flusher in flushers:
+        flusher.start()
+    for flusher in flushers:
+        flusher.join()
+
+    # then
+    assert store.read_last(len(records))[0] == records
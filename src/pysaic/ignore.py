@@ -0,0 +1,139 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from irclib.parser import Message
+
+from pysaic.highlight import can_nest
+from pysaic.script_reader.entities import IrcUser
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class IgnoreRule:
+    pattern: str
+    hits: int = 0
+
+
+def mask_to_regex(mask: str) -> str:
+    """`nick!user@host` glob, a bare nick stands for `nick!*@*`."""
+    if "!" not in mask and "@" not in mask:
+        mask = f"{mask}!*@*"
+    return "".join(
+        {"*": ".*", "?": "."}.get(char, re.escape(char)) for char in mask
+    )
+
+
+class RuleMatcher:
+    """
+    Rules compiled into one regex with a named group per rule, so the rule
+    that matched gets its hit counted. Patterns that can't be nested in it
+    are compiled on their own and tried after it.
+    """
+
+    def __init__(self, rules, to_regex):
+        self.rules = rules
+        alternatives = []
+        self.separate: list[tuple[int, re.Pattern]] = []
+        for index, rule in enumerate(rules):
+            regex = to_regex(rule.pattern)
+            if can_nest(regex):
+                alternatives.append(f"(?P<r{index}>{regex})")
+            else:
+                self.separate.append((index, re.compile(regex, re.IGNORECASE)))
+        self.regex: Optional[re.Pattern] = None
+        if alternatives:
+            self.regex = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def fullmatch(self, text: str) -> bool:
+        return self._hit(text, "fullmatch")
+
+    def search(self, text: str) -> bool:
+        return self._hit(text, "search")
+
+    def _hit(self, text, method) -> bool:
+        index = None
+        if self.regex is not None:
+            if match := getattr(self.regex, method)(text):
+                index = int(match.lastgroup[1:])
+        if index is None:
+            index = next(
+                (
+                    i
+                    for i, regex in self.separate
+                    if getattr(regex, method)(text)
+                ),
+                None,
+            )
+        if index is None:
+            return False
+        self.rules[index].hits += 1
+        return True
+
+
+def _compile(rules, to_regex) -> Optional[RuleMatcher]:
+    return RuleMatcher(rules, to_regex) if rules else None
+
+
+class IgnoreList:
+    """
+    Ignored nick/host masks and content filters, each kind compiled into
+    a `RuleMatcher`. Checked in the IRC handlers before anything is
+    enqueued.
+    """
+
+    def __init__(self, masks=(), filters=()):
+        self.masks = [IgnoreRule(mask) for mask in masks]
+        self.filters = []
+        for pattern in filters:
+            self.add_filter(pattern)
+        self._compile()
+
+    def _compile(self):
+        self._masks = _compile(self.masks, mask_to_regex)
+        self._filters = _compile(self.filters, lambda pattern: pattern)
+
+    def is_ignored(self, message: Message) -> bool:
+        if self._masks is None or not message.prefix:
+            return False
+        return self._masks.fullmatch(IrcUser.from_prefix(message.prefix).mask)
+
+    def is_filtered(self, content: str) -> bool:
+        if self._filters is None:
+            return False
+        return self._filters.search(content)
+
+    def add_mask(self, mask: str) -> bool:
+        if any(rule.pattern == mask for rule in self.masks):
+            return False
+        self.masks.append(IgnoreRule(mask))
+        self._compile()
+        return True
+
+    def add_filter(self, pattern: str) -> bool:
+        if any(rule.pattern == pattern for rule in self.filters):
+            return False
+        try:
+            re.compile(pattern)
+        except re.error:
+            logger.error("Ignoring invalid filter %r", pattern)
+            return False
+        self.filters.append(IgnoreRule(pattern))
+        self._compile()
+        return True
+
+    def remove_mask(self, mask: str) -> bool:
+        return self._remove(self.masks, mask)
+
+    def remove_filter(self, pattern: str) -> bool:
+        return self._remove(self.filters, pattern)
+
+    def _remove(self, rules, pattern) -> bool:
+        for rule in rules:
+            if rule.pattern == pattern:
+                rules.remove(rule)
+                self._compile()
+                return True
+        return False
@@ -0,0 +1,186 @@
+import asyncio
+import bisect
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Optional
+
+from pysaic.profiler import frame_label
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 0.1
+STALL_THRESHOLD = 0.25
+# one minute of heartbeats
+WINDOW = 600
+STATUS_INTERVAL = 1
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, float("inf"))
+APP_PACKAGE = "pysaic."
+
+coroutine_regex = re.compile(r"coro=<([\w.<>]+)\(\)")
+created_at_regex = re.compile(r"created at ([^>]+)>")
+
+
+def callback_site(handle: str) -> str:
+    """Groups asyncio's description of a handle by what it runs."""
+    if match := coroutine_regex.search(handle):
+        return match.group(1)
+    if match := created_at_regex.search(handle):
+        return match.group(1)
+    return re.sub(r" at 0x[0-9a-f]+", "", handle)[:120]
+
+
+def stack_site(frame) -> str:
+    """The innermost frame of the app and the frame it is blocked in."""
+    leaf = frame_label(frame)
+    while frame is not None:
+        if frame.f_globals.get("__name__", "").startswith(APP_PACKAGE):
+            app = frame_label(frame)
+            return app if app == leaf else f"{app} > {leaf}"
+        frame = frame.f_back
+    return leaf
+
+
+class LagHistogram:
+    """Rolling window of scheduling delays, in seconds."""
+
+    def __init__(self, window: int = WINDOW):
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def add(self, lag: float):
+        self.samples.append(lag)
+
+    def counts(self) -> list[tuple[float, int]]:
+        counts = [0] * len(BUCKETS)
+        for lag in self.samples:
+            counts[bisect.bisect_left(BUCKETS, lag)] += 1
+        return list(zip(BUCKETS, counts))
+
+    def percentile(self, share: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class LoopMonitor:
+    """
+    A heartbeat scheduled every `interval` measures how late the loop
+    runs it. While a beat is overdue a watchdog thread samples the main
+    thread's stack, so a stall is attributed to the code that blocked
+    the loop. With `debug`, asyncio's own slow callback reports are
+    counted too, they name the callback but debug mode slows the loop.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        interval: float = HEARTBEAT_INTERVAL,
+        threshold: float = STALL_THRESHOLD,
+        on_status: Optional[Callable[[str], None]] = None,
+        status_interval: float = STATUS_INTERVAL,
+        debug: bool = False,
+    ):
+        self.loop = loop
+        self.interval = interval
+        self.threshold = threshold
+        self.on_status = on_status
+        self.status_interval = status_interval
+        self.debug = debug
+        self.histogram = LagHistogram()
+        # callsite -> number and total seconds of stalls
+        self.stalls: Counter[str] = Counter()
+        self.stalled_for: Counter[str] = Counter()
+        self.last_beat = time.monotonic()
+        self.blocked_in: Optional[str] = None
+        self.thread_id = threading.get_ident()
+        self.stopped = threading.Event()
+        self.slow_callbacks = SlowCallbackHandler(self)
+
+    async def run(self):
+        if self.debug:
+            self.loop.set_debug(True)
+            self.loop.slow_callback_duration = self.threshold
+            logging.getLogger("asyncio").addHandler(self.slow_callbacks)
+        if hasattr(sys, "_current_frames"):
+            threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            ).start()
+        status_at = self.loop.time()
+        worst = 0.0
+        try:
+            while True:
+                expected = self.loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, self.loop.time() - expected)
+                self.beat(lag)
+                worst = max(worst, lag)
+                if self.loop.time() - status_at >= self.status_interval:
+                    self._show_status(worst)
+                    status_at, worst = self.loop.time(), 0.0
+        finally:
+            self.stopped.set()
+            logging.getLogger("asyncio").removeHandler(self.slow_callbacks)
+            logger.info("Loop lag: %s", self.summary())
+
+    def beat(self, lag: float):
+        self.last_beat = time.monotonic()
+        self.histogram.add(lag)
+        blocked_in, self.blocked_in = self.blocked_in, None
+        if lag >= self.threshold:
+            self.record_stall(blocked_in or "unknown", lag)
+
+    def record_stall(self, site: str, duration: float):
+        self.stalls[site] += 1
+        self.stalled_for[site] += duration
+        logger.warning("Event loop stalled for %.3fs in %s", duration, site)
+
+    def summary(self) -> str:
+        worst = ", ".join(
+            f"{site} {self.stalls[site]}x {seconds:.2f}s"
+            for site, seconds in self.stalled_for.most_common(5)
+        )
+        return (
+            f"p50 {self.histogram.percentile(0.5) * 1000:.0f} ms, "
+            f"p99 {self.histogram.percentile(0.99) * 1000:.0f} ms, "
+            f"stalls: {worst or 'none'}"
+        )
+
+    def _show_status(self, worst: float):
+        if self.on_status is None:
+            return
+        try:
+            self.on_status(f"Lag: {worst * 1000:.0f} ms")
+        except Exception:
+            logger.exception("Could not show the loop lag")
+            self.on_status = None
+
+    def _watch(self):
+        while not self.stopped.wait(self.interval):
+            overdue = time.monotonic() - self.last_beat
+            if self.blocked_in or overdue < self.interval + self.threshold:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.blocked_in = stack_site(frame)
+
+
+class SlowCallbackHandler(logging.Handler):
+    """Counts asyncio's debug reports of callbacks over the threshold."""
+
+    def __init__(self, monitor: LoopMonitor):
+        super().__init__(logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record):
+        if not str(record.msg).startswith("Executing "):
+            return
+        if not isinstance(record.args, tuple) or len(record.args) != 2:
+            return
+        handle, duration = record.args
+        site = callback_site(str(handle))
+        self.monitor.stalls[f"callback {site}"] += 1
+        self.monitor.stalled_for[f"callback {site}"] += duration
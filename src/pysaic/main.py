@@ -1,4 +1,6 @@
+import argparse
 import asyncio
+import json
 import logging
 import logging.config
 from asyncio import CancelledError, Queue
@@ -7,9 +9,11 @@ from typing import Optional
 
 import inject
 from asyncirc.protocol import IrcProtocol
-from asyncirc.server import Server
 
+from pysaic.capabilities import register_capabilities
+from pysaic.capture import start_capture, stop_capture
 from pysaic.config import Config
+from pysaic.context import AppContext, set_app_context
 from pysaic.entities import (
     IncomingEvent,
     IncomingQueue,
@@ -17,6 +21,8 @@ from pysaic.entities import (
 )
 from pysaic.enums import IrcEvents, AppEventEnum
 from pysaic.handlers import (
+    handle_away,
+    handle_batch,
     handle_channel_topic,
     handle_end_of_names,
     handle_kick,
@@ -32,13 +38,18 @@ from pysaic.handlers import (
     handle_welcome_message,
     log_all_events,
 )
-from pysaic.settings import get_log_config, APP_IDENTITY
+from pysaic.history import HistoryStore
+from pysaic.loop_monitor import LoopMonitor
+from pysaic.profiler import start_profiling, stop_profiling
+from pysaic.reconnect import ReconnectManager
+from pysaic.relay import HeadlessApp, RelayServer
+from pysaic.server_pool import ServerPool
+from pysaic.settings import get_log_config, APP_IDENTITY, RELAY_PORT
+from pysaic.startup import mark, timings
 from pysaic.state import State
+from pysaic.tasks.history_writer import history_writer
 from pysaic.tasks.incoming_queue import incoming_queue_processing
-from pysaic.tasks.look_for_game import look_for_game_process
 from pysaic.tasks.outgoing_queue import outgoing_queue_processing
-from pysaic.tasks.prepare_game_input import prepare_game_input_watcher
-from pysaic.tasks.update_checker import update_checker
 from pysaic.ui.app import App
 
 logger = logging.getLogger("pysaic")
@@ -50,6 +61,7 @@ class PySaicIrcProtocol(IrcProtocol):
         self, exc: Optional[Exception], incoming_queue: IncomingQueue
     ) -> None:
         logger.warning("Connection lost")
+        self.reconnect_manager.connection_lost()
         incoming_queue.put_nowait(
             IncomingEvent.create_app_event(
                 AppEventEnum.RECONNECTING_TO_SERVER, "Connection lost"
@@ -57,16 +69,24 @@ class PySaicIrcProtocol(IrcProtocol):
         )
         super().connection_lost(exc)
 
+    async def connect(self) -> None:
+        await self.reconnect_manager.connect()
 
-def set_up_irc_client(loop, config):
+
+def set_up_irc_client(loop, config, state):
     logger.debug("Setting up irc client")
+    pool = ServerPool(config.server.all_endpoints())
     irc = PySaicIrcProtocol(
-        [Server(config.server.host, config.server.port)],
+        pool.ranked_servers(),
         nick=config.nick,
         loop=loop,
         logger=logger.getChild("irc_protocol"),
         realname=APP_IDENTITY,
     )
+    irc.reconnect_manager = ReconnectManager(
+        irc, state.connection_stats, pool=pool
+    )
+    register_capabilities(irc)
 
     irc.register("*", log_all_events)
 
@@ -106,7 +126,7 @@ def bind_incoming_queue(irc, incoming_queue, config, state, outgoing_queue):
     )
     irc.register(
         IrcEvents.PRIVMSG.value,
-        partial(handle_privmsg, incoming_queue=incoming_queue),
+        partial(handle_privmsg, incoming_queue=incoming_queue, state=state),
     )
     irc.register(
         IrcEvents.PART.value,
@@ -124,6 +144,14 @@ def bind_incoming_queue(irc, incoming_queue, config, state, outgoing_queue):
             handle_simple_event, incoming_queue=incoming_queue, state=state
         ),
     )
+    irc.register(
+        IrcEvents.BATCH.value,
+        partial(handle_batch, incoming_queue=incoming_queue, state=state),
+    )
+    irc.register(
+        IrcEvents.AWAY.value,
+        partial(handle_away, incoming_queue=incoming_queue),
+    )
     irc.register(
         IrcEvents.NICK.value,
         partial(handle_nick_change_event, incoming_queue=incoming_queue),
@@ -147,11 +175,12 @@ def bind_incoming_queue(irc, incoming_queue, config, state, outgoing_queue):
             handle_end_of_names,
             incoming_queue=incoming_queue,
             config=config,
+            state=state,
         ),
     )
     irc.register(
         IrcEvents.NAMES.value,
-        partial(handle_names, incoming_queue=incoming_queue),
+        partial(handle_names, state=state),
     )
     irc.register(
         IrcEvents.CHANNEL_TOPIC.value,
@@ -187,6 +216,7 @@ def setup_inject(
     outgoing_queue,
     config,
     loop,
+    history_store,
 ):
     logger.debug("Configuring inject")
     binder.bind(App, app)
@@ -195,6 +225,51 @@ def setup_inject(
     binder.bind(OutgoingQueue, outgoing_queue)
     binder.bind(Config, config)
     binder.bind(asyncio.AbstractEventLoop, loop)
+    binder.bind(HistoryStore, history_store)
+
+
+async def start_background_tasks(
+    loop, context, done_callback, poll_game_files=False
+):
+    # psutil, watchdog and aiohttp are only imported once the window is
+    # painted and the connection has been started
+    await asyncio.sleep(0)
+    from pysaic.tasks.look_for_game import look_for_game_process
+    from pysaic.tasks.prepare_game_input import (
+        prepare_game_input_watcher,
+        send_game_digests,
+    )
+
+    loop.create_task(
+        prepare_game_input_watcher(loop, context, polling=poll_game_files)
+    )
+    loop.create_task(send_game_digests(context))
+    looking_for_game_task = loop.create_task(
+        look_for_game_process(
+            loop, context.incoming_queue, context.config, context.state
+        )
+    )
+    looking_for_game_task.add_done_callback(done_callback)
+
+    from pysaic.tasks.update_checker import update_checker
+
+    loop.create_task(update_checker(context.incoming_queue, context.state))
+    mark("background_tasks")
+
+    from pysaic.crc_strings.use_case import get_engine
+
+    # reads the crc_strings cache, or parses the XML files once
+    try:
+        await loop.run_in_executor(None, get_engine)
+    except Exception:
+        logger.exception("Could not load crc_strings tables")
+    mark("crc_strings")
+
+
+async def exit_after_startup(state, outgoing_queue):
+    await state.got_welcome_message.wait()
+    print(json.dumps({"startup": timings}), flush=True)
+    outgoing_queue.put_nowait(None)
 
 
 def close_everything_callback(*args, outgoing_queue):
@@ -202,21 +277,96 @@ def close_everything_callback(*args, outgoing_queue):
     outgoing_queue.put_nowait(None)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(prog="app", description=APP_IDENTITY)
+    parser.add_argument(
+        "--capture",
+        metavar="FILE",
+        help="append raw IRC and game bridge lines to FILE for later replay",
+    )
+    parser.add_argument(
+        "--poll-game-files",
+        action="store_true",
+        help="poll the game bridge files instead of relying on file system "
+        "notifications",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="run without a window, windows attach with the ui command",
+    )
+    parser.add_argument(
+        "--relay-socket",
+        metavar="PATH",
+        help="serve windows on a Unix socket instead of localhost TCP",
+    )
+    parser.add_argument(
+        "--relay-port",
+        type=int,
+        default=RELAY_PORT,
+        help="localhost port windows attach to in daemon mode",
+    )
+    parser.add_argument(
+        "--debug-loop",
+        action="store_true",
+        help="run asyncio in debug mode to name the slow callbacks",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile the whole session, the result is saved into logs/",
+    )
+    parser.add_argument(
+        "--startup-benchmark",
+        action="store_true",
+        help="print startup timings and exit once connected",
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     logging.config.dictConfig(get_log_config())
     logger.info("Starting %s", APP_IDENTITY)
+    if args.capture:
+        start_capture(args.capture)
+    if args.profile:
+        start_profiling()
     config = Config.load_config()
     state = State(config)
     loop = asyncio.get_event_loop()
     incoming_queue = Queue()
     outgoing_queue = Queue()
-    irc = set_up_irc_client(loop, config)
+    history_store = HistoryStore()
+    context = AppContext(config, state, incoming_queue, outgoing_queue)
+    set_app_context(context)
+    irc = set_up_irc_client(loop, config, state)
 
     bind_incoming_queue(irc, incoming_queue, config, state, outgoing_queue)
 
-    logger.debug("Creating app")
-    app = App(state, config, incoming_queue, outgoing_queue)
+    if args.daemon:
+        logger.debug("Creating headless app")
+        app = HeadlessApp(state, config, incoming_queue, outgoing_queue)
+        relay = RelayServer(app, config, incoming_queue)
+        app_update_task = loop.create_task(
+            relay.serve(args.relay_socket, port=args.relay_port)
+        )
+    else:
+        logger.debug("Creating app")
+        app = App(state, config, incoming_queue, outgoing_queue)
+        app.update()
+        app_update_task = loop.create_task(update_app(app))
+    mark("first_paint")
+    loop.create_task(
+        LoopMonitor(
+            loop, on_status=app.set_status, debug=args.debug_loop
+        ).run()
+    )
+    loop.create_task(irc.connect())
 
+    incoming_queue.put_nowait(
+        IncomingEvent.create_app_event(AppEventEnum.LOAD_HISTORY, None)
+    )
     incoming_queue.put_nowait(
         IncomingEvent.create_information_event(
             f"Starting {APP_IDENTITY}. Connecting..."
@@ -225,18 +375,10 @@ def main():
     prepared_callback = partial(
         close_everything_callback, outgoing_queue=outgoing_queue
     )
-    app_update_task = loop.create_task(update_app(app))
     app_update_task.add_done_callback(prepared_callback)
     outgoing_process_task = loop.create_task(
-        outgoing_queue_processing(irc, outgoing_queue, state)
+        outgoing_queue_processing(irc, context)
     )
-    loop.create_task(prepare_game_input_watcher(loop, config, state))
-    looking_for_game_task = loop.create_task(
-        look_for_game_process(loop, incoming_queue, config, state)
-    )
-    looking_for_game_task.add_done_callback(prepared_callback)
-
-    loop.create_task(irc.connect())
     incoming_queue_processing_task = loop.create_task(
         incoming_queue_processing(state, incoming_queue, app, config)
     )
@@ -250,9 +392,17 @@ def main():
             outgoing_queue=outgoing_queue,
             config=config,
             loop=loop,
+            history_store=history_store,
+        )
+    )
+    loop.create_task(history_writer(loop, history_store))
+    loop.create_task(
+        start_background_tasks(
+            loop, context, prepared_callback, args.poll_game_files
         )
     )
-    loop.create_task(update_checker(incoming_queue))
+    if args.startup_benchmark:
+        loop.create_task(exit_after_startup(state, outgoing_queue))
     logger.debug("Entering start processing")
     try:
         loop.run_until_complete(outgoing_process_task)
@@ -270,6 +420,11 @@ def main():
         loop.run_until_complete(irc._send("QUIT Safe"))
 
         loop.close()
+        stop_capture()
+        path, top = stop_profiling()
+        if path is not None:
+            logger.info("Profile saved to %s:\n%s", path, "\n".join(top))
+        history_store.write_pending()
 
     app.quit()
 
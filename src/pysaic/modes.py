@@ -0,0 +1,90 @@
+import logging
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# RFC 1459 channel modes, used until the server sends its ISUPPORT tokens
+DEFAULT_PREFIX = "(qaohv)~&@%+"
+DEFAULT_CHANMODES = "beI,k,l,imnpst"
+
+
+@dataclass(frozen=True)
+class ModeChange:
+    adding: bool
+    mode: str
+    argument: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ChannelModes:
+    """
+    Which channel modes take an argument, from the server's `PREFIX` and
+    `CHANMODES` ISUPPORT tokens. Prefix modes are ordered highest first.
+    """
+
+    prefixes: dict[str, str]
+    # list modes and modes with a setting, both directions
+    always_argument: frozenset[str]
+    # modes with a parameter only when set, like +l
+    set_argument: frozenset[str]
+
+    @classmethod
+    def from_server(cls, server) -> "ChannelModes":
+        tokens = server.isupport_tokens if server else {}
+        return _channel_modes(
+            tokens.get("PREFIX") or DEFAULT_PREFIX,
+            tokens.get("CHANMODES") or DEFAULT_CHANMODES,
+        )
+
+    @cached_property
+    def ranks(self) -> dict[str, int]:
+        """Prefix symbol -> rank, no prefix ranks lowest."""
+        symbols = list(self.prefixes.values())
+        ranks = {
+            symbol: len(symbols) - index
+            for index, symbol in enumerate(symbols)
+        }
+        ranks[""] = 0
+        return ranks
+
+    def takes_argument(self, mode: str, adding: bool) -> bool:
+        return (
+            mode in self.prefixes
+            or mode in self.always_argument
+            or (adding and mode in self.set_argument)
+        )
+
+    def parse(self, modes: str, arguments: list[str]) -> list[ModeChange]:
+        """Pairs each mode letter of e.g. `+ov-b` with its argument."""
+        arguments = iter(arguments)
+        changes = []
+        adding = True
+        for mode in modes:
+            if mode in "+-":
+                adding = mode == "+"
+                continue
+            argument = None
+            if self.takes_argument(mode, adding):
+                argument = next(arguments, None)
+                if argument is None:
+                    logger.warning("Missing argument of %r in %r", mode, modes)
+                    break
+            changes.append(ModeChange(adding, mode, argument))
+        return changes
+
+
+@lru_cache(maxsize=4)
+def _channel_modes(prefix: str, chanmodes: str) -> ChannelModes:
+    letters, _, symbols = prefix.lstrip("(").partition(")")
+    if len(letters) != len(symbols):
+        logger.warning("Invalid PREFIX %r, using the default", prefix)
+        letters, _, symbols = DEFAULT_PREFIX[1:].partition(")")
+    # list, always with a parameter, only when set, never
+    groups = (chanmodes.split(",") + ["", "", ""])[:3]
+    return ChannelModes(
+        prefixes=dict(zip(letters, symbols)),
+        always_argument=frozenset(groups[0] + groups[1]),
+        set_argument=frozenset(groups[2]),
+    )
@@ -0,0 +1,177 @@
+import cProfile
+import logging
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIRECTORY = Path("logs")
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 10
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread, the main one by default, from a
+    daemon thread. The event loop and the Tk updates both run there; the
+    profiled code is never hooked, so the overhead is one stack walk per
+    sample. Writes stacks collapsed for flame graph tools.
+    """
+
+    suffix = ".collapsed"
+
+    def __init__(
+        self,
+        interval: float = SAMPLE_INTERVAL,
+        thread_id: Optional[int] = None,
+    ):
+        self.interval = interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.thread = threading.Thread(
+            target=self._sample, name="profiler", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def _sample(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    @property
+    def samples(self) -> int:
+        return self.stacks.total()
+
+    def top(self, n: int) -> list[tuple[str, float]]:
+        """Functions found on top of the stack most often, with a share."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack[-1]] += count
+        total = self.samples or 1
+        return [
+            (label, count / total) for label, count in leaves.most_common(n)
+        ]
+
+    def write(self, path: Path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+
+class CallProfiler:
+    """
+    `cProfile` of the thread that started it, for Pythons without
+    `sys._current_frames`. Slower, every call is hooked.
+    """
+
+    suffix = ".pstats"
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    @property
+    def samples(self) -> int:
+        return pstats.Stats(self.profile).total_calls
+
+    def top(self, n: int) -> list[tuple[str, float]]:
+        stats = pstats.Stats(self.profile)
+        total = stats.total_tt or 1
+        rows = sorted(
+            stats.stats.items(), key=lambda item: item[1][2], reverse=True
+        )
+        return [
+            (f"{file}:{line}({name})", tottime / total)
+            for (file, line, name), (_, _, tottime, *_) in rows[:n]
+        ]
+
+    def write(self, path: Path):
+        self.profile.dump_stats(path)
+
+
+class Profiler:
+    """One profiling session, `stop()` writes it into `logs/`."""
+
+    def __init__(self, directory: Path = PROFILE_DIRECTORY):
+        self.directory = directory
+        if hasattr(sys, "_current_frames"):
+            self.backend = StackSampler()
+        else:
+            self.backend = CallProfiler()
+        self.started_at = None
+
+    def start(self):
+        logger.info("Starting %s", type(self.backend).__name__)
+        self.started_at = time.monotonic()
+        self.backend.start()
+
+    def stop(self) -> Path:
+        self.backend.stop()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / (
+            f"profile_{datetime.now():%Y%m%d_%H%M%S}{self.backend.suffix}"
+        )
+        self.backend.write(path)
+        logger.info(
+            "Profiled %.1fs, %d samples written to %s",
+            time.monotonic() - self.started_at,
+            self.backend.samples,
+            path,
+        )
+        return path
+
+    def top(self, n: int = TOP_FUNCTIONS) -> list[str]:
+        return [
+            f"{share:6.1%} {label}" for label, share in self.backend.top(n)
+        ]
+
+
+_profiler: Optional[Profiler] = None
+
+
+def start_profiling() -> bool:
+    """False if a session is already running."""
+    global _profiler
+    if _profiler is not None:
+        return False
+    _profiler = Profiler()
+    _profiler.start()
+    return True
+
+
+def stop_profiling() -> tuple[Optional[Path], list[str]]:
+    global _profiler
+    if _profiler is None:
+        return None, []
+    profiler, _profiler = _profiler, None
+    return profiler.stop(), profiler.top()
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from itertools import cycle
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from pysaic.server_pool import ServerPool
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_BASE = 1
+RECONNECT_CAP = 60
+
+
+def backoff_delay(attempt, base=RECONNECT_BASE, cap=RECONNECT_CAP, rand=None):
+    # "full jitter": clients dropped by the same netsplit spread their
+    # reconnects instead of hitting the server at the same moment
+    rand = rand or random
+    return rand.uniform(0, min(cap, base * 2**attempt))
+
+
+@dataclass
+class ConnectionStats:
+    drops: int = 0
+    attempts: int = 0
+    dropped_at: Optional[float] = None
+    recovery_times: list[float] = field(default_factory=list)
+
+    @property
+    def is_recovering(self) -> bool:
+        return self.dropped_at is not None
+
+    @property
+    def last_recovery_time(self) -> Optional[float]:
+        return self.recovery_times[-1] if self.recovery_times else None
+
+    def dropped(self):
+        self.drops += 1
+        if self.dropped_at is None:
+            self.dropped_at = time.monotonic()
+
+    def recovered(self) -> Optional[float]:
+        if self.dropped_at is None:
+            return None
+        recovery_time = time.monotonic() - self.dropped_at
+        self.dropped_at = None
+        self.recovery_times.append(recovery_time)
+        logger.info(
+            "Recovered after %.2fs (drops: %d)", recovery_time, self.drops
+        )
+        return recovery_time
+
+
+class ReconnectManager:
+    def __init__(
+        self,
+        irc,
+        stats: ConnectionStats,
+        base=RECONNECT_BASE,
+        cap=RECONNECT_CAP,
+        rand: Optional[random.Random] = None,
+        pool: Optional["ServerPool"] = None,
+    ):
+        self.irc = irc
+        self.pool = pool
+        self.stats = stats
+        self.base = base
+        self.cap = cap
+        self.rand = rand or random.Random()
+        self._connecting = False
+
+    async def connect(self):
+        # connection_lost and the lag pinger can both ask for a connection
+        if self._connecting:
+            logger.debug("Already connecting")
+            return
+
+        self._connecting = True
+        try:
+            if self.pool is not None:
+                self.irc.servers = await self.pool.prepare()
+            for attempt, server in enumerate(cycle(self.irc.servers)):
+                if attempt:
+                    delay = backoff_delay(
+                        attempt - 1, self.base, self.cap, self.rand
+                    )
+                    logger.info(
+                        "Connecting to %s in %.2fs (attempt %d)",
+                        server.host,
+                        delay,
+                        attempt + 1,
+                    )
+                    await asyncio.sleep(delay)
+                self.stats.attempts += 1
+                if await self.irc._connect(server):
+                    return
+        finally:
+            self._connecting = False
+
+    def connection_lost(self):
+        if self.irc._quitting:
+            return
+        logger.warning("Connection dropped")
+        self.stats.dropped()
@@ -0,0 +1,4 @@
+from .headless import HeadlessApp
+from .server import RelayServer
+
+__all__ = ["HeadlessApp", "RelayServer"]
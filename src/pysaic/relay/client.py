@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import logging
+import logging.config
+from asyncio import CancelledError, Queue
+from functools import partial
+from tkinter import DISABLED, END, NORMAL, TclError
+
+import inject
+
+from pysaic.config import Config
+from pysaic.entities import IncomingQueue, OutgoingQueue
+from pysaic.relay.headless import APP, MESSAGES, USERS
+from pysaic.relay.protocol import (
+    FrameError,
+    encode_frame,
+    read_frame,
+    read_token,
+)
+from pysaic.settings import (
+    APP_IDENTITY,
+    RELAY_HOST,
+    RELAY_PORT,
+    RELAY_TOKEN_FILE,
+    get_log_config,
+)
+from pysaic.state import State
+from pysaic.ui.app import App
+
+logger = logging.getLogger(__name__)
+
+RETRY_INTERVAL = 1
+UPDATE_INTERVAL = 0.01
+
+
+class RelayClient:
+    """
+    A Tk `App` drawn by a daemon. The widget operations it receives are
+    replayed on the real widgets, the events the widgets put on the
+    incoming queue are sent to the daemon instead of being handled here.
+    """
+
+    def __init__(
+        self, app: App, incoming_queue: Queue, token_file=RELAY_TOKEN_FILE
+    ):
+        self.app = app
+        self.incoming_queue = incoming_queue
+        self.token_file = token_file
+        self.widgets = {MESSAGES: app.messages_list, USERS: app.users_list}
+        self.users_view = 0.0
+        self.closed = False
+
+    async def run(self, path=None, host=RELAY_HOST, port=RELAY_PORT):
+        updating = asyncio.create_task(self._update())
+        try:
+            while not self.closed:
+                try:
+                    # read again each time, a restarted daemon has a new one
+                    token = read_token(self.token_file)
+                    reader, writer = await self._connect(path, host, port)
+                except OSError:
+                    self.app.set_status("No daemon")
+                    await asyncio.sleep(RETRY_INTERVAL)
+                    continue
+                writer.write(encode_frame({"token": token}))
+                if not await self._attached(reader, writer):
+                    # rejected, or the daemon went away before a snapshot
+                    await asyncio.sleep(RETRY_INTERVAL)
+        finally:
+            updating.cancel()
+
+    @staticmethod
+    async def _connect(path, host, port):
+        if path:
+            return await asyncio.open_unix_connection(path)
+        return await asyncio.open_connection(host, port)
+
+    async def _attached(self, reader, writer) -> bool:
+        """Whether the daemon accepted us and sent a snapshot."""
+        logger.info("Attached to the daemon")
+        forwarding = asyncio.create_task(self._forward(writer))
+        accepted = False
+        try:
+            while (message := await read_frame(reader)) is not None:
+                if "snapshot" in message:
+                    accepted = True
+                    self.apply_snapshot(message["snapshot"])
+                else:
+                    self.apply(message["operations"])
+        except (
+            ConnectionError,
+            asyncio.IncompleteReadError,
+            FrameError,
+            ValueError,
+        ):
+            logger.warning("Lost the daemon", exc_info=True)
+        finally:
+            forwarding.cancel()
+            writer.close()
+        if not self.closed:
+            self.app.disable_input()
+        return accepted
+
+    async def _forward(self, writer):
+        while True:
+            event = await self.incoming_queue.get()
+            if event is None:
+                # the window was closed, the daemon keeps running
+                self.closed = True
+                writer.close()
+                return
+            writer.write(
+                encode_frame(
+                    {
+                        "event": event.event.what.name,
+                        "payload": event.event.payload,
+                    }
+                )
+            )
+
+    async def _update(self):
+        while True:
+            try:
+                self.app.update()
+                await asyncio.sleep(UPDATE_INTERVAL)
+            except TclError:
+                # the window is gone, nothing left to show
+                self.closed = True
+                self.incoming_queue.put_nowait(None)
+                break
+            except CancelledError:
+                break
+
+    def apply_snapshot(self, snapshot: dict):
+        for widget in self.widgets.values():
+            widget.config(state=NORMAL)
+            widget.delete("1.0", END)
+            widget.config(state=DISABLED)
+        self.apply(snapshot[MESSAGES] + snapshot[USERS])
+        if snapshot["input_enabled"]:
+            self.app.enable_input()
+        else:
+            self.app.disable_input()
+        self.app.set_status(snapshot["status"])
+
+    def apply(self, operations: list):
+        touched = set()
+        for name, method, *args in operations:
+            if name == APP:
+                getattr(self.app, method)(*args)
+                continue
+            widget = self.widgets[name]
+            if name == USERS and method == "delete":
+                self.users_view = widget.yview()[0]
+            widget.config(state=NORMAL)
+            getattr(widget, method)(*args)
+            widget.config(state=DISABLED)
+            touched.add(name)
+        if MESSAGES in touched:
+            self.app.messages_list.see(END)
+        if USERS in touched:
+            self.app.users_list.yview_moveto(self.users_view)
+
+
+def setup_inject(binder, app, config, incoming_queue, outgoing_queue):
+    binder.bind(App, app)
+    binder.bind(Config, config)
+    binder.bind(IncomingQueue, incoming_queue)
+    binder.bind(OutgoingQueue, outgoing_queue)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        prog="ui", description=f"{APP_IDENTITY} window of a daemon"
+    )
+    parser.add_argument("--relay-socket", metavar="PATH")
+    parser.add_argument("--relay-port", type=int, default=RELAY_PORT)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.config.dictConfig(get_log_config())
+    config = Config.load_config()
+    incoming_queue = Queue()
+    outgoing_queue = Queue()
+    app = App(State(config), config, incoming_queue, outgoing_queue)
+    inject.configure(
+        partial(
+            setup_inject,
+            app=app,
+            config=config,
+            incoming_queue=incoming_queue,
+            outgoing_queue=outgoing_queue,
+        )
+    )
+    client = RelayClient(app, incoming_queue)
+    asyncio.run(client.run(args.relay_socket, port=args.relay_port))
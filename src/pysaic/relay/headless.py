@@ -0,0 +1,123 @@
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# operations of the messages list kept for the snapshot of a new UI
+KEPT_MESSAGE_OPERATIONS = 5000
+
+MESSAGES = "messages"
+USERS = "users"
+APP = "app"
+
+
+class RelayText:
+    """
+    Stands in for a Tk `Text` widget. Edits are turned into operations
+    the attached UIs replay on their own widget; view changes stay with
+    each UI, so scrolling and `see` do nothing here.
+    """
+
+    def __init__(self, app: "HeadlessApp", name: str):
+        self.app = app
+        self.name = name
+
+    def insert(self, index, *chunks):
+        self.app.publish([self.name, "insert", index, *chunks])
+
+    def delete(self, first, last=None):
+        self.app.publish([self.name, "delete", first, last])
+
+    def tag_add(self, tag, first, last=None):
+        self.app.publish([self.name, "tag_add", tag, first, last])
+
+    def tag_configure(self, tag, **options):
+        self.app.publish([self.name, "tag_configure", tag, options])
+
+    def index(self, _index):
+        return "1.0"
+
+    def config(self, **_options):
+        pass
+
+    def see(self, _index):
+        pass
+
+    def yview(self, *_args):
+        pass
+
+    def yview_moveto(self, _fraction):
+        pass
+
+
+class RelayScrollbar:
+    @staticmethod
+    def get():
+        return 0.0, 1.0
+
+
+class HeadlessApp:
+    """
+    The part of `App` the use cases draw on, without Tk. Keeps what a UI
+    attaching later needs to catch up: the latest messages, the users
+    list since it was last redrawn and the input and status state.
+    """
+
+    def __init__(self, state, config, incoming_queue, outgoing_queue):
+        self.pysaic_state = state
+        self.pysaic_config = config
+        self.incoming_queue = incoming_queue
+        self.outgoing_queue = outgoing_queue
+        self.messages_list = RelayText(self, MESSAGES)
+        self.users_list = RelayText(self, USERS)
+        self.users_list_scroll = RelayScrollbar()
+        self.position = ()
+        self.current_actor = None
+        self.input_enabled = False
+        self.status = ""
+        self.messages: deque[list] = deque(maxlen=KEPT_MESSAGE_OPERATIONS)
+        self.users: list[list] = []
+        self.listeners = []
+
+    def publish(self, operation: list):
+        name = operation[0]
+        if name == MESSAGES:
+            self.messages.append(operation)
+        elif name == USERS:
+            # the list is always redrawn from scratch
+            if operation[1] == "delete":
+                self.users.clear()
+            self.users.append(operation)
+        for listener in self.listeners:
+            listener(operation)
+
+    def snapshot(self) -> dict:
+        return {
+            MESSAGES: list(self.messages),
+            USERS: self.users,
+            "input_enabled": self.input_enabled,
+            "status": self.status,
+        }
+
+    def enable_input(self):
+        self.input_enabled = True
+        self.publish([APP, "enable_input"])
+
+    def disable_input(self):
+        self.input_enabled = False
+        self.publish([APP, "disable_input"])
+
+    def set_status(self, text):
+        if text != self.status:
+            self.status = text
+            self.publish([APP, "set_status", text])
+
+    def update(self):
+        pass
+
+    def quit(self):
+        pass
+
+    def on_close(self):
+        self.outgoing_queue.put_nowait(None)
+        self.incoming_queue.put_nowait(None)
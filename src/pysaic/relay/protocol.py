@@ -0,0 +1,51 @@
+import json
+import os
+import secrets
+import struct
+
+# every frame is a 4 byte big endian length and that many bytes of JSON
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+# seconds a UI has to send its token once connected
+AUTH_TIMEOUT = 5
+
+
+class FrameError(Exception):
+    pass
+
+
+def encode_frame(message) -> bytes:
+    body = json.dumps(
+        message, separators=(",", ":"), ensure_ascii=False
+    ).encode()
+    return HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader):
+    """The next message, None once the other side has closed."""
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except EOFError:
+        return None
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {size} bytes is too big")
+    return json.loads(await reader.readexactly(size))
+
+
+def write_token(path) -> str:
+    """A new secret, in a file only the user can read."""
+    token = secrets.token_hex(32)
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+    return token
+
+
+def read_token(path) -> str:
+    with open(path) as f:
+        return f.read().strip()
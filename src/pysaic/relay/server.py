@@ -0,0 +1,175 @@
+import asyncio
+import hmac
+import logging
+import os
+from dataclasses import fields
+from typing import Optional
+
+from pysaic.config import Config
+from pysaic.entities import IncomingEvent
+from pysaic.enums import AppEventEnum
+from pysaic.relay.headless import HeadlessApp
+from pysaic.relay.protocol import (
+    AUTH_TIMEOUT,
+    FrameError,
+    encode_frame,
+    read_frame,
+    write_token,
+)
+from pysaic.settings import RELAY_HOST, RELAY_PORT, RELAY_TOKEN_FILE
+
+logger = logging.getLogger(__name__)
+
+# what a UI may ask the daemon for, all of it is what the Tk widgets send
+UI_EVENTS = (
+    AppEventEnum.COMMAND,
+    AppEventEnum.OUR_MESSAGE,
+    AppEventEnum.CHANGE_CHANNEL,
+    AppEventEnum.LOAD_HISTORY,
+    AppEventEnum.OPTIONS_UPDATED,
+)
+# a UI this far behind is disconnected instead of buffering without end
+MAX_PENDING_BYTES = 4 * 1024 * 1024
+
+
+def reload_config(config: Config):
+    """Picks up what an attached UI saved from its Options window."""
+    fresh = Config.load_config()
+    for field in fields(Config):
+        # the channel in use lives only in the daemon
+        if field.name != "server":
+            setattr(config, field.name, getattr(fresh, field.name))
+
+
+class RelayServer:
+    """
+    Serves the daemon's `HeadlessApp` to UIs over a local socket. A UI
+    gets a snapshot once attached and then the widget operations of each
+    loop iteration in one frame; it sends back the events of its input
+    line, channel menu, history scroll and Options window. Its first frame
+    must carry the token written to `token_file`, anything else on the
+    machine may reach the port but not the chat.
+    """
+
+    def __init__(
+        self,
+        app: HeadlessApp,
+        config: Config,
+        incoming_queue,
+        token_file=RELAY_TOKEN_FILE,
+    ):
+        self.app = app
+        self.config = config
+        self.incoming_queue = incoming_queue
+        self.token_file = token_file
+        self.token: Optional[str] = None
+        self.clients: set[asyncio.StreamWriter] = set()
+        self.pending: list[list] = []
+        self.server: Optional[asyncio.AbstractServer] = None
+        app.listeners.append(self.publish)
+
+    async def start(self, path=None, host=RELAY_HOST, port=RELAY_PORT):
+        self.token = write_token(self.token_file)
+        if path:
+            self.server = await asyncio.start_unix_server(
+                self._handle_client, path
+            )
+            os.chmod(path, 0o600)
+        else:
+            self.server = await asyncio.start_server(
+                self._handle_client, host, port
+            )
+        logger.info(
+            "Relay listening on %s",
+            path or self.server.sockets[0].getsockname(),
+        )
+
+    async def serve(self, path=None, host=RELAY_HOST, port=RELAY_PORT):
+        await self.start(path, host, port)
+        try:
+            await self.server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        for writer in list(self.clients):
+            writer.close()
+        self.clients.clear()
+
+    def publish(self, operation: list):
+        if not self.clients:
+            return
+        if not self.pending:
+            asyncio.get_running_loop().call_soon(self._flush)
+        self.pending.append(operation)
+
+    def _flush(self):
+        frame = encode_frame({"operations": self.pending})
+        self.pending = []
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+                logger.warning("Dropping a UI that stopped reading")
+                self.clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(frame)
+
+    async def _authenticate(self, reader) -> bool:
+        try:
+            async with asyncio.timeout(AUTH_TIMEOUT):
+                message = await read_frame(reader)
+            token = message["token"]
+        except (
+            TimeoutError,
+            ConnectionError,
+            asyncio.IncompleteReadError,
+            FrameError,
+            ValueError,
+            KeyError,
+            TypeError,
+        ):
+            return False
+        return isinstance(token, str) and hmac.compare_digest(
+            token, self.token
+        )
+
+    async def _handle_client(self, reader, writer):
+        if not await self._authenticate(reader):
+            logger.warning("Rejected a UI without the relay token")
+            writer.close()
+            return
+
+        logger.info("UI attached")
+        writer.write(encode_frame({"snapshot": self.app.snapshot()}))
+        self.clients.add(writer)
+        try:
+            while (message := await read_frame(reader)) is not None:
+                self._dispatch(message)
+        except (
+            ConnectionError,
+            asyncio.IncompleteReadError,
+            FrameError,
+            ValueError,
+        ):
+            logger.warning("UI connection broken", exc_info=True)
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+            logger.info("UI detached")
+
+    def _dispatch(self, message: dict):
+        try:
+            what = AppEventEnum[message["event"]]
+        except (KeyError, TypeError):
+            logger.warning("Unknown message from UI: %r", message)
+            return
+        if what not in UI_EVENTS:
+            logger.warning("UI may not send %s", what)
+            return
+        if what is AppEventEnum.OPTIONS_UPDATED:
+            reload_config(self.config)
+        self.incoming_queue.put_nowait(
+            IncomingEvent.create_app_event(what, message.get("payload"))
+        )
@@ -0,0 +1,181 @@
+import asyncio
+import os
+import stat
+from unittest.mock import Mock, patch
+
+from pysaic.enums import AppEventEnum
+from pysaic.relay.client import RelayClient
+from pysaic.relay.headless import HeadlessApp
+from pysaic.relay.protocol import (
+    HEADER,
+    encode_frame,
+    read_frame,
+    read_token,
+)
+from pysaic.relay.server import RelayServer
+
+
+def make_app():
+    return HeadlessApp(Mock(), Mock(), asyncio.Queue(), asyncio.Queue())
+
+
+def test_frames_round_trip():
+    # given
+    message = {"operations": [["messages", "insert", "end", "zażółć\n"]]}
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_frame(message) + encode_frame(None)[:2])
+        reader.feed_eof()
+        return await read_frame(reader), await read_frame(reader)
+
+    # when
+    first, second = asyncio.run(run())
+
+    # then
+    assert first == message
+    assert second is None
+
+
+def test_headless_app_keeps_what_a_new_ui_needs():
+    # given
+    app = make_app()
+
+    # when
+    app.messages_list.insert("end", "12:00:00 ", "Time")
+    app.users_list.insert("end", "old\n")
+    app.users_list.delete("0.0", "end")
+    app.users_list.insert("end", "new\n", "Loner")
+    app.enable_input()
+    app.set_status("Lag: 3 ms")
+    # main() quits whichever app it ran
+    app.quit()
+
+    # then
+    assert app.snapshot() == {
+        "messages": [["messages", "insert", "end", "12:00:00 ", "Time"]],
+        "users": [
+            ["users", "delete", "0.0", "end"],
+            ["users", "insert", "end", "new\n", "Loner"],
+        ],
+        "input_enabled": True,
+        "status": "Lag: 3 ms",
+    }
+
+
+def test_ui_gets_a_snapshot_then_operations_and_sends_events(tmp_path):
+    # given
+    app = make_app()
+    app.messages_list.insert("end", "before\n", "Text")
+    token_file = tmp_path / "relay_token"
+
+    async def run():
+        server = RelayServer(app, Mock(), app.incoming_queue, token_file)
+        await server.start(port=0)
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(encode_frame({"token": read_token(token_file)}))
+        snapshot = await read_frame(reader)
+
+        app.messages_list.insert("end", "after\n", "Text")
+        app.disable_input()
+        update = await read_frame(reader)
+
+        writer.write(encode_frame({"event": "COMMAND", "payload": "help"}))
+        writer.write(encode_frame({"event": "EXIT", "payload": None}))
+        writer.write(encode_frame({"event": "OUR_MESSAGE", "payload": "hi"}))
+        await writer.drain()
+        events = [await app.incoming_queue.get() for _ in range(2)]
+        writer.close()
+        server.close()
+        return snapshot, update, events
+
+    # when
+    snapshot, update, events = asyncio.run(run())
+
+    # then
+    assert snapshot["snapshot"]["messages"] == [
+        ["messages", "insert", "end", "before\n", "Text"]
+    ]
+    assert update == {
+        "operations": [
+            ["messages", "insert", "end", "after\n", "Text"],
+            ["app", "disable_input"],
+        ]
+    }
+    assert [(e.event.what, e.event.payload) for e in events] == [
+        (AppEventEnum.COMMAND, "help"),
+        (AppEventEnum.OUR_MESSAGE, "hi"),
+    ]
+
+
+def test_ui_without_the_token_gets_nothing(tmp_path):
+    # given
+    app = make_app()
+    app.messages_list.insert("end", "a private message\n", "Text")
+    token_file = tmp_path / "relay_token"
+
+    async def attempt(first_frame):
+        server = RelayServer(app, Mock(), app.incoming_queue, token_file)
+        await server.start(port=0)
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(first_frame)
+        writer.write(encode_frame({"event": "OUR_MESSAGE", "payload": "hi"}))
+        try:
+            return await read_frame(reader)
+        finally:
+            writer.close()
+            server.close()
+
+    # when
+    replies = [
+        asyncio.run(attempt(frame))
+        for frame in (
+            encode_frame({"token": "guess"}),
+            encode_frame({"token": None}),
+            encode_frame({"event": "COMMAND", "payload": "pay"}),
+        )
+    ]
+
+    # then
+    assert replies == [None, None, None]
+    assert app.incoming_queue.empty()
+    if os.name == "posix":
+        assert stat.S_IMODE(os.stat(token_file).st_mode) == 0o600
+
+
+@patch("pysaic.relay.client.RETRY_INTERVAL", 0)
+def test_ui_reconnects_after_a_broken_frame(tmp_path):
+    # given
+    app = make_app()
+    app.set_status("Lag: 3 ms")
+    ui = Mock()
+    token_file = tmp_path / "relay_token"
+    token_file.write_text("secret")
+    client = RelayClient(ui, asyncio.Queue(), token_file)
+    broken = [HEADER.pack(2**31), HEADER.pack(3) + b"{x}", HEADER.pack(9)]
+
+    async def handle(_reader, writer):
+        if broken:
+            writer.write(broken.pop(0))
+        else:
+            writer.write(encode_frame({"snapshot": app.snapshot()}))
+            client.closed = True
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            await asyncio.wait_for(client.run(port=port), 5)
+        finally:
+            server.close()
+
+    # when
+    asyncio.run(run())
+
+    # then
+    assert broken == []
+    ui.set_status.assert_called_with("Lag: 3 ms")
@@ -1,14 +1,30 @@
 import asyncio
 import logging
+import os
+from collections import Counter
 from pathlib import Path
+from typing import Optional
 
-from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.events import (
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileSystemEvent,
+    FileSystemEventHandler,
+)
 from watchdog.observers import Observer
 
+from pysaic.context import AppContext
+from pysaic.controllers.game_input import INPUT_FILE, configs_path, file_size
+from pysaic.controllers.game_segments import segment_sequence
 from pysaic.script_reader.parser import parse_line
 
 logger = logging.getLogger(__name__)
 
+WATCHED_PREFIX = "crc_"
+POLL_MIN_INTERVAL = 0.05
+POLL_MAX_INTERVAL = 1.0
+
 
 class _EventHandler(FileSystemEventHandler):
     file_size = 0
@@ -16,13 +32,32 @@ class _EventHandler(FileSystemEventHandler):
     def __init__(
         self,
         loop: asyncio.BaseEventLoop,
-        *args,
-        **kwargs,
+        context: AppContext,
+        events: Optional[Counter] = None,
     ):
         self._loop = loop
-        super(*args, **kwargs)
+        self._context = context
+        self.events = Counter() if events is None else events
+
+    def dispatch(self, event: FileSystemEvent) -> None:
+        self.events[event.event_type] += 1
+        super().dispatch(event)
+
+    def _parse(self, line: str):
+        # called from the observer thread or, when polling, from the loop
+        asyncio.run_coroutine_threadsafe(
+            parse_line(line, self._context), self._loop
+        )
 
     def on_modified(self, event: FileSystemEvent) -> None:
+        if event.src_path.endswith(INPUT_FILE):
+            # the script empties its input each time it reads it
+            if file_size(event.src_path) == 0:
+                self._loop.call_soon_threadsafe(
+                    self._context.game_input.game_read, Path(event.src_path)
+                )
+            return
+
         if not event.src_path.endswith("crc_output.txt"):
             return
 
@@ -32,21 +67,161 @@ class _EventHandler(FileSystemEventHandler):
                 if not line:
                     continue
 
-                self._loop.create_task(parse_line(line))
+                self._parse(line)
 
             f.seek(0)
             f.truncate()
 
+    def on_created(self, event: FileSystemEvent) -> None:
+        self._read_segments(event.src_path)
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        # the script renames a segment into place once it is complete
+        self._read_segments(event.dest_path)
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        game_input = self._context.game_input
+        if game_input.segments is None:
+            return
+        if (
+            segment_sequence(event.src_path, game_input.segments.prefix)
+            is None
+        ):
+            return
+
+        self._loop.call_soon_threadsafe(
+            game_input.game_read, Path(event.src_path).parent / INPUT_FILE
+        )
+
+    def _read_segments(self, path: str):
+        game_output = self._context.game_output
+        if game_output is None or not game_output.is_segment(path):
+            return
+
+        for line in game_output.read():
+            self._parse(line)
+
+
+def snapshot(directory: Path) -> dict[str, tuple[int, int]]:
+    """Modification time and size of every bridge file in `directory`."""
+    files = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.startswith(WATCHED_PREFIX):
+                    continue
+                try:
+                    stat = os.stat(entry.path)
+                except FileNotFoundError:
+                    continue
+                files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        pass
+    return files
+
+
+def changes(previous, current) -> list[FileSystemEvent]:
+    events = [
+        FileDeletedEvent(path) for path in previous.keys() - current.keys()
+    ]
+    for path, signature in current.items():
+        if path not in previous:
+            events.append(FileCreatedEvent(path))
+            # as a notification would, report what was written into it
+            if signature[1]:
+                events.append(FileModifiedEvent(path))
+        elif previous[path] != signature:
+            events.append(FileModifiedEvent(path))
+    return events
+
+
+class GameBridgeWatcher:
+    """
+    Watches the game's configs directory for the bridge files. Uses a
+    watchdog observer, or polls the files with `os.stat` when asked to or
+    when the observer can't be started: the interval doubles while nothing
+    changes, up to `max_interval`, and drops back on the first change.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        context: AppContext,
+        polling: bool = False,
+        min_interval: float = POLL_MIN_INTERVAL,
+        max_interval: float = POLL_MAX_INTERVAL,
+    ):
+        self.loop = loop
+        self.polling = polling
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.events: Counter[str] = Counter()
+        self.directory: Optional[Path] = None
+        self.handler = _EventHandler(loop, context, self.events)
+        self._observer: Optional[Observer] = None
+        self._poll_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        if self._observer is not None:
+            return self._observer.is_alive()
+        return self._poll_task is not None and not self._poll_task.done()
+
+    def retarget(self, game_location: Optional[Path]):
+        """Follows the game, stops watching while it is not running."""
+        directory = game_location and configs_path(game_location)
+        if directory == self.directory and (
+            directory is None or self.is_running
+        ):
+            return
+
+        self.stop()
+        if directory is not None:
+            self.start(directory)
+
+    def start(self, directory: Path):
+        self.directory = directory
+        if not self.polling:
+            observer = Observer()
+            try:
+                observer.schedule(self.handler, str(directory))
+                observer.start()
+            except OSError:
+                logger.exception("Can't watch %s, polling it", directory)
+            else:
+                self._observer = observer
+                logger.info("Watching %s", directory)
+                return
+
+        self._poll_task = self.loop.create_task(self._poll(directory))
+        logger.info("Polling %s", directory)
 
-def game_files_watcher(
-    path: Path,
-    loop: asyncio.BaseEventLoop,
-    recursive: bool = False,
-) -> None:
-    """Watch a directory for changes."""
-    handler = _EventHandler(loop)
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            # joining may wait for the emitter's timeout, not on the loop
+            self.loop.run_in_executor(None, self._observer.join)
+            self._observer = None
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self.directory is not None:
+            logger.info(
+                "Stopped watching %s, events: %r", self.directory, self.events
+            )
+        self.directory = None
 
-    observer = Observer()
-    observer.schedule(handler, str(path), recursive=recursive)
-    observer.start()
-    logger.debug("Observer started")
+    async def _poll(self, directory: Path):
+        previous = snapshot(directory)
+        interval = self.min_interval
+        while True:
+            await asyncio.sleep(interval)
+            current = snapshot(directory)
+            events = changes(previous, current)
+            previous = current
+            for event in events:
+                self.handler.dispatch(event)
+            if events:
+                interval = self.min_interval
+            else:
+                interval = min(interval * 2, self.max_interval)
@@ -7,6 +7,7 @@ from typing import List, Optional
 from irclib.parser import Prefix
 
 from pysaic.enums import FactionsEnum
+from pysaic.settings import ROSTER_DELTA_VERSION, SEGMENT_BRIDGE_VERSION
 
 main_logger = logging.getLogger(__name__)
 
@@ -176,6 +177,14 @@ class Handshake:
     version: int
     in_file_id = "Handshake"
 
+    @property
+    def supports_segments(self) -> bool:
+        return self.version >= SEGMENT_BRIDGE_VERSION
+
+    @property
+    def supports_roster_deltas(self) -> bool:
+        return self.version >= ROSTER_DELTA_VERSION
+
     @classmethod
     def from_line(cls, value):
         return cls(version=int(value))
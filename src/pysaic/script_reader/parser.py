@@ -1,9 +1,7 @@
 import logging
 
-import inject
-
-from pysaic.config import Config
-from pysaic.entities import IncomingQueue, OutgoingQueue
+from pysaic.capture import CaptureSource, capture_line
+from pysaic.context import AppContext
 from pysaic.script_reader.entities import (
     ChannelMessage,
     Handshake,
@@ -26,13 +24,8 @@ from pysaic.use_cases.game import (
 logger = logging.getLogger(__name__)
 
 
-@inject.autoparams()
-async def parse_line(
-    line,
-    config: Config,
-    incoming_queue: IncomingQueue,
-    outgoing_queue: OutgoingQueue,
-):
+async def parse_line(line, context: AppContext):
+    capture_line(CaptureSource.GAME_OUTPUT, line)
     try:
         type, rest = line.split("/", 1)
     except Exception:
@@ -44,40 +37,27 @@ async def parse_line(
     # replace with a switch statement
     if type == ChannelMessage.in_file_id:
         await GameChannelMessageUseCase(
-            config,
-            ChannelMessage.from_line(config.nick, rest),
-            incoming_queue,
-            outgoing_queue,
+            context, ChannelMessage.from_line(context.config.nick, rest)
         ).execute()
     elif type == Handshake.in_file_id:
         await GameHandshakeUseCase(
-            config, Handshake.from_line(rest), incoming_queue
+            context, Handshake.from_line(rest)
         ).execute()
     elif type == Death.in_file_id:
-        await PlayerDiedUseCase(
-            config,
-            Death.from_line(rest),
-            incoming_queue,
-            outgoing_queue,
-        ).execute()
+        await PlayerDiedUseCase(context, Death.from_line(rest)).execute()
     elif type == ConnectionLost.in_file_id:
         await ConnectionLostUseCase(
-            config,
-            ConnectionLost.from_line(rest),
-            incoming_queue,
-            outgoing_queue,
+            context, ConnectionLost.from_line(rest)
         ).execute()
     elif type == Money.in_file_id:
-        await MoneyChangeUseCase(
-            Money.from_line(rest), incoming_queue, outgoing_queue
-        ).execute()
+        await MoneyChangeUseCase(context, Money.from_line(rest)).execute()
     elif type == ActorStatus.in_file_id:
         await actor_status_use_case(
-            ActorStatus.from_line(rest), incoming_queue
+            ActorStatus.from_line(rest), context.incoming_queue
         )
     elif type == ChannelChange.in_file_id:
         await channel_change_use_case(
-            ChannelChange.from_line(rest), incoming_queue
+            ChannelChange.from_line(rest), context.incoming_queue
         )
     else:
         logger.warning("Unknown type: %r/%r", type, rest)
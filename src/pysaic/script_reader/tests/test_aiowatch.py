@@ -0,0 +1,100 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from pysaic.script_reader.aiowatch import GameBridgeWatcher, changes
+
+
+@pytest.fixture()
+def game_location(tmp_path):
+    configs = tmp_path / "gamedata" / "configs"
+    configs.mkdir(parents=True)
+    return tmp_path
+
+
+@pytest.fixture()
+def context():
+    return Mock(game_output=None, game_input=Mock(segments=None))
+
+
+def test_changes():
+    # given
+    previous = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+    current = {"a": (1, 1), "b": (2, 5), "d": (1, 1), "e": (1, 0)}
+
+    # when
+    events = changes(previous, current)
+
+    # then
+    assert sorted((e.event_type, e.src_path) for e in events) == [
+        ("created", "d"),
+        ("created", "e"),
+        ("deleted", "c"),
+        ("modified", "b"),
+        ("modified", "d"),
+    ]
+
+
+@patch("pysaic.script_reader.aiowatch.parse_line", new_callable=AsyncMock)
+def test_polling_reads_game_output(mock_parse_line, game_location, context):
+    # given
+    output = game_location / "gamedata" / "configs" / "crc_output.txt"
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        watcher = GameBridgeWatcher(
+            loop, context, polling=True, min_interval=0.01, max_interval=0.02
+        )
+        watcher.retarget(game_location)
+        await asyncio.sleep(0.05)
+        output.write_text("Money/100\nHandshake/10\n")
+        await asyncio.sleep(0.1)
+        watcher.stop()
+        return watcher
+
+    # when
+    watcher = asyncio.run(run())
+
+    # then
+    assert [call.args[0] for call in mock_parse_line.call_args_list] == [
+        "Money/100",
+        "Handshake/10",
+    ]
+    assert watcher.events["created"] == 1
+    assert output.read_text() == ""
+    assert not watcher.is_running
+
+
+@pytest.mark.parametrize("polling", [True, False])
+def test_retarget_follows_the_game(polling, game_location, tmp_path, context):
+    # given
+    moved = tmp_path / "moved"
+    (moved / "gamedata" / "configs").mkdir(parents=True)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        watcher = GameBridgeWatcher(loop, context, polling=polling)
+        states = []
+
+        watcher.retarget(game_location)
+        await asyncio.sleep(0)
+        states.append((watcher.directory, watcher.is_running))
+        watcher.retarget(None)
+        await asyncio.sleep(0)
+        states.append((watcher.directory, watcher.is_running))
+        watcher.retarget(moved)
+        await asyncio.sleep(0)
+        states.append((watcher.directory, watcher.is_running))
+        watcher.stop()
+        return states
+
+    # when
+    states = asyncio.run(run())
+
+    # then
+    assert states == [
+        (game_location / "gamedata" / "configs", True),
+        (None, False),
+        (moved / "gamedata" / "configs", True),
+    ]
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from asyncirc.server import BasicIPServer, Server
+
+from pysaic.config import Endpoint
+
+logger = logging.getLogger(__name__)
+
+PROBE_FILE = "server_probes.json"
+PROBE_TIMEOUT = 10
+# replies that end a probe's registration, welcome or nick in use
+REGISTERED = ("001", "433")
+
+
+@dataclass
+class ProbeResult:
+    endpoint: Endpoint
+    connect_time: Optional[float] = None
+    registration_time: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.registration_time is not None
+
+
+async def probe_endpoint(
+    endpoint: Endpoint, timeout: float = PROBE_TIMEOUT
+) -> ProbeResult:
+    """Times the TCP connect and the registration of a throwaway nick."""
+    result = ProbeResult(endpoint)
+    started = time.monotonic()
+    writer = None
+    try:
+        async with asyncio.timeout(timeout):
+            reader, writer = await asyncio.open_connection(
+                endpoint.host, endpoint.port
+            )
+            connected = time.monotonic()
+            result.connect_time = connected - started
+            nick = f"pysaic{random.randrange(10**6):06}"
+            writer.write(f"NICK {nick}\r\nUSER {nick} 0 * :probe\r\n".encode())
+            while line := await reader.readline():
+                command, _, rest = line.decode(errors="replace").partition(" ")
+                if command == "PING":
+                    writer.write(f"PONG {rest.strip()}\r\n".encode())
+                elif rest.split(" ", 1)[0] in REGISTERED:
+                    result.registration_time = time.monotonic() - connected
+                    writer.write(b"QUIT :probe\r\n")
+                    break
+            else:
+                result.error = "closed before registration"
+    except TimeoutError:
+        result.error = "timed out"
+    except OSError as exc:
+        result.error = str(exc) or type(exc).__name__
+    finally:
+        if writer is not None:
+            writer.close()
+    logger.info(
+        "Probed %s:%s, connect %s, registration %s%s",
+        endpoint.host,
+        endpoint.port,
+        result.connect_time,
+        result.registration_time,
+        f" ({result.error})" if result.error else "",
+    )
+    return result
+
+
+class ServerPool:
+    """
+    The endpoints of `server.yml`, fastest first. The ranking of the last
+    probes is kept on disk, so a launch connects to the best known
+    endpoint at once; the first connection of a session probes all of
+    them in parallel and takes the first one to complete registration,
+    the others keep being timed in the background for failover.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        probe_file: str = PROBE_FILE,
+        timeout: float = PROBE_TIMEOUT,
+    ):
+        self.endpoints = endpoints
+        self.probe_file = probe_file
+        self.timeout = timeout
+        self.servers = {
+            endpoint: BasicIPServer(host=endpoint.host, port=endpoint.port)
+            for endpoint in endpoints
+        }
+        # endpoint key -> [connect time, registration time], None if failed
+        self.times: dict[str, list] = {}
+        self.probed = False
+        self.probing: Optional[asyncio.Future] = None
+        self.pending: set[asyncio.Task] = set()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.probe_file) as f:
+                self.times = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable %s", self.probe_file)
+
+    def save(self):
+        partial = f"{self.probe_file}.tmp"
+        try:
+            with open(partial, "w") as f:
+                json.dump(self.times, f)
+            os.replace(partial, self.probe_file)
+        except OSError:
+            logger.exception("Could not save %s", self.probe_file)
+
+    def record(self, result: ProbeResult):
+        self.times[result.endpoint.key] = [
+            result.connect_time,
+            result.registration_time,
+        ]
+
+    def ranked(self) -> list[Endpoint]:
+        """Registered endpoints by time, then untried, then failed ones."""
+
+        def rank(item):
+            index, endpoint = item
+            times = self.times.get(endpoint.key)
+            if times is None:
+                return 1, 0, index
+            connect_time, registration_time = times
+            if registration_time is None:
+                return 2, 0, index
+            return 0, connect_time + registration_time, index
+
+        return [
+            endpoint
+            for _, endpoint in sorted(enumerate(self.endpoints), key=rank)
+        ]
+
+    def ranked_servers(self) -> list[Server]:
+        return [self.servers[endpoint] for endpoint in self.ranked()]
+
+    async def prepare(self) -> list[Server]:
+        """
+        Servers to connect to, in order. Without any earlier results the
+        first probes are waited for, otherwise they only rerank the pool
+        for the next failover and launch.
+        """
+        if not self.probed:
+            self.probing = asyncio.ensure_future(self.probe())
+            if not any(e.key in self.times for e in self.endpoints):
+                await self.probing
+        return self.ranked_servers()
+
+    async def probe(self) -> list[Endpoint]:
+        """Probes every endpoint, returns once the fastest is known."""
+        self.probed = True
+        if len(self.endpoints) < 2:
+            return self.ranked()
+
+        fastest = asyncio.get_running_loop().create_future()
+
+        def probed(task: asyncio.Task):
+            self.pending.discard(task)
+            if task.cancelled():
+                return
+            result = task.result()
+            self.record(result)
+            self.save()
+            if (result.ok or not self.pending) and not fastest.done():
+                fastest.set_result(result.endpoint)
+
+        for endpoint in self.endpoints:
+            task = asyncio.create_task(probe_endpoint(endpoint, self.timeout))
+            task.add_done_callback(probed)
+            self.pending.add(task)
+        await fastest
+        return self.ranked()
@@ -3,8 +3,18 @@ import os
 START_OF_ACTOR_CHARACTER = "☻"
 END_OF_ACTOR_CHARACTER = "☺"
 VERSION = "0.2.0"
-SUPPORTED_SCRIPT_VERSION = 9
+SUPPORTED_SCRIPT_VERSION = 11
+MIN_SCRIPT_VERSION = 9
+# scripts from this version on exchange lines through numbered segments
+SEGMENT_BRIDGE_VERSION = 10
+# and from this one on apply UserAdd/UserDel/UserUpd roster deltas
+ROSTER_DELTA_VERSION = 11
 APP_IDENTITY = f"PySAIC {VERSION}"
+# where a daemon waits for its UIs
+RELAY_HOST = "127.0.0.1"
+RELAY_PORT = 47250
+# secret a UI sends first, rewritten by every daemon start
+RELAY_TOKEN_FILE = "relay_token"
 
 # logs
 MAX_BYTES = 2 * 1024 * 1024  # 2 mb
@@ -0,0 +1,18 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+STARTED_AT = time.time()
+
+# wall clock of each startup milestone, so an outside benchmark can compare
+# them with the moment it spawned the process
+timings: dict[str, float] = {}
+
+
+def mark(name: str):
+    if name in timings:
+        return
+
+    timings[name] = time.time()
+    logger.info("Startup %s after %.3fs", name, timings[name] - STARTED_AT)
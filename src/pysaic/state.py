@@ -1,16 +1,22 @@
 import asyncio
 import logging
-from asyncio import Task
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from pysaic.capabilities import BatchCollector
 from pysaic.entities import ChatUser
 from pysaic.enums import FactionsEnum
-
+from pysaic.highlight import Highlighter
+from pysaic.history import HistoryCursor
+from pysaic.ignore import IgnoreList
+from pysaic.reconnect import ConnectionStats
 
 logger = logging.getLogger(__name__)
 
+NICK_PREFIXES = "~&@%+*"
+
 
 class ChatUsers(dict):
     def __init__(self, data):
@@ -32,8 +38,8 @@ class ChatUsers(dict):
     def update_user_name(self, old_name, name):
         self.logger.info('Renaming user "%s" to "%s"', old_name, name)
         user = self.pop(old_name)
-        user.name = name
-        self[name] = user
+        user.rename(name)
+        self[user.name] = user
         self.needs_update = True
 
     def remove_user(self, user_id):
@@ -88,23 +94,131 @@ class State:
         self.is_game_running: bool = False
         self.is_author_authorized = asyncio.Event()
         self.is_in_channel = asyncio.Event()
-        self.chat_users: ChatUsers[str, ChatUser] = ChatUsers({})
+        self.channels: dict[str, ChatUsers[str, ChatUser]] = {
+            channel.name: ChatUsers({}) for channel in config.server.channels
+        }
+        self.joined_channels: set[str] = set()
+        # channels whose roster is kept from before a reconnect until NAMES
+        # tells which members changed
+        self.stale_channels: set[str] = set()
+        # NAMES replies collected until end of NAMES, nick -> prefix
+        self.pending_names: dict[str, dict[str, str]] = defaultdict(dict)
+        self.connection_stats = ConnectionStats()
+        self.highlighter = Highlighter()
+        self.ignores = IgnoreList(config.ignore_masks, config.filter_patterns)
+        self.batches = BatchCollector()
         self.player_money: int = 0
-        self.game_related_tasks: list[Task] = []
         self.nick: str = config.nick
         self.last_death: Optional[datetime] = None
+        self.history_cursor: Optional[HistoryCursor] = None
+        self.history_exhausted: bool = False
+
+    @property
+    def active_channel(self) -> str:
+        return self.config.server.previous_channel
+
+    @property
+    def chat_users(self) -> ChatUsers[str, ChatUser]:
+        return self.channel_users(self.active_channel)
+
+    def channel_users(self, channel) -> ChatUsers[str, ChatUser]:
+        try:
+            return self.channels[channel]
+        except KeyError:
+            self.channels[channel] = ChatUsers({})
+            return self.channels[channel]
+
+    def is_active_channel(self, channel) -> bool:
+        return channel.lower() == self.active_channel.lower()
+
+    def channels_with_user(self, name):
+        return [
+            chat_users
+            for chat_users in self.channels.values()
+            if name in chat_users
+        ]
+
+    def rename_user(self, old_name, name):
+        # renamed in place, so users shared between channels stay shared
+        for chat_users in self.channels_with_user(old_name):
+            chat_user = chat_users.pop(old_name)
+            chat_user.rename(name)
+            chat_users[chat_user.name] = chat_user
+            chat_users.needs_update = True
 
     def money_enough(self, amount) -> bool:
         return self.player_money >= amount
 
-    def set_not_in_channel(self):
-        self.logger.info("Setting not in channel")
+    def set_not_in_channel(self, channel=None):
+        self.logger.info("Setting not in channel %s", channel or "(all)")
+        channels = [channel] if channel else list(self.channels)
+        for name in channels:
+            self.joined_channels.discard(name)
+            self.channel_users(name).clear()
+            self.stale_channels.discard(name)
+            self.pending_names.pop(name, None)
+
+        if not self.joined_channels:
+            self.is_in_channel.clear()
+
+    def set_reconnecting(self):
+        self.logger.info("Keeping rosters of %s", self.joined_channels)
+        self.stale_channels |= self.joined_channels
+        self.joined_channels.clear()
+        self.pending_names.clear()
+        self.batches.clear()
         self.is_in_channel.clear()
-        self.chat_users.clear()
 
-    def set_in_channel(self):
-        self.logger.info("Setting in channel")
-        self.chat_users.update_or_create(
+    def stage_names(self, channel, names):
+        pending = self.pending_names[channel]
+        for name in names:
+            nick = name.lstrip(NICK_PREFIXES)
+            # with multi-prefix the highest prefix comes first
+            pending[nick] = name[:1] if nick != name else ""
+
+    def replace_roster(
+        self, channel, names
+    ) -> tuple[list[str], list[str], list[str]]:
+        """Replaces a roster with a NAMES reply, returns what changed."""
+        self.stale_channels.discard(channel)
+        chat_users = self.channel_users(channel)
+        names = dict(names)
+        if self.config.nick in chat_users:
+            names.setdefault(self.config.nick, "")
+        removed = [name for name in chat_users if name not in names]
+        added = [name for name in names if name not in chat_users]
+        for name in removed:
+            del chat_users[name]
+        for name in added:
+            chat_users[name] = ChatUser(name=name)
+        changed = []
+        new_names = set(added)
+        for name, irc_mode in names.items():
+            if chat_users[name].irc_mode != irc_mode:
+                chat_users[name].set_irc_mode(irc_mode)
+                if name not in new_names:
+                    changed.append(name)
+        if added or removed or changed:
+            chat_users.needs_update = True
+        self.logger.info(
+            "Replaced roster of %s: %d users, %d added, %d removed",
+            channel,
+            len(chat_users),
+            len(added),
+            len(removed),
+        )
+        return added, removed, changed
+
+    def set_in_channel(self, channel=None):
+        channel = channel or self.active_channel
+        self.logger.info("Setting in channel %s", channel)
+        self.joined_channels.add(channel)
+        chat_users = self.channel_users(channel)
+        # our user is shared between channels, so faction and in game
+        # updates of the active channel are seen everywhere
+        if joined := self.channels_with_user(self.config.nick):
+            chat_users.set_user(self.config.nick, joined[0][self.config.nick])
+        chat_users.update_or_create(
             self.config.nick, self.config.current_faction
         )
         self.is_in_channel.set()
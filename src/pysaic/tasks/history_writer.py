@@ -0,0 +1,19 @@
+import asyncio
+import logging
+
+from pysaic.history import HistoryStore
+
+logger = logging.getLogger(__name__)
+
+
+async def history_writer(loop, store: HistoryStore, interval: float = 1):
+    logger.debug("Starting history writer")
+    while True:
+        await asyncio.sleep(interval)
+        if not store.has_pending():
+            continue
+
+        try:
+            await loop.run_in_executor(None, store.write_pending)
+        except Exception:
+            logger.exception("Could not write history")
@@ -1,5 +1,6 @@
 import logging
 
+from pysaic.context import AppContext
 from pysaic.entities import (
     OutgoingMessage,
     OutgoingQuery,
@@ -7,20 +8,16 @@ from pysaic.entities import (
     OutgoingNick,
     OutgoingPart,
     OutgoingJoin,
-    OutgoingQueue,
 )
 from pysaic.handlers import put_disconnected, put_connected
-from pysaic.state import State
 
 logger = logging.getLogger(__name__)
 
 
-async def outgoing_queue_processing(
-    irc,
-    outgoing_queue: OutgoingQueue,
-    state: State,
-):
+async def outgoing_queue_processing(irc, context: AppContext):
     logger.debug("Starting outgoing queue processing")
+    state = context.state
+    outgoing_queue = context.outgoing_queue
     while True:
         event = await outgoing_queue.get()
         # replace with a switch statement
@@ -36,14 +33,14 @@ async def outgoing_queue_processing(
                 event.channel,
                 event.content,
             )
-            state.set_not_in_channel()
-            await put_disconnected()
+            state.set_not_in_channel(event.channel)
+            await put_disconnected(event.channel, context.incoming_queue)
             irc.send(f"PART {event.channel} :{event.content}")
         elif isinstance(event, OutgoingJoin):
             logger.info('Joining channel "%s"', event.channel)
             irc.send(f"JOIN {event.channel}")
-            await put_connected()
-            state.set_in_channel()
+            await put_connected(event.channel, context.incoming_queue)
+            state.set_in_channel(event.channel)
         elif event is None:
             break
         else:
@@ -1,32 +1,32 @@
 import asyncio
 import logging
 
-from pysaic.script_reader.aiowatch import game_files_watcher
-from pysaic.state import State
+from pysaic.context import AppContext
+from pysaic.controllers.game import flush_game_digest
+from pysaic.script_reader.aiowatch import GameBridgeWatcher
 
 logger = logging.getLogger(__name__)
 
+RETARGET_INTERVAL = 1
 
-async def prepare_game_input_watcher(loop, config, state: State):
+
+async def prepare_game_input_watcher(
+    loop, context: AppContext, polling: bool = False
+):
     logger.debug("Starting game input watcher")
-    while state.game_location is None:
-        await asyncio.sleep(1)
+    watcher = GameBridgeWatcher(loop, context, polling=polling)
+    context.game_watcher = watcher
+    try:
+        while True:
+            # the game process may exit, restart or run from another place
+            watcher.retarget(context.state.game_location)
+            await asyncio.sleep(RETARGET_INTERVAL)
+    finally:
+        watcher.stop()
 
-    if state.game_related_tasks:
-        logger.warning(
-            "There are already game related tasks: %r",
-            state.game_related_tasks,
-        )
-        for task in state.game_related_tasks:
-            logger.info("Cancelling task %r", task)
-            task.cancel()
 
-    observer_task = loop.run_in_executor(
-        None,
-        game_files_watcher,
-        state.game_location / "gamedata" / "configs",
-        loop,
-        False,
-    )
-    # reduce number of tasks, everything could be done in observer
-    state.game_related_tasks = [observer_task]
+async def send_game_digests(context: AppContext):
+    logger.debug("Starting game digests")
+    while True:
+        await asyncio.sleep(context.game_throttle.digest_interval)
+        flush_game_digest()
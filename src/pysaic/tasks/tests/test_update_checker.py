@@ -0,0 +1,117 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pysaic.reconnect import backoff_delay
+from pysaic.tasks.update_checker import RETRY_BASE, RETRY_CAP, UpdateChecker
+
+ETAG = '"release-etag"'
+
+
+class StandInGithub:
+    def __init__(self, tag):
+        self.tag = tag
+        self.requests = []
+        self.fail = False
+
+    async def latest(self, request):
+        self.requests.append(request)
+        if self.fail:
+            return web.Response(status=503)
+        if request.headers.get("If-None-Match") == ETAG:
+            return web.Response(status=304)
+        return web.Response(
+            status=302,
+            headers={"Location": f"/releases/tag/{self.tag}", "ETag": ETAG},
+        )
+
+    def app(self):
+        app = web.Application()
+        app.router.add_route("*", "/releases/latest", self.latest)
+        return app
+
+
+async def run_checks(github, cache_file, times=1):
+    async with TestServer(github.app()) as server:
+        url = str(server.make_url("/releases/latest"))
+        results = []
+        for _ in range(times):
+            async with UpdateChecker(url, cache_file) as checker:
+                try:
+                    results.append(await checker.check())
+                except ValueError as error:
+                    results.append(error)
+        return url, results
+
+
+@pytest.fixture()
+def cache_file(tmp_path):
+    return str(tmp_path / "update_cache.yml")
+
+
+@patch("pysaic.settings.VERSION", "0.2.0")
+def test_newer_release_is_read_from_redirect_without_following_it(
+    cache_file,
+):
+    # given
+    github = StandInGithub("v0.3.0")
+
+    # when
+    url, results = asyncio.run(run_checks(github, cache_file))
+
+    # then
+    assert results == [url.replace("latest", "tag/v0.3.0")]
+    assert [request.method for request in github.requests] == ["HEAD"]
+
+
+@patch("pysaic.settings.VERSION", "0.2.0")
+def test_cached_etag_is_sent_and_not_modified_reuses_location(cache_file):
+    # given
+    github = StandInGithub("0.2.1")
+
+    # when
+    url, results = asyncio.run(run_checks(github, cache_file, times=2))
+
+    # then
+    assert results[0] == results[1] == url.replace("latest", "tag/0.2.1")
+    assert github.requests[1].headers["If-None-Match"] == ETAG
+
+
+@patch("pysaic.settings.VERSION", "0.2.0")
+def test_same_version_is_not_reported(cache_file):
+    # given
+    github = StandInGithub("0.2.0")
+
+    # when
+    _, results = asyncio.run(run_checks(github, cache_file))
+
+    # then
+    assert results == [None]
+
+
+def test_failed_check_raises(cache_file):
+    # given
+    github = StandInGithub("0.2.0")
+    github.fail = True
+
+    # when
+    _, results = asyncio.run(run_checks(github, cache_file))
+
+    # then
+    assert isinstance(results[0], ValueError)
+
+
+@patch("pysaic.reconnect.random.uniform", side_effect=max)
+def test_backoff_grows_and_is_capped(_uniform):
+    assert [
+        backoff_delay(failures, RETRY_BASE, RETRY_CAP)
+        for failures in (1, 2, 3, 10)
+    ] == [
+        60,
+        120,
+        240,
+        3600,
+    ]
@@ -1,49 +1,136 @@
 import asyncio
 import logging
+from typing import Optional
+from urllib.parse import urljoin
 
 import aiohttp
+import yaml
 
 from pysaic import settings
 from pysaic.entities import IncomingQueue, IncomingEvent
 from pysaic.enums import AppEventEnum
+from pysaic.reconnect import backoff_delay
 
 logger = logging.getLogger(__name__)
 
+LATEST_RELEASE_URL = "https://github.com/8r2y5/PySAIC/releases/latest"
+CACHE_FILE = "update_cache.yml"
+CHECK_INTERVAL = 600
+GAME_RUNNING_INTERVAL = 60
+RETRY_BASE = 30
+RETRY_CAP = 3600
 
-async def update_checker(incoming_update: IncomingQueue):
-    while True:
+
+def parse_version(location: str) -> tuple[int, ...]:
+    tag = location.rstrip("/").split("/").pop()
+    return tuple(map(int, tag.lstrip("v").split(".")))
+
+
+class UpdateChecker:
+    def __init__(
+        self,
+        url: str = LATEST_RELEASE_URL,
+        cache_file: str = CACHE_FILE,
+    ):
+        self.url = url
+        self.cache_file = cache_file
+        self.cache = self._load_cache()
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.failures = 0
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=1, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def latest_release(self) -> str:
+        """
+        Asks for the redirect target of the latest release without
+        following it. A 304 reuses the location cached by a previous run.
+        """
+        headers = {}
+        if etag := self.cache.get("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := self.cache.get("last_modified"):
+            headers["If-Modified-Since"] = last_modified
+
+        async with self.session.head(
+            self.url, headers=headers, allow_redirects=False
+        ) as response:
+            if response.status == 304 and self.cache.get("location"):
+                logger.debug("Latest release not modified")
+                return self.cache["location"]
+
+            if response.status not in (301, 302, 303, 307, 308):
+                raise ValueError(f"Unexpected http status {response.status}")
+
+            location = urljoin(self.url, response.headers["Location"])
+            self.cache = {
+                "location": location,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            self._save_cache()
+            return location
+
+    async def check(self) -> Optional[str]:
+        location = await self.latest_release()
+        current_version = parse_version(settings.VERSION)
+        if parse_version(location) > current_version:
+            logger.info("New version available: %s", location)
+            return location
+        return None
+
+    def _load_cache(self) -> dict:
+        try:
+            with open(self.cache_file) as f:
+                return yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            logger.exception("Could not read update cache")
+            return {}
+
+    def _save_cache(self):
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://github.com/8r2y5/PySAIC/releases/latest"
-                ) as response:
-                    if response.status == 200:
-                        newest_version = tuple(
-                            map(
-                                int,
-                                response.url.path.split("/").pop().split("."),
-                            )
-                        )
-                        current_version = tuple(
-                            map(int, settings.VERSION.split("."))
-                        )
-                        for index in range(3):
-                            if newest_version[index] > current_version[index]:
-                                logger.info(
-                                    "New version available: %s", response.url
-                                )
-                                incoming_update.put_nowait(
-                                    IncomingEvent.create_app_event(
-                                        AppEventEnum.NEW_VERSION, response.url
-                                    )
-                                )
-                                break
-                    else:
-                        logger.warning(
-                            "Failed to get latest release. Http status: %d",
-                            response.status,
-                        )
+            with open(self.cache_file, "w") as f:
+                yaml.dump(self.cache, f)
         except Exception:
-            logger.exception("Failed to get latest release")
+            logger.exception("Could not save update cache")
+
+
+async def update_checker(incoming_update: IncomingQueue, state):
+    announced = None
+    async with UpdateChecker() as checker:
+        while True:
+            if state.is_game_running:
+                await asyncio.sleep(GAME_RUNNING_INTERVAL)
+                continue
+
+            try:
+                location = await checker.check()
+            except Exception:
+                checker.failures += 1
+                logger.exception(
+                    "Failed to get latest release (%d in a row)",
+                    checker.failures,
+                )
+                await asyncio.sleep(
+                    backoff_delay(checker.failures, RETRY_BASE, RETRY_CAP)
+                )
+                continue
 
-        await asyncio.sleep(600)
+            checker.failures = 0
+            if location and location != announced:
+                announced = location
+                incoming_update.put_nowait(
+                    IncomingEvent.create_app_event(
+                        AppEventEnum.NEW_VERSION, location
+                    )
+                )
+            await asyncio.sleep(CHECK_INTERVAL)
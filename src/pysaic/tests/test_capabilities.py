@@ -0,0 +1,139 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+from asyncirc.protocol import IrcProtocol
+from asyncirc.server import BasicIPServer
+from irclib.parser import Message
+
+from pysaic.capabilities import CAPABILITIES, is_enabled, register_capabilities
+from pysaic.enums import IrcEvents
+from pysaic.handlers import handle_batch, handle_privmsg, handle_simple_event
+from pysaic.state import State
+
+
+async def negotiate(supported):
+    received = []
+    welcomed = asyncio.Event()
+
+    async def handle(reader, writer):
+        while line := await reader.readline():
+            line = line.decode().strip()
+            received.append(line)
+            command, _, rest = line.partition(" ")
+            if line == "CAP LS 302" and supported is not None:
+                writer.write(
+                    f":stand.in CAP * LS :{' '.join(supported)}\r\n".encode()
+                )
+            elif command == "CAP" and rest.startswith("REQ"):
+                capability = rest.split(":", 1)[1]
+                reply = "ACK" if capability in supported else "NAK"
+                writer.write(
+                    f":stand.in CAP * {reply} :{capability}\r\n".encode()
+                )
+            elif command == "USER":
+                writer.write(b":stand.in 001 brzys :Welcome\r\n")
+            await writer.drain()
+
+    async def on_welcome(_conn, _message):
+        welcomed.set()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    irc_server = BasicIPServer(host="127.0.0.1", port=port)
+    irc = IrcProtocol([irc_server], nick="brzys")
+    register_capabilities(irc)
+    irc.register("001", on_welcome)
+    try:
+        assert await irc._connect(irc_server)
+        await asyncio.wait_for(welcomed.wait(), 5)
+        # let the last ACK and the CAP END go through
+        await asyncio.sleep(0.1)
+        enabled = {cap for cap in CAPABILITIES if is_enabled(irc, cap)}
+    finally:
+        irc._quitting = True
+        irc._transport.close()
+        irc.close()
+        server.close()
+    return enabled, received
+
+
+def test_every_capability_is_negotiated():
+    # when
+    enabled, received = asyncio.run(negotiate(CAPABILITIES))
+
+    # then
+    assert enabled == set(CAPABILITIES)
+    assert "CAP END" in received
+
+
+def test_unsupported_capabilities_are_skipped():
+    # when
+    enabled, received = asyncio.run(
+        negotiate(["multi-prefix", "server-time", "account-tag"])
+    )
+
+    # then
+    assert enabled == {"multi-prefix", "server-time"}
+    assert "CAP REQ :batch" not in received
+    assert "CAP REQ :account-tag" not in received
+    assert "CAP END" in received
+
+
+def test_registration_works_without_cap_support():
+    # when
+    enabled, received = asyncio.run(negotiate(None))
+
+    # then
+    assert enabled == set()
+    assert any(line.startswith("USER") for line in received)
+
+
+def test_netsplit_batch_is_enqueued_once():
+    # given
+    state = State(
+        Mock(server=Mock(channels=[]), ignore_masks=[], filter_patterns=[])
+    )
+    queue = asyncio.Queue()
+    lines = [
+        ":stand.in BATCH +split netsplit hub.stand.in leaf.stand.in",
+        "@batch=split :Wolf!w@host QUIT :hub.stand.in leaf.stand.in",
+        "@batch=split :Fox!f@host QUIT :hub.stand.in leaf.stand.in",
+        ":stand.in BATCH -split",
+    ]
+
+    # when
+    async def feed():
+        for line in lines:
+            message = Message.parse(line)
+            if message.command == "BATCH":
+                await handle_batch(None, message, queue, state)
+            else:
+                await handle_simple_event(None, message, queue, state)
+
+    asyncio.run(feed())
+
+    # then
+    assert queue.qsize() == 1
+    event = queue.get_nowait().event
+    assert event.type == IrcEvents.BATCH
+    assert event.payload["quits"] == ["Wolf", "Fox"]
+    assert event.payload["joins"] == []
+
+
+def test_server_time_is_used_as_message_date():
+    # given
+    queue = asyncio.Queue()
+    message = Message.parse(
+        "@time=2024-05-01T10:00:00.000Z :Wolf!w@host PRIVMSG #crcr :hello"
+    )
+
+    # when
+    state = State(
+        Mock(server=Mock(channels=[]), ignore_masks=[], filter_patterns=[])
+    )
+    asyncio.run(handle_privmsg(None, message, queue, state))
+
+    # then
+    expected = datetime(2024, 5, 1, 10, tzinfo=timezone.utc).astimezone()
+    assert queue.get_nowait().created_at == expected.replace(tzinfo=None)
@@ -0,0 +1,44 @@
+import time
+from datetime import datetime
+
+from pysaic.entities import IncomingEvent, IncomingMessage
+
+
+def test_events_are_slotted():
+    # when
+    event = IncomingEvent.create_information_event("Connecting...")
+
+    # then
+    assert not hasattr(event, "__dict__")
+    assert not hasattr(event.event, "__dict__")
+
+
+def test_created_at_is_derived_from_the_timestamp():
+    # given
+    first = IncomingMessage("Wolf", "#crcr_english", "hello")
+    second = IncomingMessage("Fox", "#crcr_english", "hi")
+
+    # then
+    assert first.timestamp_ns <= second.timestamp_ns
+    assert abs((datetime.now() - first.created_at).total_seconds()) < 1
+
+
+def test_timestamp_is_read_from_the_wall_clock():
+    # when
+    message = IncomingMessage("Wolf", "#crcr_english", "hello")
+
+    # then
+    # the monotonic clock stops during a suspend, dates must not drift
+    assert abs(message.timestamp_ns - time.time_ns()) < 10**9
+
+
+def test_server_time_can_be_assigned():
+    # given
+    message = IncomingMessage("Wolf", "#crcr_english", "hello")
+    server_time = datetime(2024, 5, 1, 10, 0, 0, 123000)
+
+    # when
+    message.created_at = server_time
+
+    # then
+    assert message.created_at == server_time
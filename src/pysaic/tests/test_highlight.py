@@ -0,0 +1,114 @@
+from unittest.mock import Mock
+
+import pytest
+
+from pysaic.enums import FactionsEnum
+from pysaic.highlight import HighlightMatcher, Highlighter
+
+
+@pytest.fixture()
+def config():
+    return Mock(
+        highlight_aliases=["wolfie"],
+        highlight_words=["artifact"],
+        highlight_patterns=[r"\bsnork\w*"],
+        highlight_faction=False,
+        current_faction=FactionsEnum.Clear_Sky,
+    )
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Wolf, are you there?", True),
+        ("hi wolf", True),
+        ("[Wolf] said hi", False),
+        ("Werewolf is here", False),
+        ("Wolfgang is here", False),
+        ("ask Wolfie", True),
+        ("found an Artifact!", True),
+        ("artifacts everywhere", False),
+        ("snorks ahead", True),
+        ("Clear Sky base", False),
+    ],
+)
+def test_matcher(config, text, expected):
+    # given
+    matcher = Highlighter().get_matcher("Wolf", config)
+
+    # when / then
+    assert matcher.matches(text) is expected
+
+
+def test_nicks_with_special_characters_match_as_words():
+    # given
+    matcher = HighlightMatcher(words=["[Wolf]", "Wolf|afk"])
+
+    # then
+    assert matcher.matches("hey [Wolf]!")
+    assert matcher.matches("Wolf|afk: ping")
+    assert not matcher.matches("x[Wolf]x")
+
+
+def test_faction_name_highlights_when_enabled(config):
+    # given
+    config.highlight_faction = True
+
+    # when
+    matcher = Highlighter().get_matcher("Wolf", config)
+
+    # then
+    assert matcher.matches("Clear Sky base")
+
+
+def test_invalid_patterns_are_ignored():
+    # when
+    matcher = HighlightMatcher(words=["Wolf"], patterns=["(unclosed"])
+
+    # then
+    assert matcher.matches("Wolf")
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("a STALKER", True),
+        ("aaaaaa", True),
+        ("loot", True),
+        ("zone", True),
+        ("Wolf", True),
+        ("nothing", False),
+    ],
+)
+def test_patterns_with_groups_or_inline_flags(text, expected):
+    # when
+    matcher = HighlightMatcher(
+        words=["Wolf"],
+        patterns=[r"(?i)stalker", r"(\w)\1{5}", "(?P<x>loot)", "(?P<x>zone)"],
+    )
+
+    # then
+    assert matcher.matches(text) is expected
+
+
+def test_empty_matcher_matches_nothing():
+    assert not HighlightMatcher().matches("anything")
+
+
+def test_matcher_is_rebuilt_only_on_change(config):
+    # given
+    highlighter = Highlighter()
+
+    # when
+    first = highlighter.get_matcher("Wolf", config)
+    second = highlighter.get_matcher("Wolf", config)
+    renamed = highlighter.get_matcher("Fox", config)
+    config.highlight_words = ["artifact", "stash"]
+    reconfigured = highlighter.get_matcher("Fox", config)
+
+    # then
+    assert first is second
+    assert renamed is not first
+    assert reconfigured is not renamed
+    assert reconfigured.matches("a stash")
+    assert highlighter.builds == 3
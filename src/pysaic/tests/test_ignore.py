@@ -0,0 +1,134 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+from irclib.parser import Message
+
+from pysaic.handlers import handle_privmsg, handle_simple_event
+from pysaic.ignore import IgnoreList, mask_to_regex
+from pysaic.state import State
+
+
+@pytest.fixture()
+def state():
+    return State(
+        Mock(
+            server=Mock(channels=[]),
+            ignore_masks=["Spammer", "*!*@bots.example"],
+            filter_patterns=[r"buy\s+gold"],
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "mask, expected", [("Wolf", "Wolf!.*@.*"), ("*!w?@host", ".*!w.@host")]
+)
+def test_mask_to_regex(mask, expected):
+    assert mask_to_regex(mask) == expected
+
+
+@pytest.mark.parametrize(
+    "line, ignored",
+    [
+        (":spammer!s@host PRIVMSG #crcr :hi", True),
+        (":Spammer2!s@host PRIVMSG #crcr :hi", False),
+        (":Bot!b@bots.example PRIVMSG #crcr :hi", True),
+        (":Wolf!w@host PRIVMSG #crcr :hi", False),
+    ],
+)
+def test_masks(state, line, ignored):
+    assert state.ignores.is_ignored(Message.parse(line)) is ignored
+
+
+def test_hits_are_counted_per_rule(state):
+    # when
+    for nick in ("Spammer", "Spammer", "Bot"):
+        state.ignores.is_ignored(
+            Message.parse(f":{nick}!x@bots.example PRIVMSG #crcr :hi")
+        )
+    state.ignores.is_filtered("BUY  GOLD now")
+
+    # then
+    assert [rule.hits for rule in state.ignores.masks] == [2, 1]
+    assert state.ignores.filters[0].hits == 1
+
+
+def test_ignored_and_filtered_messages_are_not_enqueued(state):
+    # given
+    queue = asyncio.Queue()
+    lines = [
+        ":Spammer!s@host PRIVMSG #crcr :hello",
+        ":Wolf!w@host PRIVMSG #crcr :buy gold cheap",
+        ":Wolf!w@host PRIVMSG #crcr :\x01AMOGUS buy gold\x01",
+        ":Wolf!w@host PRIVMSG #crcr :good hunting",
+    ]
+
+    # when
+    async def feed():
+        for line in lines:
+            await handle_privmsg(None, Message.parse(line), queue, state)
+
+    asyncio.run(feed())
+
+    # then
+    assert [queue.get_nowait().content for _ in range(queue.qsize())] == [
+        "\x01AMOGUS buy gold\x01",
+        "good hunting",
+    ]
+
+
+def test_ignored_joins_are_dropped_but_quits_are_not(state):
+    # given
+    queue = asyncio.Queue()
+
+    # when
+    async def feed():
+        for line in (
+            ":Spammer!s@host JOIN #crcr",
+            ":Spammer!s@host QUIT :bye",
+        ):
+            await handle_simple_event(None, Message.parse(line), queue, state)
+
+    asyncio.run(feed())
+
+    # then
+    assert queue.qsize() == 1
+    assert queue.get_nowait().event.type.name == "QUIT"
+
+
+def test_rules_can_be_removed(state):
+    # when
+    removed = state.ignores.remove_mask("Spammer")
+    missing = state.ignores.remove_filter("nope")
+
+    # then
+    assert removed and not missing
+    assert not state.ignores.is_ignored(
+        Message.parse(":Spammer!s@host PRIVMSG #crcr :hi")
+    )
+
+
+def test_invalid_filters_are_rejected():
+    ignores = IgnoreList()
+    assert not ignores.add_filter("(unclosed")
+    assert not ignores.is_filtered("(unclosed")
+
+
+def test_filters_with_groups_or_inline_flags(state):
+    # given
+    filters = [r"(\w)\1{5}", r"(?i)spam", "(?P<r0>x)"]
+
+    # when
+    added = [state.ignores.add_filter(pattern) for pattern in filters]
+    state.ignores.add_mask("Bot")
+    ignores = IgnoreList(filters=filters)
+
+    # then
+    assert all(added)
+    assert state.ignores.is_filtered("zzzzzz")
+    assert state.ignores.is_filtered("SPAM")
+    assert state.ignores.is_filtered("xyz")
+    assert state.ignores.is_filtered("buy gold")
+    assert not state.ignores.is_filtered("good hunting")
+    assert [rule.hits for rule in state.ignores.filters] == [1, 1, 1, 1]
+    assert ignores.is_filtered("spam")
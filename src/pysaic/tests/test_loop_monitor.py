@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+
+from pysaic.loop_monitor import (
+    LagHistogram,
+    LoopMonitor,
+    SlowCallbackHandler,
+    callback_site,
+)
+
+
+def blocking_call():
+    time.sleep(0.15)
+
+
+def test_histogram_counts_and_percentiles():
+    # given
+    histogram = LagHistogram(window=4)
+
+    # when
+    for lag in (0.5, 0.001, 0.002, 0.03, 0.2):
+        histogram.add(lag)
+
+    # then
+    assert [count for _, count in histogram.counts() if count] == [2, 1, 1]
+    assert histogram.percentile(0.5) == 0.03
+    assert histogram.percentile(0.99) == 0.2
+
+
+def test_stall_is_attributed_to_the_blocking_call(caplog):
+    # given
+    statuses = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        monitor = LoopMonitor(
+            loop,
+            interval=0.01,
+            threshold=0.05,
+            on_status=statuses.append,
+            status_interval=0.1,
+        )
+        task = loop.create_task(monitor.run())
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.2)
+        task.cancel()
+        return monitor
+
+    # when
+    with caplog.at_level(logging.WARNING, "pysaic.loop_monitor"):
+        monitor = asyncio.run(run())
+
+    # then
+    assert list(monitor.stalls) == [f"{__name__}:blocking_call"]
+    assert monitor.stalled_for.total() >= 0.1
+    assert "Event loop stalled" in caplog.text
+    assert max(int(status.split()[1]) for status in statuses) >= 100
+
+
+def test_slow_callbacks_reported_by_asyncio_are_counted():
+    # given
+    monitor = LoopMonitor(asyncio.new_event_loop())
+    handler = SlowCallbackHandler(monitor)
+    record = logging.LogRecord(
+        "asyncio",
+        logging.WARNING,
+        __file__,
+        1,
+        "Executing %s took %.3f seconds",
+        (
+            "<Task pending name='Task-3' coro=<update_app() running at "
+            "main.py:101> created at base_events.py:447>",
+            0.3,
+        ),
+        None,
+    )
+
+    # when
+    handler.emit(record)
+    handler.emit(record)
+    monitor.loop.close()
+
+    # then
+    assert monitor.stalls == {"callback update_app": 2}
+
+
+def test_callback_site_without_a_coroutine():
+    handle = "<Handle foo() at 0x7f00 created at /app/bar.py:12>"
+    assert callback_site(handle) == "/app/bar.py:12"
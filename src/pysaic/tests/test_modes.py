@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+from irclib.parser import Message
+
+from pysaic.handlers import handle_mode
+from pysaic.modes import ChannelModes, ModeChange
+
+
+@pytest.fixture()
+def channel_modes():
+    return ChannelModes.from_server(
+        Mock(
+            isupport_tokens={
+                "PREFIX": "(Yqaohv)!~&@%+",
+                "CHANMODES": "beI,k,fl,imnpst",
+            }
+        )
+    )
+
+
+def test_parse_pairs_modes_with_arguments(channel_modes):
+    # when
+    changes = channel_modes.parse(
+        "+ovbl-k+Ym", ["a", "b", "*!*@bad", "10", "key", "c"]
+    )
+
+    # then
+    assert changes == [
+        ModeChange(True, "o", "a"),
+        ModeChange(True, "v", "b"),
+        ModeChange(True, "b", "*!*@bad"),
+        ModeChange(True, "l", "10"),
+        ModeChange(False, "k", "key"),
+        ModeChange(True, "Y", "c"),
+        ModeChange(True, "m"),
+    ]
+
+
+def test_unset_limit_takes_no_argument(channel_modes):
+    assert channel_modes.parse("-l+v", ["a"]) == [
+        ModeChange(False, "l"),
+        ModeChange(True, "v", "a"),
+    ]
+
+
+def test_ranks_follow_the_server_prefix(channel_modes):
+    assert channel_modes.prefixes["Y"] == "!"
+    assert channel_modes.ranks == {
+        "!": 6,
+        "~": 5,
+        "&": 4,
+        "@": 3,
+        "%": 2,
+        "+": 1,
+        "": 0,
+    }
+
+
+def test_defaults_without_isupport():
+    channel_modes = ChannelModes.from_server(Mock(isupport_tokens={}))
+    assert channel_modes.prefixes == {
+        "q": "~",
+        "a": "&",
+        "o": "@",
+        "h": "%",
+        "v": "+",
+    }
+
+
+def test_handle_mode_keeps_every_target():
+    # given
+    queue = asyncio.Queue()
+    conn = Mock(server=Mock(isupport_tokens={}))
+    message = Message.parse(":op!o@host MODE #crcr +ovb-v a b *!*@x c")
+
+    # when
+    asyncio.run(handle_mode(conn, message, queue))
+
+    # then
+    payload = queue.get_nowait().event.payload
+    assert [(c.adding, c.mode, c.argument) for c in payload["changes"]] == [
+        (True, "o", "a"),
+        (True, "v", "b"),
+        (False, "v", "c"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "line",
+    [":op!o@host MODE #crcr +b *!*@x", ":me MODE me +i", ":op MODE #crcr +m"],
+)
+def test_handle_mode_skips_lines_without_prefix_changes(line):
+    # given
+    queue = asyncio.Queue()
+    conn = Mock(server=Mock(isupport_tokens={}))
+
+    # when
+    asyncio.run(handle_mode(conn, Message.parse(line), queue))
+
+    # then
+    assert queue.empty()
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from pysaic.profiler import CallProfiler, Profiler, StackSampler
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_stack_sampler_finds_the_busy_function(tmp_path):
+    # given
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,))
+    worker.start()
+    sampler = StackSampler(interval=0.001, thread_id=worker.ident)
+
+    # when
+    sampler.start()
+    time.sleep(0.2)
+    sampler.stop()
+    stop.set()
+    worker.join()
+    sampler.write(tmp_path / "profile.collapsed")
+
+    # then
+    label = f"{__name__}:busy_loop"
+    assert sampler.samples > 0
+    assert sampler.top(1)[0][0] == label
+    lines = (tmp_path / "profile.collapsed").read_text().splitlines()
+    assert lines[0].split()[0].endswith(label)
+    assert sum(int(line.split()[1]) for line in lines) == sampler.samples
+
+
+def test_call_profiler_reports_top_functions(tmp_path):
+    # given
+    profiler = CallProfiler()
+
+    # when
+    profiler.start()
+    sorted(str(x) for x in range(10_000))
+    profiler.stop()
+    profiler.write(tmp_path / "profile.pstats")
+
+    # then
+    top = profiler.top(3)
+    assert len(top) == 3
+    assert sum(share for _, share in top) <= 1.0
+    assert (tmp_path / "profile.pstats").stat().st_size > 0
+
+
+def test_profiler_writes_into_the_directory(tmp_path):
+    # given
+    profiler = Profiler(tmp_path / "logs")
+
+    # when
+    profiler.start()
+    time.sleep(0.05)
+    path = profiler.stop()
+
+    # then
+    assert path.parent == tmp_path / "logs"
+    assert path.suffix == ".collapsed"
+    assert len(profiler.top()) <= 10
@@ -0,0 +1,58 @@
+import asyncio
+import random
+from unittest.mock import AsyncMock, Mock, patch
+
+from pysaic.reconnect import ConnectionStats, ReconnectManager, backoff_delay
+
+
+def test_backoff_delay_is_capped():
+    # given
+    rand = random.Random(1)
+
+    # when
+    delays = [backoff_delay(attempt, 1, 60, rand) for attempt in range(20)]
+
+    # then
+    assert all(0 <= delay <= 60 for delay in delays)
+    assert all(delay <= 2**attempt for attempt, delay in enumerate(delays))
+
+
+def test_manager_retries_next_server_with_backoff():
+    # given
+    first, second = Mock(host="first"), Mock(host="second")
+    irc = Mock(servers=[first, second], _quitting=False)
+    irc._connect = AsyncMock(side_effect=[False, False, True])
+    stats = ConnectionStats()
+    manager = ReconnectManager(irc, stats, rand=random.Random(1))
+
+    # when
+    with patch("pysaic.reconnect.asyncio.sleep", AsyncMock()) as sleep:
+        asyncio.run(manager.connect())
+
+    # then
+    assert [call.args[0] for call in irc._connect.await_args_list] == [
+        first,
+        second,
+        first,
+    ]
+    assert sleep.await_count == 2
+    assert stats.attempts == 3
+
+
+def test_stats_track_drops_and_time_to_recovery():
+    # given
+    irc = Mock(_quitting=False)
+    stats = ConnectionStats()
+    manager = ReconnectManager(irc, stats)
+
+    # when
+    with patch("pysaic.reconnect.time.monotonic", side_effect=[10, 14.5]):
+        manager.connection_lost()
+        manager.connection_lost()
+        recovery_time = stats.recovered()
+
+    # then
+    assert stats.drops == 2
+    assert recovery_time == 4.5
+    assert stats.last_recovery_time == 4.5
+    assert not stats.is_recovering
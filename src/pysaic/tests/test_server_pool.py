@@ -0,0 +1,141 @@
+import asyncio
+import socket
+from unittest.mock import AsyncMock, Mock
+
+from pysaic.config import Endpoint, Server
+from pysaic.reconnect import ConnectionStats, ReconnectManager
+from pysaic.server_pool import ServerPool, probe_endpoint
+
+
+async def stand_in(delay=None):
+    """A server welcoming after `delay`, or never when it is None."""
+
+    async def handle(reader, writer):
+        while line := await reader.readline():
+            if line.startswith(b"USER") and delay is not None:
+                await asyncio.sleep(delay)
+                writer.write(b":stand.in 001 nick :Welcome\r\n")
+                await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, Endpoint("127.0.0.1", port)
+
+
+def closed_endpoint():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return Endpoint("127.0.0.1", sock.getsockname()[1])
+
+
+def test_all_endpoints_start_with_the_primary_one():
+    # given
+    server = Server(
+        host="irc.one",
+        port=6667,
+        channels=[],
+        previous_channel="",
+        endpoints=[Endpoint("irc.two", 6667), Endpoint("irc.one", 6667)],
+    )
+
+    # when
+    endpoints = server.all_endpoints()
+
+    # then
+    assert endpoints == [Endpoint("irc.one", 6667), Endpoint("irc.two", 6667)]
+
+
+def test_probe_reports_failures():
+    async def probe():
+        silent, silent_endpoint = await stand_in()
+        try:
+            return await asyncio.gather(
+                probe_endpoint(silent_endpoint, timeout=0.2),
+                probe_endpoint(closed_endpoint(), timeout=0.2),
+            )
+        finally:
+            silent.close()
+
+    # when
+    silent, closed = asyncio.run(probe())
+
+    # then
+    assert not silent.ok
+    assert silent.connect_time is not None
+    assert silent.error == "timed out"
+    assert not closed.ok
+    assert closed.connect_time is None
+
+
+def test_pool_picks_the_fastest_endpoint_and_caches_the_ranking(tmp_path):
+    # given
+    probe_file = str(tmp_path / "server_probes.json")
+
+    async def probe():
+        slow, slow_endpoint = await stand_in(0.3)
+        fast, fast_endpoint = await stand_in(0.05)
+        silent, silent_endpoint = await stand_in()
+        endpoints = [
+            closed_endpoint(),
+            silent_endpoint,
+            slow_endpoint,
+            fast_endpoint,
+        ]
+        pool = ServerPool(endpoints, probe_file=probe_file, timeout=1)
+        try:
+            servers = await pool.prepare()
+            first = pool.ranked()
+            await asyncio.gather(*pool.pending)
+            return endpoints, pool, servers, first
+        finally:
+            for server in (slow, fast, silent):
+                server.close()
+
+    # when
+    endpoints, pool, servers, first = asyncio.run(probe())
+    closed, silent, slow, fast = endpoints
+
+    # then
+    assert first[0] == fast
+    assert servers[0].port == fast.port
+    assert pool.ranked() == [fast, slow, closed, silent]
+    assert ServerPool(endpoints, probe_file=probe_file).ranked()[0] == fast
+
+
+def test_cached_ranking_is_used_without_waiting_for_probes(tmp_path):
+    # given
+    probe_file = str(tmp_path / "server_probes.json")
+    first, second = Endpoint("irc.one", 6667), Endpoint("irc.two", 6667)
+    cached = ServerPool([first, second], probe_file=probe_file)
+    cached.times = {first.key: [0.1, None], second.key: [0.1, 0.5]}
+    cached.save()
+    pool = ServerPool([first, second], probe_file=probe_file)
+
+    async def never():
+        await asyncio.Event().wait()
+
+    pool.probe = never
+
+    # when
+    servers = asyncio.run(asyncio.wait_for(pool.prepare(), 1))
+
+    # then
+    assert [server.host for server in servers] == ["irc.two", "irc.one"]
+
+
+def test_manager_connects_in_ranked_order():
+    # given
+    pool = Mock()
+    first, second = Mock(host="first"), Mock(host="second")
+    pool.prepare = AsyncMock(return_value=[second, first])
+    irc = Mock(servers=[first, second], _quitting=False)
+    irc._connect = AsyncMock(return_value=True)
+    manager = ReconnectManager(irc, ConnectionStats(), pool=pool)
+
+    # when
+    asyncio.run(manager.connect())
+
+    # then
+    irc._connect.assert_awaited_once_with(second)
+    assert irc.servers == [second, first]
@@ -0,0 +1,147 @@
+from unittest.mock import Mock
+
+import pytest
+
+from pysaic.config import Channel
+from pysaic.entities import ChatUser
+from pysaic.enums import FactionsEnum
+from pysaic.state import State
+
+
+@pytest.fixture()
+def config():
+    config = Mock()
+    config.nick = "brzys"
+    config.ignore_masks = config.filter_patterns = []
+    config.current_faction = FactionsEnum.Duty
+    config.server.channels = [
+        Channel("#crcr_english", "CRCR English"),
+        Channel("#pysaic_english", "PySAIC English"),
+    ]
+    config.server.previous_channel = "#crcr_english"
+    return config
+
+
+@pytest.fixture()
+def state(config):
+    state = State(config)
+    state.set_in_channel("#crcr_english")
+    state.set_in_channel("#pysaic_english")
+    return state
+
+
+def test_switching_channel_keeps_every_roster(state, config):
+    # given
+    state.channel_users("#pysaic_english").add_user("Wolf", ChatUser("Wolf"))
+
+    # when
+    config.server.previous_channel = "#pysaic_english"
+
+    # then
+    assert set(state.chat_users) == {"brzys", "Wolf"}
+    assert set(state.channel_users("#crcr_english")) == {"brzys"}
+
+
+def test_our_user_is_shared_between_channels(state):
+    # when
+    state.chat_users["brzys"].in_game = True
+
+    # then
+    assert state.channel_users("#pysaic_english")["brzys"].in_game is True
+
+
+def test_rename_applies_to_every_channel(state):
+    # given
+    for channel in state.channels:
+        state.channel_users(channel).add_user("Wolf", ChatUser("Wolf"))
+
+    # when
+    state.rename_user("Wolf", "Fox")
+
+    # then
+    for chat_users in state.channels.values():
+        assert "Wolf" not in chat_users
+        assert chat_users["Fox"].name == "Fox"
+
+
+def test_leaving_one_channel_keeps_the_other(state):
+    # when
+    state.set_not_in_channel("#pysaic_english")
+
+    # then
+    assert state.joined_channels == {"#crcr_english"}
+    assert state.is_in_channel.is_set()
+    assert state.channel_users("#pysaic_english") == {}
+
+
+def test_reconnect_keeps_roster_until_names_are_reconciled(state):
+    # given
+    chat_users = state.channel_users("#crcr_english")
+    chat_users.add_user("Wolf", ChatUser("Wolf", faction=FactionsEnum.Freedom))
+    chat_users.add_user("Fox", ChatUser("Fox"))
+
+    # when
+    state.set_reconnecting()
+
+    # then
+    assert set(chat_users) == {"brzys", "Wolf", "Fox"}
+    assert not state.is_in_channel.is_set()
+
+    # when
+    state.stage_names("#crcr_english", ["@brzys", "Wolf", "+Sid"])
+    names = state.pending_names.pop("#crcr_english")
+    added, removed, _ = state.replace_roster("#crcr_english", names)
+
+    # then
+    assert added == ["Sid"]
+    assert removed == ["Fox"]
+    assert chat_users["Wolf"].faction == FactionsEnum.Freedom
+    assert "#crcr_english" not in state.stale_channels
+
+
+def test_names_replies_are_committed_as_one_roster(state):
+    # given
+    state.stage_names("#crcr_english", ["@+brzys", "Wolf"])
+    state.stage_names("#crcr_english", ["%Fox", "Sid"])
+
+    # when
+    added, removed, changed = state.replace_roster(
+        "#crcr_english", state.pending_names.pop("#crcr_english")
+    )
+
+    # then
+    chat_users = state.channel_users("#crcr_english")
+    assert set(chat_users) == {"brzys", "Wolf", "Fox", "Sid"}
+    assert added == ["Wolf", "Fox", "Sid"]
+    assert removed == []
+    assert changed == ["brzys"]
+    assert chat_users["brzys"].irc_mode == "@"
+    assert chat_users["Fox"].name == "Fox"
+    assert chat_users["Fox"].irc_mode == "%"
+
+
+def test_rename_is_done_in_place(state):
+    # given
+    wolf = ChatUser("Wolf", in_game=True, faction=FactionsEnum.Freedom)
+    for channel in state.channels:
+        state.channel_users(channel).add_user("Wolf", wolf)
+
+    # when
+    state.rename_user("Wolf", "Fox")
+
+    # then
+    for chat_users in state.channels.values():
+        assert chat_users["Fox"] is wolf
+    assert wolf.name == "Fox"
+    assert wolf.in_game is True
+    assert wolf.faction == FactionsEnum.Freedom
+
+
+def test_chat_users_are_slotted_and_interned():
+    # when
+    first = ChatUser("".join(["Wo", "lf"]))
+    second = ChatUser("".join(["Wol", "f"]))
+
+    # then
+    assert not hasattr(first, "__dict__")
+    assert first.name is second.name
@@ -4,7 +4,16 @@ import re
 from pathlib import Path
 from asyncio import Queue
 from functools import partial
-from tkinter import Button, Entry, Frame, OptionMenu, StringVar, Text, Tk
+from tkinter import (
+    Button,
+    Entry,
+    Frame,
+    Label,
+    OptionMenu,
+    StringVar,
+    Text,
+    Tk,
+)
 from tkinter.font import Font
 from tkinter.ttk import Scrollbar, Style
 
@@ -124,12 +133,24 @@ class App(Tk):
 
         chat_scroll = Scrollbar(left_frame)
         self.messages_list = Text(
-            left_frame, yscrollcommand=chat_scroll.set, background="gray40"
+            left_frame,
+            yscrollcommand=partial(self._on_messages_scroll, chat_scroll),
+            background="gray40",
         )
         self.messages_list.grid(row=0, column=0, sticky="nsew")
         chat_scroll.config(command=self.messages_list.yview)
         chat_scroll.grid(row=0, column=1, sticky="ns")
 
+    def _on_messages_scroll(self, chat_scroll, first, last):
+        chat_scroll.set(first, last)
+        # scrolled to the top of a list that does not fit on the screen
+        if float(first) == 0.0 and float(last) < 1.0:
+            if self.pysaic_state.history_exhausted:
+                return
+            self.incoming_queue.put_nowait(
+                IncomingEvent.create_app_event(AppEventEnum.LOAD_HISTORY, None)
+            )
+
     def _prepare_right_frame(self):
         right_frame = Frame(
             self.main_frame, padx=3, pady=3, background=BACKGROUND_COLOR
@@ -255,6 +276,18 @@ class App(Tk):
         )
 
         self.send_button.pack(side="left", padx=3, pady=3)
+        self.status_label = Label(
+            self.bottom_frame,
+            width=12,
+            anchor="e",
+            foreground="gray70",
+            background=BACKGROUND_COLOR,
+        )
+        self.status_label.pack(side="left", padx=3, pady=3)
+
+    def set_status(self, text):
+        if self.status_label.cget("text") != text:
+            self.status_label.config(text=text)
 
     def _nick_auto_complete(self, _event):
         self.input_message.focus_set()
@@ -6,6 +6,7 @@ from random import choice
 import inject
 
 from pysaic.config import Config
+from pysaic.context import AppContext, set_app_context
 from pysaic.entities import (
     ChatUser,
     ErrorEvent,
@@ -112,6 +113,9 @@ def mock_ui():
     outgoing_queue = Queue()
     config = Config.load_config()
     state = State(config)
+    set_app_context(
+        AppContext(config, state, incoming_queue, outgoing_queue)
+    )
     app = App(state, config, incoming_queue, outgoing_queue)
     inject.configure(
         partial(
@@ -37,7 +37,7 @@ class Options:
         self.options_window = Toplevel(self.main_window)
         self.options_window.title("Options")
         self.options_window.configure(bg=self.main_window.cget("bg"))
-        self.options_window.geometry("400x335")
+        self.options_window.geometry("400x365")
         self.options_window.resizable(False, False)
         self.options_window.iconbitmap(PATH / "crcr_icon_new.ico")
 
@@ -231,6 +231,32 @@ class Options:
 
         news_frame.pack(side="left")
         client_config_frame.pack()
+
+        game_messages_frame = Frame(
+            self.options_window, background=background_color
+        )
+        game_messages_label = Label(
+            game_messages_frame,
+            text="Channel messages in game per second (0 = no limit):",
+            background=background_color,
+            foreground=text_color,
+        )
+        game_messages_label.pack(side="left")
+        self.game_messages_spinbox = Spinbox(
+            game_messages_frame,
+            from_=0,
+            to=20,
+            increment=1,
+            width=4,
+            background=background_color,
+            foreground=text_color,
+        )
+        self.game_messages_spinbox.delete(0, "end")
+        self.game_messages_spinbox.insert(
+            0, str(self.config.game_messages_per_second)
+        )
+        self.game_messages_spinbox.pack(side="left")
+        game_messages_frame.pack()
         self._add_separator()
 
         user_display_frame = Frame(
@@ -341,6 +367,16 @@ class Options:
         )
         self.config.news_sound = self.sound_notification_var.get()
 
+        logger.debug(
+            "game_messages_per_second: %r", self.game_messages_spinbox.get()
+        )
+        try:
+            self.config.game_messages_per_second = max(
+                0, int(self.game_messages_spinbox.get())
+            )
+        except ValueError:
+            logger.warning("Invalid game messages per second, keeping it")
+
         logger.debug("user_list_display: %r", self.user_list_display_var.get())
         self.config.user_list_display = self.user_list_display_var.get()
 
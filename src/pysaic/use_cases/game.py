@@ -3,10 +3,10 @@ import logging
 from datetime import datetime
 from random import randint
 
-import inject
-
-from pysaic.config import Config
+from pysaic.context import AppContext
 from pysaic.controllers.game import add_setting_to_game
+from pysaic.controllers.game_input import configs_path, input_file_path
+from pysaic.controllers.game_segments import SegmentReader, SegmentWriter
 from pysaic.crc_strings.use_case import DeathMessageUseCase
 from pysaic.entities import (
     AppEvent,
@@ -18,14 +18,13 @@ from pysaic.entities import (
 )
 from pysaic.enums import AppEventEnum
 from pysaic.events.enum import GameEvents
-from pysaic.handlers import join_previous_channel
+from pysaic.use_cases.common import join_channels
 from pysaic.script_reader.entities import (
     ConnectionLost,
     Death,
     Handshake,
     Money,
 )
-from pysaic.state import State
 
 logger = logging.getLogger(__name__)
 
@@ -41,20 +40,15 @@ class PlayerDiedUseCase:
     def channel(self):
         return self.config.server.previous_channel
 
-    def __init__(
-        self,
-        config,
-        death: Death,
-        incoming_queue,
-        outgoing_queue,
-    ):
+    def __init__(self, context: AppContext, death: Death):
         self.death = death
-        self.config = config
-        self.incoming_queue = incoming_queue
-        self.outgoing_queue = outgoing_queue
+        self.config = context.config
+        self.state = context.state
+        self.incoming_queue = context.incoming_queue
+        self.outgoing_queue = context.outgoing_queue
 
-    @inject.autoparams()
-    async def execute(self, state: State):
+    async def execute(self):
+        state = self.state
         now = datetime.now()
         if (
             state.last_death is not None
@@ -66,16 +60,20 @@ class PlayerDiedUseCase:
         else:
             state.last_death = now
 
-        try:
-            message = DeathMessageUseCase(self.nick, self.death).execute()
-        except Exception:
-            logger.exception("Could not generate death message")
-            return
-
-        logger.debug("Player death message: %r", message)
+        # the report is generated off the loop while the delay runs
+        report = asyncio.get_running_loop().run_in_executor(
+            None, DeathMessageUseCase(self.nick, self.death).execute
+        )
 
         async def send_later():
             await asyncio.sleep(randint(3, SECONDS_BETWEEN_DEATHS))
+            try:
+                message = await report
+            except Exception:
+                logger.exception("Could not generate death message")
+                return
+
+            logger.debug("Player death message: %r", message)
             await self.incoming_queue.put(
                 IncomingMessage(
                     author=self.nick,
@@ -94,17 +92,17 @@ class PlayerDiedUseCase:
 
 
 class GameHandshakeUseCase:
-    def __init__(
-        self,
-        config: Config,
-        handshake: Handshake,
-        incoming_queue,
-    ):
+    def __init__(self, context: AppContext, handshake: Handshake):
         self.handshake = handshake
-        self.config = config
-        self.incoming_queue = incoming_queue
+        self.context = context
+        self.config = context.config
+        self.incoming_queue = context.incoming_queue
 
     async def execute(self):
+        self._negotiate_bridge()
+        # UPDATE_USERS below sends the fresh script a full snapshot
+        self.context.game_roster.reset(self.handshake.supports_roster_deltas)
+        self.context.game_throttle.reset()
         await self.incoming_queue.put(
             IncomingEvent(
                 author="pysaic",
@@ -124,6 +122,28 @@ class GameHandshakeUseCase:
             )
         )
 
+    def _negotiate_bridge(self):
+        game_location = self.context.state.game_location
+        # a restarted script reads crc_input.txt again, whatever the last
+        # session had switched to
+        self.context.game_input.use_segments(
+            input_file_path(game_location), None
+        )
+        if not self.handshake.supports_segments:
+            self.context.game_output = None
+            return
+
+        logger.info("Switching the game bridge to segments")
+        directory = configs_path(game_location)
+        game_output = SegmentReader(directory)
+        game_output.reset()
+        self.context.game_output = game_output
+        # still goes through crc_input.txt, the script switches on reading it
+        add_setting_to_game("Bridge", "Segments")
+        self.context.game_input.use_segments(
+            input_file_path(game_location), SegmentWriter(directory)
+        )
+
     def _send_settings_to_game(self):
         add_setting_to_game("NewsDuration", str(self.config.news_duration))
         add_setting_to_game("ChatKey", self.config.chat_key.upper())
@@ -153,23 +173,17 @@ class GameHandshakeUseCase:
 
 
 class GameChannelMessageUseCase:
-    def __init__(
-        self,
-        config,
-        channel_message,
-        incoming_queue,
-        outgoing_queue,
-    ):
-        self.config = config
+    def __init__(self, context: AppContext, channel_message):
+        self.config = context.config
+        self.state = context.state
         self.channel_message = channel_message
-        self.incoming_queue = incoming_queue
-        self.outgoing_queue = outgoing_queue
+        self.incoming_queue = context.incoming_queue
+        self.outgoing_queue = context.outgoing_queue
 
-    @inject.autoparams()
-    async def execute(self, state: State):
+    async def execute(self):
         logger.info("Channel message: %r", self.channel_message)
 
-        if state.is_in_channel is False:
+        if self.state.is_in_channel is False:
             logger.debug("Not in channel, ignoring message")
             await self.incoming_queue.put(
                 IncomingEvent.create_error_event(
@@ -209,15 +223,10 @@ class GameChannelMessageUseCase:
 
 
 class MoneyChangeUseCase:
-    def __init__(
-        self,
-        money: Money,
-        incoming_queue,
-        outgoing_queue,
-    ):
+    def __init__(self, context: AppContext, money: Money):
         self.money = money
-        self.incoming_queue = incoming_queue
-        self.outgoing_queue = outgoing_queue
+        self.incoming_queue = context.incoming_queue
+        self.outgoing_queue = context.outgoing_queue
 
     async def execute(self):
         logger.info("Money change: %r", self.money)
@@ -234,20 +243,15 @@ class MoneyChangeUseCase:
 
 
 class ConnectionLostUseCase:
-    def __init__(
-        self,
-        config: Config,
-        entity: ConnectionLost,
-        incoming_queue,
-        outgoing_queue,
-    ):
+    def __init__(self, context: AppContext, entity: ConnectionLost):
         self.entity = entity
-        self.config = config
-        self.incoming_queue = incoming_queue
-        self.outgoing_queue = outgoing_queue
+        self.config = context.config
+        self.state = context.state
+        self.incoming_queue = context.incoming_queue
+        self.outgoing_queue = context.outgoing_queue
 
-    @inject.autoparams()
-    async def execute(self, state: State):
+    async def execute(self):
+        state = self.state
         if (
             self.entity.lost is True
             and self.config.disconnect_when_blowout_or_underground
@@ -256,20 +260,16 @@ class ConnectionLostUseCase:
                 return
 
             state.fake_disconnect = True
-            outgoing_message = OutgoingPart(
-                channel=self.config.server.previous_channel,
-                content=self.entity.reason,
-            )
+            for channel in sorted(state.joined_channels):
+                await self.outgoing_queue.put(
+                    OutgoingPart(channel=channel, content=self.entity.reason)
+                )
         elif self.entity is False or self.entity.lost is False:
             if not state.fake_disconnect:
                 return
 
             state.fake_disconnect = False
-            join_previous_channel()
-        else:
-            return
-
-        await self.outgoing_queue.put(outgoing_message)
+            join_channels(self.outgoing_queue, self.config)
 
 
 async def actor_status_use_case(
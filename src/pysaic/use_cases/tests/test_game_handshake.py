@@ -0,0 +1,43 @@
+from unittest.mock import Mock
+
+import pytest
+
+from pysaic.context import AppContext, set_app_context
+from pysaic.controllers.game import add_information_message_to_game
+from pysaic.controllers.game_input import configs_path, input_file_path
+from pysaic.script_reader.entities import Handshake
+from pysaic.settings import SEGMENT_BRIDGE_VERSION
+from pysaic.use_cases.game import GameHandshakeUseCase
+
+
+@pytest.fixture()
+def context(tmp_path):
+    configs_path(tmp_path).mkdir(parents=True)
+    context = AppContext(
+        config=Mock(),
+        state=Mock(game_location=tmp_path),
+        incoming_queue=Mock(),
+        outgoing_queue=Mock(),
+    )
+    set_app_context(context)
+    yield context
+    set_app_context(None)
+
+
+def test_every_handshake_switches_through_the_input_file(context, tmp_path):
+    # given
+    input_path = input_file_path(tmp_path)
+    handshake = Handshake(version=SEGMENT_BRIDGE_VERSION)
+
+    for _ in range(2):
+        # when
+        GameHandshakeUseCase(context, handshake)._negotiate_bridge()
+
+        # then
+        assert input_path.read_text() == "Setting/Bridge/Segments\n"
+
+        # the game reads the switch, further lines go to segments
+        input_path.write_text("")
+        add_information_message_to_game("hello")
+        assert input_path.read_text() == ""
+        assert context.game_input.segments.unread
@@ -2,6 +2,7 @@ import logging
 from tkinter import END
 
 from pysaic.controllers.game import add_dm_message_to_game
+from pysaic.controllers.history import add_dm_message_to_history
 from pysaic.settings import END_OF_ACTOR_CHARACTER
 from pysaic.use_cases.ui.use_case import UiUseCase
 from pysaic.use_cases.ui.utils import (
@@ -27,6 +28,14 @@ class AddDmMessage(UiUseCase):
             self._add_target_and_faction_color()
             self._add_content_to_message(self.event)
             self.messages_list.see(END)
+        add_dm_message_to_history(
+            self.event.created_at,
+            self.event.author,
+            self.event.author,
+            self._get_faction_color(self.event.author),
+            self.event.target,
+            self.event.content.split(END_OF_ACTOR_CHARACTER, 1)[-1],
+        )
 
     def _add_dm_message_to_game(self):
         try:
@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import math
 
 import inject
 
@@ -11,6 +13,8 @@ from pysaic.entities import (
     IncomingEvent,
 )
 from pysaic.enums import AppEventEnum
+from pysaic.history import HistoryStore
+from pysaic.profiler import start_profiling, stop_profiling
 from pysaic.settings import END_OF_ACTOR_CHARACTER
 from pysaic.state import State
 from pysaic.ui.app import App
@@ -18,6 +22,22 @@ from pysaic.use_cases.ui.our_priv_message import OurPrivMessageUseCase
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PROFILE_SECONDS = 10
+MAX_PROFILE_SECONDS = 300
+
+
+def report_profile(incoming_queue: IncomingQueue):
+    path, top = stop_profiling()
+    if path is None:
+        return
+    incoming_queue.put_nowait(
+        IncomingEvent.create_information_event(
+            f"Profile saved to {path}, top functions:"
+        )
+    )
+    for line in top:
+        incoming_queue.put_nowait(IncomingEvent.create_information_event(line))
+
 
 class CommandUseCase:
     def __init__(self, state: State, config: Config, ui: App):
@@ -37,6 +57,10 @@ class CommandUseCase:
             "commands": self.handle_commands,
             "nick": self.handle_nick,
             "pay": self.handle_pay,
+            "search": self.handle_search,
+            "ignore": self.handle_ignore,
+            "filter": self.handle_filter,
+            "profile": self.handle_profile,
         }
 
     @classmethod
@@ -168,6 +192,130 @@ class CommandUseCase:
             )
         )
 
+    @inject.autoparams()
+    def handle_search(
+        self, params, incoming_queue: IncomingQueue, store: HistoryStore
+    ):
+        """
+        Searches chat history. Usage: /search [#channel] <text>
+        """
+        if not params:
+            self.handle_help("search")
+            return
+
+        channel = None
+        if params.startswith("#") and " " in params:
+            channel, params = params.split(" ", 1)
+
+        store.write_pending()
+        records = store.search(params, channel)
+        if not records:
+            incoming_queue.put_nowait(
+                IncomingEvent.create_information_event(
+                    f"Nothing found for {params!r}."
+                )
+            )
+            return
+
+        for record in reversed(records):
+            incoming_queue.put_nowait(
+                IncomingEvent.create_information_event(
+                    f"{record.created_at:%Y-%m-%d %H:%M:%S} {record.channel} "
+                    f"{record.author}: {record.content}"
+                )
+            )
+
+    @inject.autoparams()
+    def handle_profile(
+        self,
+        params,
+        incoming_queue: IncomingQueue,
+        loop: asyncio.AbstractEventLoop,
+    ):
+        """
+        Profiles the client for a while and saves the result into logs/.
+        Usage: /profile [seconds]
+        """
+        try:
+            seconds = float(params or DEFAULT_PROFILE_SECONDS)
+        except ValueError:
+            seconds = math.nan
+        if not math.isfinite(seconds):
+            self.handle_help("profile")
+            return
+        seconds = min(max(seconds, 1), MAX_PROFILE_SECONDS)
+
+        if not start_profiling():
+            text = "Profiling is already running."
+        else:
+            loop.call_later(seconds, report_profile, incoming_queue)
+            text = f"Profiling for {seconds:g} seconds."
+        incoming_queue.put_nowait(IncomingEvent.create_information_event(text))
+
+    def handle_ignore(self, params):
+        """
+        Ignores a nick or a nick!user@host mask, * and ? are wildcards.
+        Usage: /ignore [-]<mask>, without a mask lists the ignored ones
+        """
+        ignores = self.state.ignores
+        self._edit_rules(
+            "Ignored",
+            params,
+            ignores.masks,
+            ignores.add_mask,
+            ignores.remove_mask,
+            self.config.ignore_masks,
+        )
+
+    def handle_filter(self, params):
+        """
+        Hides messages matching a regular expression.
+        Usage: /filter [-]<regex>, without a regex lists the filters
+        """
+        ignores = self.state.ignores
+        self._edit_rules(
+            "Filtered",
+            params,
+            ignores.filters,
+            ignores.add_filter,
+            ignores.remove_filter,
+            self.config.filter_patterns,
+        )
+
+    @inject.autoparams()
+    def _edit_rules(
+        self,
+        label,
+        params,
+        rules,
+        add,
+        remove,
+        saved,
+        incoming_queue: IncomingQueue,
+    ):
+        params = (params or "").strip()
+        if not params:
+            listed = ", ".join(
+                f"{rule.pattern} ({rule.hits} hits)" for rule in rules
+            )
+            text = f"{label}: {listed or 'nothing'}."
+        elif params.startswith("-"):
+            pattern = params[1:]
+            if remove(pattern):
+                saved.remove(pattern)
+                self.config.save_config()
+                text = f"No longer {label.lower()}: {pattern!r}."
+            else:
+                text = f"{pattern!r} is not {label.lower()}."
+        elif add(params):
+            saved.append(params)
+            self.config.save_config()
+            text = f"{label}: {params!r}."
+        else:
+            text = f"{params!r} is already {label.lower()} or invalid."
+
+        incoming_queue.put_nowait(IncomingEvent.create_information_event(text))
+
     @inject.autoparams()
     def send_money_to_target(
         self,
@@ -0,0 +1,84 @@
+import logging
+from tkinter import END
+
+import inject
+
+from pysaic.history import HistoryKind, HistoryRecord, HistoryStore
+from pysaic.use_cases.ui.utils import (
+    channel_tag,
+    enable_disable,
+    normalize_content,
+)
+
+logger = logging.getLogger(__name__)
+
+HISTORY_PAGE_SIZE = 100
+
+
+def render_history_record(record: HistoryRecord) -> list[str]:
+    """Flat list of text and tag pairs accepted by `Text.insert`."""
+    chunks = [
+        f"[{record.created_at.strftime('%H:%M:%S')}] ",
+        "Time",
+        record.author,
+        record.faction,
+    ]
+    if record.kind == HistoryKind.DM:
+        chunks += [" -> ", "DM", record.target, "Text"]
+    content = normalize_content(record.content)
+    new_line = "" if content.endswith("\n") else "\n"
+    chunks += [
+        f": {content}{new_line}",
+        ("Text", "Highlight") if record.highlight else "Text",
+    ]
+    if record.kind == HistoryKind.CHANNEL:
+        tag = channel_tag(record.channel)
+        chunks[1::2] = [
+            (*tags, tag) if isinstance(tags, tuple) else (tags, tag)
+            for tags in chunks[1::2]
+        ]
+    return chunks
+
+
+class LoadHistoryUseCase:
+    @property
+    def messages_list(self):
+        return self.ui.messages_list
+
+    def __init__(self, state, ui):
+        self.state = state
+        self.ui = ui
+
+    @inject.autoparams()
+    def execute(self, store: HistoryStore, count: int = HISTORY_PAGE_SIZE):
+        if self.state.history_exhausted:
+            return
+
+        records, cursor = store.read_last(count, self.state.history_cursor)
+        self.state.history_cursor = cursor
+        self.state.history_exhausted = cursor is None
+        logger.debug("Loaded %d history records", len(records))
+        if not records:
+            return
+
+        chunks = []
+        for record in records:
+            chunks += render_history_record(record)
+
+        first_visible = self.messages_list.index("@0,0")
+        lines_before = int(self.messages_list.index(END).split(".")[0])
+        with enable_disable(self.messages_list, tail=False):
+            self.messages_list.insert("1.0", *chunks)
+        for channel in {
+            record.channel
+            for record in records
+            if record.kind == HistoryKind.CHANNEL
+        }:
+            self.messages_list.tag_configure(
+                channel_tag(channel),
+                elide=not self.state.is_active_channel(channel),
+            )
+
+        added = int(self.messages_list.index(END).split(".")[0]) - lines_before
+        line, column = first_visible.split(".")
+        self.messages_list.yview(f"{int(line) + added}.{column}")
@@ -1,17 +1,21 @@
 import logging
-from contextlib import suppress
 from tkinter import END
 
-from pysaic.use_cases.common import join_previous_channel
+from pysaic.use_cases.common import join_channels
 from pysaic.config import Config, FactionSetting
 from pysaic.controllers.game import (
     add_channel_message_to_game,
     add_dm_message_to_game,
     add_error_message_to_game,
     add_information_message_to_game,
+    add_setting_to_game,
     add_users_list_to_game,
     ask_for_actor_status,
 )
+from pysaic.controllers.history import (
+    add_channel_message_to_history,
+    add_dm_message_to_history,
+)
 from pysaic.entities import (
     AppEvent,
     ChatUser,
@@ -23,7 +27,6 @@ from pysaic.entities import (
     OutgoingNotice,
     GameEvent,
     OutgoingNick,
-    OutgoingPart,
     OutgoingJoin,
 )
 from pysaic.enums import AppEventEnum, FactionsEnum, IrcEvents
@@ -33,25 +36,38 @@ from pysaic.settings import (
     END_OF_ACTOR_CHARACTER,
     START_OF_ACTOR_CHARACTER,
     APP_IDENTITY,
+    MIN_SCRIPT_VERSION,
     SUPPORTED_SCRIPT_VERSION,
 )
-from pysaic.state import ChatUsers, State
+from pysaic.state import NICK_PREFIXES, ChatUsers, State
 from pysaic.ui.app import App
 from pysaic.use_cases.ui.add_dm_message import AddDmMessage
 from pysaic.use_cases.ui.command import CommandUseCase
+from pysaic.use_cases.ui.history import LoadHistoryUseCase
 from pysaic.use_cases.ui.mode_change import ModeChangeUseCase
 from pysaic.use_cases.ui.money_transfer import IncomingMoneyTransferUseCase
 from pysaic.use_cases.ui.our_message import OurMessageUseCase
 from pysaic.use_cases.ui.update_users import UpdateUsersUseCase
 from pysaic.use_cases.ui.utils import (
+    channel_tag,
     enable_disable,
     get_faction_actor,
     normalize_content,
     prepare_date,
+    tag_channel_line,
 )
 
 logger = logging.getLogger(__name__)
 
+# events that are not bound to a single channel
+GLOBAL_IRC_EVENTS = (
+    IrcEvents.QUIT,
+    IrcEvents.NICK,
+    IrcEvents.USER,
+    IrcEvents.BATCH,
+    IrcEvents.AWAY,
+)
+
 
 class IncomingNewEventUseCase:
     @property
@@ -129,8 +145,12 @@ class IncomingNewEventUseCase:
             return
 
         elif event.target.startswith("#"):
-            self._add_channel_message(event)
-            self._add_channel_message_to_game(event)
+            # matched once, shared by the window, the history and the game
+            highlight = self._is_highlight(event)
+            self._add_channel_message_to_history(event, highlight)
+            self._render_channel_message(event, highlight)
+            if self.state.is_active_channel(event.target):
+                self._add_channel_message_to_game(event, highlight)
         else:
             if event.content.startswith("actor_"):
                 IncomingMoneyTransferUseCase(
@@ -143,11 +163,18 @@ class IncomingNewEventUseCase:
     def __str__(self):
         return f"IncomingNewEvent: {self.event}"
 
-    def _add_channel_message(self, event: IncomingMessage):
+    def _is_highlight(self, event: IncomingMessage):
+        if event.author == "NickServ":
+            return True
+        return (
+            event.author != self.nick
+            and self.state.highlighter.get_matcher(
+                self.nick, self.config
+            ).matches(event.content)
+        )
+
+    def _render_channel_message(self, event: IncomingMessage, highlight):
         logger.debug("Adding channel message: %r", event)
-        highlight = (
-            event.author != self.nick and self.nick in event.content
-        ) or event.author == "NickServ"
         with enable_disable(self.messages_list):
             self._add_date_to_message(event)
             if START_OF_ACTOR_CHARACTER in event.content:
@@ -160,8 +187,27 @@ class IncomingNewEventUseCase:
                 self.messages_list.tag_add(
                     "Highlight", END + "-2l", END + "-1l"
                 )
+            tag_channel_line(
+                self.messages_list,
+                event.target,
+                self.state.is_active_channel(event.target),
+            )
             self.messages_list.see(END)
 
+    def _add_channel_message_to_history(self, event, highlight):
+        if START_OF_ACTOR_CHARACTER in event.content:
+            author, faction_actor, content = (
+                self._get_death_message_author_and_content(event)
+            )
+            faction = FactionsEnum(faction_actor).name
+        else:
+            author = event.author
+            faction = self._get_faction_color(event.author)
+            content = self._get_content(event)
+        add_channel_message_to_history(
+            event.created_at, event.target, author, faction, content, highlight
+        )
+
     def _add_dm_message(self, event: IncomingMessage, service=False):
         logger.debug("Adding dm message: %r", event)
         with enable_disable(self.messages_list):
@@ -171,6 +217,14 @@ class IncomingNewEventUseCase:
             self._add_user_and_faction_color(event.target)
             self._add_content_to_message(event)
             self.messages_list.see(END)
+        add_dm_message_to_history(
+            event.created_at,
+            event.author,
+            event.author,
+            self._get_faction_color(event.author),
+            event.target,
+            self._get_content(event),
+        )
 
     def _add_event(self, event):
         # TODO: replace with dict mapping or or add them dynamically
@@ -199,7 +253,7 @@ class IncomingNewEventUseCase:
         elif event.event.type == IrcEvents.USER:
             self._handle_nick_changed_by_server(event)
         elif event.event.type == IrcEvents.NAMES:
-            self._add_names(event.event.payload["nicks"])
+            self._replace_names(event.target, event.event.payload["nicks"])
         elif event.event.type == IrcEvents.NOTICE:
             self._handle_notice(event)
         elif event.event.type == IrcEvents.END_OF_NAMES:
@@ -208,28 +262,41 @@ class IncomingNewEventUseCase:
             self._hande_user_is_banned(event)
         elif event.event.type == IrcEvents.KICK:
             self._handle_user_is_kicked(event)
+        elif event.event.type == IrcEvents.BATCH:
+            self._apply_netsplit_batch(event.event.payload)
+        elif event.event.type == IrcEvents.AWAY:
+            self._handle_away(event)
         elif event.event.type == IrcEvents.MODE:
-            ModeChangeUseCase.handle(
-                self.state, self.ui, self.chat_users, event
-            )
+            chat_users = self.state.channel_users(event.target)
+            ModeChangeUseCase.handle(self.state, self.ui, chat_users, event)
         else:
             logger.warning("Unknown IRC event: %r", event)
-        self._update_crc_users_data()
 
-    def _add_names(self, names):
+        if event.event.type in GLOBAL_IRC_EVENTS or (
+            self.state.is_active_channel(event.target)
+        ):
+            self._update_crc_users_data()
+
+    def _add_names(self, names, channel=None):
+        chat_users = (
+            self.state.channel_users(channel) if channel else self.chat_users
+        )
         for name in names:
-            key_name = name.lstrip("%@+")
-            if key_name in self.chat_users:
+            key_name = name.lstrip(NICK_PREFIXES)
+            if key_name in chat_users:
                 continue
 
             logger.debug("Adding name: %r", name)
-            chat_user = ChatUser(name=name)
-            if name == self.nick:
+            chat_user = ChatUser(name=key_name)
+            if key_name != name:
+                chat_user.set_irc_mode(name[:1])
+            if key_name == self.nick:
                 chat_user.faction = self.config.current_faction
                 chat_user.in_game = self.state.is_game_running
 
-            self.chat_users.add_user(key_name, chat_user)
-        self._update_ui_user_list()
+            chat_users.add_user(key_name, chat_user)
+        if chat_users is self.chat_users:
+            self._update_ui_user_list()
 
     def _add_information_event(self, event):
         logger.debug("Adding information event: %r", event)
@@ -258,7 +325,7 @@ class IncomingNewEventUseCase:
         elif message.startswith("USERDATA"):
             self._send_user_data(event)
         elif message.startswith("AMOGUS"):
-            self._parse_amogus(message)
+            self._parse_amogus(message, event.target)
         else:
             logger.warning("Unknown CTCP: %r", message)
 
@@ -282,7 +349,9 @@ class IncomingNewEventUseCase:
 
     def _send_user_data(self, event):
         logger.debug("Sending USERDATA")
-        self._send_amogus_message()
+        self._send_amogus_message(
+            event.target if event.target.startswith("#") else None
+        )
 
     def _get_faction_color(self, author) -> str:
         if "NickServ" in author:
@@ -303,11 +372,15 @@ class IncomingNewEventUseCase:
             "Time",
         )
 
-    def _add_content_to_message(self, event):
+    @staticmethod
+    def _get_content(event):
         try:
-            content = event.content.split(END_OF_ACTOR_CHARACTER, 1)[1]
+            return event.content.split(END_OF_ACTOR_CHARACTER, 1)[1]
         except IndexError:
-            content = event.content
+            return event.content
+
+    def _add_content_to_message(self, event):
+        content = self._get_content(event)
         self.messages_list.insert(
             END,
             f": {normalize_content(content)}{self._add_new_line_if_necessary(content)}",
@@ -323,10 +396,19 @@ class IncomingNewEventUseCase:
         )
 
     def _handle_part_or_quit(self, event):
-        with suppress(KeyError):
-            self.chat_users.remove_user(event.author)
-        self._update_ui_user_list()
+        if event.event.type == IrcEvents.PART:
+            channels = [self.state.channel_users(event.target)]
+            was_displayed = self.state.is_active_channel(event.target)
+        else:
+            channels = self.state.channels_with_user(event.author)
+            was_displayed = event.author in self.chat_users
+
+        for chat_users in channels:
+            chat_users.remove_user(event.author)
+        if not was_displayed:
+            return
 
+        self._update_ui_user_list()
         if event.event.type == IrcEvents.PART:
             if event.event.payload:
                 self._add_information_text(
@@ -339,43 +421,90 @@ class IncomingNewEventUseCase:
         else:
             self._add_information_text(f"{event.author} has quit.")
 
+    def _apply_netsplit_batch(self, payload):
+        # the whole split or rejoin is applied at once, so the user list and
+        # the game get one update instead of one per user
+        for name in payload["quits"]:
+            for chat_users in self.state.channels_with_user(name):
+                chat_users.remove_user(name)
+        for name, channel in payload["joins"]:
+            chat_users = self.state.channel_users(channel)
+            if name not in chat_users:
+                chat_users.add_user(name, ChatUser(name=name))
+
+        self._update_ui_user_list()
+        if payload["quits"]:
+            self._add_information_text(
+                f"{len(payload['quits'])} users lost in a netsplit."
+            )
+        if payload["joins"]:
+            self._add_information_text(
+                f"{len(payload['joins'])} users are back after a netsplit."
+            )
+
+    def _handle_away(self, event):
+        for chat_users in self.state.channels_with_user(event.author):
+            chat_users[event.author].away = event.event.payload["away"]
+
     def _handle_notice(self, event):
         if event.author == "NickServ":
             self._add_dm_message(event, service=True)
 
-    def _parse_amogus(self, content):
+    def _parse_amogus(self, content, channel=""):
         _, data = content.split(" ", 1)
         author, faction, in_game = data.split("/")
         logger.debug("Parsing AMOGUS: %r", data)
-        should_update = False
-
-        user = self.chat_users.get(author)
-        if user is None:
-            should_update = True
-            user = ChatUser(name=author)
 
         try:
             faction = FactionsEnum(faction)
         except Exception:
             logger.exception("Error parsing faction - %r", faction)
             return
-        else:
-            if user.faction != faction:
-                should_update = True
-                user.faction = faction
-
         in_game = in_game.lower() == "true"
-        if user.in_game != in_game:
-            should_update = True
-            user.in_game = in_game
+
+        channels = self.state.channels_with_user(author)
+        if not channels:
+            channels = [
+                (
+                    self.state.channel_users(channel)
+                    if channel.startswith("#")
+                    else self.chat_users
+                )
+            ]
+
+        should_update = False
+        for chat_users in channels:
+            if self._update_amogus_user(
+                chat_users, author, faction, in_game
+            ) and (chat_users is self.chat_users):
+                should_update = True
 
         if not should_update:
             return
 
-        self.chat_users.set_user(author, user)
         self._update_crc_users_data()
         self._update_ui_user_list()
 
+    @staticmethod
+    def _update_amogus_user(chat_users, author, faction, in_game) -> bool:
+        should_update = False
+        user = chat_users.get(author)
+        if user is None:
+            should_update = True
+            user = ChatUser(name=author)
+
+        if user.faction != faction:
+            should_update = True
+            user.faction = faction
+
+        if user.in_game != in_game:
+            should_update = True
+            user.in_game = in_game
+
+        if should_update:
+            chat_users.set_user(author, user)
+        return should_update
+
     def _add_death_message(self, event):
         author, faction_actor, content = (
             self._get_death_message_author_and_content(event)
@@ -393,7 +522,7 @@ class IncomingNewEventUseCase:
             "Text",
         )
 
-    def _add_channel_message_to_game(self, event):
+    def _add_channel_message_to_game(self, event, highlight):
         if START_OF_ACTOR_CHARACTER in event.content:
             author, faction_actor, content = (
                 self._get_death_message_author_and_content(event)
@@ -405,7 +534,7 @@ class IncomingNewEventUseCase:
         add_channel_message_to_game(
             faction_actor=faction_actor,
             author=author,
-            highlight=str(self.nick in event.content),
+            highlight=str(highlight),
             content=content,
         )
 
@@ -433,9 +562,9 @@ class IncomingNewEventUseCase:
 
         # TODO: fix this mess
         elif event.event.what == AppEventEnum.CONNECTED:
-            self._handle_connected_to_channel()
+            self._handle_connected_to_channel(event.target)
         elif event.event.what == AppEventEnum.DISCONNECTED_FROM_PDA_NETWORK:
-            self._handle_disconnected_from_channel()
+            self._handle_disconnected_from_channel(event.target)
 
         elif event.event.what == AppEventEnum.UPDATE_UI_USERS_LIST:
             self._handle_update_ui_users_list()
@@ -455,6 +584,8 @@ class IncomingNewEventUseCase:
             self._handle_nickname_changed(event.event.payload)
         elif event.event.what == AppEventEnum.RECONNECTING_TO_SERVER:
             self._handle_reconnecting_to_server()
+        elif event.event.what == AppEventEnum.LOAD_HISTORY:
+            LoadHistoryUseCase(self.state, self.ui).execute()
         elif event.event.what == AppEventEnum.NEW_VERSION:
             self._add_information_text(
                 f"New version available: {event.event.payload}"
@@ -553,12 +684,11 @@ class IncomingNewEventUseCase:
     def _user_nick_change(self, event):
         new_nick = event.event.payload["new_nick"]
         logger.debug("User nick change: %r -> %r", event, new_nick)
-        previous_chat_user = self.chat_users.pop(event.author)
-        self.chat_users[new_nick] = ChatUser(
-            name=new_nick,
-            faction=previous_chat_user.faction,
-            in_game=previous_chat_user.in_game,
-        )
+        was_displayed = event.author in self.chat_users
+        self.state.rename_user(event.author, new_nick)
+        if not was_displayed:
+            return
+
         self._add_information_text(
             f"{event.author!r} is know now as {new_nick!r}."
         )
@@ -579,19 +709,26 @@ class IncomingNewEventUseCase:
         add_error_message_to_game(event.content)
 
     def _user_joined_use_case(self, event):
-        self._add_names([event.author])
-        self._add_information_text(f"{event.author} has logged in")
+        self._add_names([event.author], event.target)
+        if self.state.is_active_channel(event.target):
+            self._add_information_text(f"{event.author} has logged in")
+
+    def _handle_connected_to_channel(self, channel):
+        self.state.set_in_channel(channel or None)
+        if channel and not self.state.is_active_channel(channel):
+            return
 
-    def _handle_connected_to_channel(self):
         self._add_information_text("Connected to the network.")
         self.ui.enable_input()
-        self.state.set_in_channel()
         self._send_amogus_message()
 
-    def _handle_disconnected_from_channel(self):
+    def _handle_disconnected_from_channel(self, channel):
+        self.state.set_not_in_channel(channel or None)
+        if channel and not self.state.is_active_channel(channel):
+            return
+
         self._add_error_text("Lost connection to the network.")
         self.ui.disable_input()
-        self.state.set_not_in_channel()
 
     def _handle_game_event(self, event):
         if event.event.what == GameEvents.ACTOR_UPDATE:
@@ -608,12 +745,7 @@ class IncomingNewEventUseCase:
         logger.debug(
             "User nick was changed by server: %r -> %r", event, new_nick
         )
-        previous_chat_user = self.chat_users.pop(event.author)
-        self.chat_users[new_nick] = ChatUser(
-            name=new_nick,
-            faction=previous_chat_user.faction,
-            in_game=previous_chat_user.in_game,
-        )
+        self.state.rename_user(event.author, new_nick)
         self._add_information_text(
             f"Network server renamed you to {new_nick!r}."
         )
@@ -648,7 +780,7 @@ class IncomingNewEventUseCase:
             )
             self._send_amogus_message()
 
-    def _send_amogus_message(self):
+    def _send_amogus_message(self, channel=None):
         logger.info('Sending "AMOGUS" message')
         try:
             user = self.chat_users[self.nick]
@@ -656,14 +788,21 @@ class IncomingNewEventUseCase:
             logger.exception("User was missing in chat_users.")
             user = self._readd_user_to_chat_users()
 
-        self.outgoing_queue.put_nowait(
-            OutgoingNotice(
-                target=self.config.server.previous_channel,
-                content=(
-                    f"\x01AMOGUS {self.nick}/{user.faction}/{user.in_game}\x01"
-                ),
+        if channel:
+            channels = [channel]
+        else:
+            channels = sorted(self.state.joined_channels) or [
+                self.config.server.previous_channel
+            ]
+        for target in channels:
+            self.outgoing_queue.put_nowait(
+                OutgoingNotice(
+                    target=target,
+                    content=(
+                        f"\x01AMOGUS {self.nick}/{user.faction}/{user.in_game}\x01"
+                    ),
+                )
             )
-        )
 
     def _handle_command(self, event):
         content = event.event.payload
@@ -686,19 +825,27 @@ class IncomingNewEventUseCase:
         self.state.player_money = int(payload)
 
     def _handle_game_handshake(self, payload: Handshake):
-        if payload.version == SUPPORTED_SCRIPT_VERSION:
+        if MIN_SCRIPT_VERSION <= payload.version <= SUPPORTED_SCRIPT_VERSION:
             return
 
         logger.error("Unsupported handshake version: %r", payload.version)
         self._add_error_text("Please update your chat mod.")
 
     def _handle_user_is_kicked(self, event):
+        kicked_nick = event.event.payload["kicked_nick"]
+        if kicked_nick == self.state.nick:
+            # the handler rejoins, NAMES fills the roster again
+            self.state.set_not_in_channel(event.target)
+        else:
+            self.state.channel_users(event.target).remove_user(kicked_nick)
+        if not self.state.is_active_channel(event.target):
+            return
+
         self._add_information_event(
             IncomingEvent.create_information_event(
-                content=f"{event.event.payload['kicked_nick']} was kicked by {event.author}: {event.event.payload['reason']}"
+                content=f"{kicked_nick} was kicked by {event.author}: {event.event.payload['reason']}"
             )
         )
-        self.state.chat_users.remove_user(event.event.payload["kicked_nick"])
         self._update_ui_user_list()
 
     def _update_nick_from_options(self):
@@ -718,9 +865,9 @@ class IncomingNewEventUseCase:
         logger.debug("Handling NICKNAME_CHANGED event")
         new_nick = payload["nick"]
         old = self.state.nick
-        try:
-            previous_chat_user = self.chat_users.pop(old)
-        except KeyError:
+        if self.state.channels_with_user(old):
+            self.state.rename_user(old, new_nick)
+        else:
             self.chat_users.add_user(
                 new_nick,
                 ChatUser(
@@ -729,12 +876,6 @@ class IncomingNewEventUseCase:
                     in_game=self.state.is_game_running,
                 ),
             )
-        else:
-            self.chat_users[new_nick] = ChatUser(
-                name=new_nick,
-                faction=previous_chat_user.faction,
-                in_game=previous_chat_user.in_game,
-            )
 
         self.state.nick = self.config.nick = new_nick
         self.config.save_config()
@@ -750,7 +891,7 @@ class IncomingNewEventUseCase:
         )
         self.chat_users.add_user(self.nick, user)
         if not self.state.is_in_channel.is_set():
-            join_previous_channel()
+            join_channels(self.outgoing_queue, self.config)
 
         return user
 
@@ -759,22 +900,51 @@ class IncomingNewEventUseCase:
             "Connection lost with the server, trying to reconnect."
         )
         self.ui.disable_input()
-        self.state.set_not_in_channel()
-        self._update_ui_user_list()
-        self._update_crc_users_data()
+        # the last roster stays shown and sent to the game until NAMES
+        # tells what changed while we were away
+        self.state.set_reconnecting()
+
+    def _replace_names(self, channel, names):
+        if any(self.state.replace_roster(channel, names)) and (
+            self.state.is_active_channel(channel)
+        ):
+            self._update_ui_user_list()
+        if self.state.stale_channels:
+            return
+        recovery_time = self.state.connection_stats.recovered()
+        if recovery_time is not None:
+            self._add_information_text(
+                f"Reconnected after {recovery_time:.1f}s."
+            )
 
     def _handle_game_channel_change(self, payload: str):
-        part = OutgoingPart(channel=self.config.server.previous_channel)
-        self.config.server.previous_channel = {
+        # every channel is already joined, switching only changes which
+        # roster and channel lines are displayed
+        channel = {
             channel.description: channel.name
             for channel in self.config.server.channels
         }[payload]
+        if self.state.is_active_channel(channel):
+            return
+
+        self.config.server.previous_channel = channel
         self.config.save_config()
-        self.outgoing_queue.put_nowait(part)
-        self.outgoing_queue.put_nowait(
-            OutgoingJoin(channel=self.config.server.previous_channel)
-        )
+        if channel not in self.state.joined_channels:
+            self.outgoing_queue.put_nowait(OutgoingJoin(channel=channel))
+        self._show_channel_lines()
         self._add_information_text(f"Channel changed to {payload}")
+        add_setting_to_game("CurrentChannel", channel)
+        self._update_ui_user_list()
+        self._update_crc_users_data()
+
+    def _show_channel_lines(self):
+        # lines of other channels are hidden, not removed, so DMs,
+        # information and loaded history stay where they were
+        for channel in self.config.server.channels:
+            self.messages_list.tag_configure(
+                channel_tag(channel.name),
+                elide=not self.state.is_active_channel(channel.name),
+            )
 
     def _handle_app_channel_change(self, payload):
         self._handle_game_channel_change(
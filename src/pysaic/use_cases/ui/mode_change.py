@@ -1,36 +1,21 @@
 import logging
-import re
-from collections import defaultdict
 
 from pysaic.entities import IncomingEvent
 from pysaic.use_cases.ui.update_users import UpdateUsersUseCase
 
-mode_regex = re.compile(r"([+-]\w+)")
 logger = logging.getLogger(__name__)
 
-MODE_TRANSLATOR = {"o": "@", "h": "%", "v": "+", "a": "&", "q": "*", "r": ""}
-TRANSLATOR_TO_MODE = {v: k for k, v in MODE_TRANSLATOR.items()}
-MODE_RANKS = {
-    "": 0,
-    "@": 3,
-    "%": 2,
-    "+": 1,
-    "&": 4,
-    "*": 5,
-}
-RANK_TO_MODE = {rank: mode for mode, rank in MODE_RANKS.items()}
 
-
-SET = object()
-
-
-def get_rank(modes):
-    try:
-        return max(
-            MODE_RANKS.get(MODE_TRANSLATOR.get(mode, ""), 0) for mode in modes
-        )
-    except ValueError:
-        return 0
+def resolve_irc_mode(current, symbols: dict[str, bool], ranks) -> str:
+    """
+    Only the highest prefix of a user is known, so removing it leaves the
+    user without one unless the same MODE line gives another one.
+    """
+    if symbols.get(current) is False:
+        current = ""
+    added = [symbol for symbol, adding in symbols.items() if adding]
+    highest = max(added, key=ranks.__getitem__, default="")
+    return highest if ranks[highest] > ranks[current] else current
 
 
 class ModeChangeUseCase:
@@ -46,44 +31,24 @@ class ModeChangeUseCase:
         instance.execute()
 
     def execute(self):
-        mode_information = mode_regex.findall(self.event.event.payload["mode"])
-        nick = self.event.event.payload["nick"]
-        modes = defaultdict(list)
-
-        for mode in mode_information:
-            modes_list = mode[1:]
-            for single_mode in modes_list:
-                if single_mode not in MODE_TRANSLATOR:
-                    logger.critical("Unknown mode: %s", single_mode)
-                    return
-
-            modes[mode[0]].extend(modes_list)
-
-        highest_rank_add = get_rank(modes.get("+", []))
-        highest_rank_remove = get_rank(modes.get("-", []))
-        current_rank = get_rank(
-            [TRANSLATOR_TO_MODE.get(self.chat_users[nick].irc_mode)]
-        )
-
-        if current_rank == highest_rank_remove:
-            highest_mode = RANK_TO_MODE[highest_rank_add]
-            type_of_mode = SET
-
-        elif current_rank > highest_rank_remove:
-            highest_mode = self.chat_users[nick].irc_mode
-            type_of_mode = SET
-
-        elif highest_rank_add > highest_rank_remove:
-            highest_mode = RANK_TO_MODE[highest_rank_add]
-            type_of_mode = SET
-
-        else:
-            highest_mode = None
-            type_of_mode = None
-
-        if type_of_mode is SET:
-            self.chat_users[nick].irc_mode = highest_mode
-        else:
-            self.chat_users[nick].irc_mode = ""
-
-        UpdateUsersUseCase(self.state, self.ui).execute()
+        payload = self.event.event.payload
+        channel_modes = payload["channel_modes"]
+        # nick -> prefix symbol -> added, the last change of a symbol wins
+        users: dict[str, dict[str, bool]] = {}
+        for change in payload["changes"]:
+            symbol = channel_modes.prefixes[change.mode]
+            users.setdefault(change.argument, {})[symbol] = change.adding
+
+        ranks = channel_modes.ranks
+        for nick, symbols in users.items():
+            chat_user = self.chat_users.get(nick)
+            if chat_user is None:
+                logger.warning("Mode change of unknown user %r", nick)
+                continue
+            # modes from an older server may not be known anymore
+            current = chat_user.irc_mode if chat_user.irc_mode in ranks else ""
+            chat_user.set_irc_mode(resolve_irc_mode(current, symbols, ranks))
+
+        # one redraw for the whole line, none for a channel in background
+        if self.chat_users is self.state.chat_users:
+            UpdateUsersUseCase(self.state, self.ui).execute()
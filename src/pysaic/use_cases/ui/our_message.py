@@ -5,9 +5,14 @@ from tkinter import END
 from pysaic.controllers.game import (
     add_to_crc_input_file,
 )
+from pysaic.controllers.history import add_channel_message_to_history
 from pysaic.entities import OutgoingMessage, ChatUser
 from pysaic.enums import FactionsEnum
-from pysaic.use_cases.ui.utils import enable_disable, get_faction_actor
+from pysaic.use_cases.ui.utils import (
+    enable_disable,
+    get_faction_actor,
+    tag_channel_line,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +85,14 @@ class OurMessageUseCase:
 
         with enable_disable(self.messages_list):
             self._add_our_message(user, outgoing_message)
+            tag_channel_line(self.messages_list, outgoing_message.target, True)
+        add_channel_message_to_history(
+            outgoing_message.created_at,
+            outgoing_message.target,
+            user.name,
+            (user.faction or FactionsEnum.Anonymous).name,
+            content,
+        )
 
         if self.state.game_location:
             add_to_crc_input_file(
@@ -3,6 +3,7 @@ from tkinter import END
 
 
 from pysaic.controllers.game import add_dm_message_to_game
+from pysaic.controllers.history import add_dm_message_to_history
 from pysaic.enums import FactionsEnum
 from pysaic.use_cases.ui.utils import enable_disable
 
@@ -22,6 +23,14 @@ class OurPrivMessageUseCase:
 
     def execute(self):
         self._add_our_priv_message()
+        add_dm_message_to_history(
+            self.outgoing_message.created_at,
+            self.outgoing_message.target,
+            self.chat_user.name,
+            self.chat_user.faction.name,
+            self.outgoing_message.target,
+            self.outgoing_message.content,
+        )
         add_dm_message_to_game(
             self.chat_user.faction.value,
             self.chat_user.name,
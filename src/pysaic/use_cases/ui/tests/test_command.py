@@ -0,0 +1,52 @@
+import asyncio
+from unittest.mock import Mock, patch
+
+import inject
+import pytest
+
+from pysaic.entities import IncomingQueue
+from pysaic.use_cases.ui.command import CommandUseCase
+
+
+@pytest.fixture()
+def incoming_queue():
+    return asyncio.Queue()
+
+
+@pytest.fixture()
+def loop():
+    return Mock()
+
+
+@pytest.fixture(autouse=True)
+def setup_injector(incoming_queue, loop):
+    def binder(binder):
+        binder.bind(IncomingQueue, incoming_queue)
+        binder.bind(asyncio.AbstractEventLoop, loop)
+
+    inject.clear_and_configure(binder)
+    yield
+    inject.clear()
+
+
+@pytest.mark.parametrize("params", ["nan", "inf", "-inf", "soon"])
+@patch("pysaic.use_cases.ui.command.start_profiling")
+def test_profile_rejects_invalid_durations(
+    start_profiling, params, incoming_queue, loop
+):
+    # when
+    CommandUseCase.handle(Mock(), Mock(), Mock(), "profile", params)
+
+    # then
+    start_profiling.assert_not_called()
+    loop.call_later.assert_not_called()
+    assert "Usage: /profile" in incoming_queue.get_nowait().event.content
+
+
+@patch("pysaic.use_cases.ui.command.start_profiling", return_value=True)
+def test_profile_duration_is_capped(start_profiling, loop):
+    # when
+    CommandUseCase.handle(Mock(), Mock(), Mock(), "profile", "9000")
+
+    # then
+    assert loop.call_later.call_args.args[0] == 300
@@ -0,0 +1,261 @@
+from tkinter import END
+from unittest.mock import Mock, patch
+
+import pytest
+
+from pysaic.config import Channel
+from pysaic.entities import (
+    AppEvent,
+    ChatUser,
+    IncomingEvent,
+    IncomingMessage,
+    InformationEvent,
+    IrcEvent,
+)
+from pysaic.enums import AppEventEnum, FactionsEnum, IrcEvents
+from pysaic.history import HistoryKind, HistoryRecord
+from pysaic.state import State
+from pysaic.use_cases.ui.history import LoadHistoryUseCase
+from pysaic.use_cases.ui.incoming_event import IncomingNewEventUseCase
+
+MODULE = "pysaic.use_cases.ui.incoming_event"
+
+
+@pytest.fixture()
+def config():
+    config = Mock()
+    config.nick = "brzys"
+    config.ignore_masks = config.filter_patterns = []
+    config.current_faction = FactionsEnum.Duty
+    config.highlight_aliases = config.highlight_words = []
+    config.highlight_patterns = []
+    config.highlight_faction = False
+    config.server.channels = [
+        Channel("#crcr_english", "CRCR English"),
+        Channel("#pysaic_english", "PySAIC English"),
+    ]
+    config.server.previous_channel = "#crcr_english"
+    return config
+
+
+@pytest.fixture()
+def state(config):
+    state = State(config)
+    for channel in ("#crcr_english", "#pysaic_english"):
+        state.set_in_channel(channel)
+        state.channel_users(channel).add_user("Wolf", ChatUser("Wolf"))
+    return state
+
+
+@pytest.fixture(autouse=True)
+def game():
+    with patch(f"{MODULE}.add_information_message_to_game"), patch(
+        f"{MODULE}.add_setting_to_game"
+    ), patch(f"{MODULE}.add_users_list_to_game"), patch(
+        f"{MODULE}.add_channel_message_to_game"
+    ), patch(
+        f"{MODULE}.add_channel_message_to_history"
+    ):
+        yield
+
+
+@pytest.fixture()
+def update_users():
+    with patch(f"{MODULE}.UpdateUsersUseCase") as update_users:
+        yield update_users
+
+
+class MessagesList:
+    """The lines of a `Text` and their tags, as far as the tests need."""
+
+    def __init__(self):
+        self.lines = [[]]
+        self.hidden = set()
+
+    def insert(self, index, *chunks):
+        lines = [[]]
+        for text, tags in zip(chunks[::2], chunks[1::2]):
+            tags = set(tags) if isinstance(tags, tuple) else {tags}
+            lines[-1].append((text, tags - {None}))
+            if text.endswith("\n"):
+                lines.append([])
+        if index == END:
+            self.lines[-1:] = lines
+        else:
+            self.lines[:0] = lines[:-1]
+
+    def tag_add(self, tag, first, last):
+        assert (first, last) == (END + "-2l", END + "-1l")
+        for _text, tags in self.lines[-2]:
+            tags.add(tag)
+
+    def tag_configure(self, tag, elide):
+        if elide:
+            self.hidden.add(tag)
+        else:
+            self.hidden.discard(tag)
+
+    def index(self, index):
+        return f"{len(self.lines) if index == END else 1}.0"
+
+    def config(self, **_options):
+        pass
+
+    def see(self, _index):
+        pass
+
+    def yview(self, _index):
+        pass
+
+    @property
+    def shown(self):
+        return "".join(
+            text
+            for line in self.lines
+            for text, tags in line
+            if not tags & self.hidden
+        )
+
+
+@pytest.fixture()
+def ui():
+    ui = Mock()
+    ui.messages_list = MessagesList()
+    return ui
+
+
+def switch(state, config, ui, channel):
+    IncomingNewEventUseCase.handle_event(
+        state,
+        config,
+        ui,
+        IncomingEvent(
+            author="",
+            target="",
+            event=AppEvent(what=AppEventEnum.CHANGE_CHANNEL, payload=channel),
+        ),
+    )
+    return ui.messages_list.shown
+
+
+def kick(channel, nick):
+    return IncomingEvent(
+        author="op",
+        target=channel,
+        event=IrcEvent(
+            type=IrcEvents.KICK,
+            payload={"kicked_nick": nick, "reason": "bye"},
+        ),
+    )
+
+
+def test_kick_in_background_channel_keeps_the_shown_roster(
+    state, config, update_users
+):
+    # when
+    IncomingNewEventUseCase.handle_event(
+        state, config, Mock(), kick("#pysaic_english", "Wolf")
+    )
+
+    # then
+    assert "Wolf" in state.chat_users
+    assert "Wolf" not in state.channel_users("#pysaic_english")
+    assert update_users.mock_calls == []
+
+
+def test_kick_in_active_channel_redraws_the_roster(
+    state, config, update_users
+):
+    # when
+    IncomingNewEventUseCase.handle_event(
+        state, config, Mock(), kick("#crcr_english", "Wolf")
+    )
+
+    # then
+    assert "Wolf" not in state.chat_users
+    update_users.return_value.execute.assert_called_once()
+
+
+def test_being_kicked_leaves_the_channel(state, config, update_users):
+    # when
+    IncomingNewEventUseCase.handle_event(
+        state, config, Mock(), kick("#pysaic_english", "brzys")
+    )
+
+    # then
+    assert state.joined_channels == {"#crcr_english"}
+    assert state.channel_users("#pysaic_english") == {}
+
+
+def test_switching_channels_shows_only_the_new_channel(
+    state, config, ui, update_users
+):
+    # given
+    for channel in ("#crcr_english", "#pysaic_english"):
+        IncomingNewEventUseCase.handle_event(
+            state,
+            config,
+            ui,
+            IncomingMessage(author="Wolf", target=channel, content=channel),
+        )
+
+    # then
+    assert "#pysaic_english" not in ui.messages_list.shown
+
+    # when
+    shown = switch(state, config, ui, "#pysaic_english")
+
+    # then
+    assert "#pysaic_english" in shown
+    assert "#crcr_english" not in shown
+
+    # when
+    shown = switch(state, config, ui, "#crcr_english")
+
+    # then
+    assert "#crcr_english" in shown
+    assert "#pysaic_english" not in shown
+
+
+@patch("pysaic.use_cases.ui.add_dm_message.add_dm_message_to_game")
+@patch("pysaic.use_cases.ui.add_dm_message.add_dm_message_to_history")
+def test_switching_channels_keeps_other_lines(
+    _history, _game, state, config, ui, update_users
+):
+    # given
+    state.chat_users.add_user("brzys", ChatUser("brzys"))
+    store = Mock()
+    store.read_last.return_value = (
+        [
+            HistoryRecord(
+                1.0,
+                HistoryKind.CHANNEL,
+                channel,
+                "Wolf",
+                "Duty",
+                channel,
+                f"old {channel}",
+            )
+            for channel in ("#crcr_english", "#pysaic_english")
+        ],
+        "cursor",
+    )
+    LoadHistoryUseCase(state, ui).execute(store=store, count=2)
+    for event in (
+        IncomingMessage(author="Wolf", target="brzys", content="psst"),
+        IncomingEvent(
+            author="", target="", event=InformationEvent("Server restart")
+        ),
+    ):
+        IncomingNewEventUseCase.handle_event(state, config, ui, event)
+
+    # when
+    switch(state, config, ui, "#pysaic_english")
+    shown = switch(state, config, ui, "#crcr_english")
+
+    # then
+    assert "old #crcr_english" in shown
+    assert "old #pysaic_english" not in shown
+    assert "psst" in shown
+    assert "Server restart" in shown
+    assert state.history_cursor == "cursor"
@@ -12,10 +12,13 @@ from pysaic.entities import (
     IncomingQueue,
 )
 from pysaic.enums import IrcEvents
+from pysaic.modes import ChannelModes
 from pysaic.state import ChatUsers, State
 from pysaic.ui.app import App
 from pysaic.use_cases.ui.mode_change import ModeChangeUseCase
 
+CHANNEL_MODES = ChannelModes.from_server(None)
+
 
 @pytest.fixture()
 def mock_state(chat_users):
@@ -58,7 +61,12 @@ def chat_users(user):
 
 @pytest.fixture()
 def payload():
-    return {"mode": "", "nick": "brzys"}
+    return {"changes": [], "channel_modes": CHANNEL_MODES}
+
+
+def mode_payload(modes, *nicks):
+    nicks = nicks or ["brzys"] * len(modes.replace("+", "").replace("-", ""))
+    return {"changes": CHANNEL_MODES.parse(modes, list(nicks))}
 
 
 @pytest.fixture
@@ -81,7 +89,7 @@ def test_adding_highest_rank_mode(
     mock_state,
 ):
     # given
-    payload["mode"] = "+oa"
+    payload.update(mode_payload("+oa"))
 
     # when
     ModeChangeUseCase.handle(mock_state, mock_ui, chat_users, event)
@@ -105,7 +113,7 @@ def test_removing_highest_rank_mode(
     mock_state,
 ):
     # given
-    payload["mode"] = "-oa"
+    payload.update(mode_payload("-oa"))
     user.irc_mode = "&"
 
     # when
@@ -130,7 +138,7 @@ def test_lowering_rank_from_owner_to_op(
     mock_state,
 ):
     # given
-    payload["mode"] = "+o-a"
+    payload.update(mode_payload("+o-a"))
     user.irc_mode = "&"
 
     # when
@@ -155,7 +163,7 @@ def test_lowering_current_rank_from_owner_to_op(
     mock_state,
 ):
     # given
-    payload["mode"] = "-a"
+    payload.update(mode_payload("-a"))
     user.irc_mode = "&"
 
     # when
@@ -180,7 +188,7 @@ def test_trying_to_lower_higher_rank(
     mock_state,
 ):
     # given
-    payload["mode"] = "-h"
+    payload.update(mode_payload("-h"))
     user.irc_mode = "&"
 
     # when
@@ -192,3 +200,75 @@ def test_trying_to_lower_higher_rank(
         call(mock_state, mock_ui),
         call().execute(),
     ]
+
+
+@patch("pysaic.use_cases.ui.mode_change.UpdateUsersUseCase")
+def test_modes_of_many_users_are_applied_at_once(
+    mock_UpdateUsersUseCase,
+    event,
+    payload,
+    chat_users,
+    user,
+    mock_ui,
+    mock_state,
+):
+    # given
+    chat_users["a"] = ChatUser("a", irc_mode="+")
+    chat_users["b"] = ChatUser("b")
+    payload.update(mode_payload("+ov-v+h", "brzys", "a", "a", "b"))
+
+    # when
+    ModeChangeUseCase.handle(mock_state, mock_ui, chat_users, event)
+
+    # then
+    assert [chat_users[nick].irc_mode for nick in ("brzys", "a", "b")] == [
+        "@",
+        "",
+        "%",
+    ]
+    assert mock_UpdateUsersUseCase.mock_calls == [
+        call(mock_state, mock_ui),
+        call().execute(),
+    ]
+
+
+@patch("pysaic.use_cases.ui.mode_change.UpdateUsersUseCase")
+def test_voiced_user_getting_op(
+    mock_UpdateUsersUseCase,
+    event,
+    payload,
+    chat_users,
+    user,
+    mock_ui,
+    mock_state,
+):
+    # given
+    user.irc_mode = "+"
+    payload.update(mode_payload("+o"))
+
+    # when
+    ModeChangeUseCase.handle(mock_state, mock_ui, chat_users, event)
+
+    # then
+    assert user.irc_mode == "@"
+
+
+@patch("pysaic.use_cases.ui.mode_change.UpdateUsersUseCase")
+def test_background_channel_is_not_redrawn(
+    mock_UpdateUsersUseCase,
+    event,
+    payload,
+    user,
+    mock_ui,
+    mock_state,
+):
+    # given
+    background = ChatUsers({"brzys": user})
+    payload.update(mode_payload("+v-o", "brzys", "nobody"))
+
+    # when
+    ModeChangeUseCase.handle(mock_state, mock_ui, background, event)
+
+    # then
+    assert user.irc_mode == "+"
+    assert mock_UpdateUsersUseCase.mock_calls == []
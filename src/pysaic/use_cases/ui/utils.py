@@ -16,6 +16,17 @@ def enable_disable(widget, *, tail=True):
     widget.config(state=DISABLED)
 
 
+def channel_tag(channel) -> str:
+    return f"Channel{channel.lower()}"
+
+
+def tag_channel_line(messages_list, channel, shown):
+    """Marks the line just added as `channel`'s, hidden unless `shown`."""
+    tag = channel_tag(channel)
+    messages_list.tag_add(tag, END + "-2l", END + "-1l")
+    messages_list.tag_configure(tag, elide=not shown)
+
+
 def get_faction_actor(author_chat_user):
     return author_chat_user.faction.value
 